@@ -0,0 +1,6 @@
+"""
+Benchmarks of the PyTracer ray tracer.
+
+Note: Run from the `PyTracer` directory, e.g.:
+`python -m benchmarks.bvh`.
+"""
@@ -0,0 +1,53 @@
+"""
+Benchmark of the adaptive renderer against full renders.
+"""
+
+import time
+from functools import partial
+
+from scenes import SCENES, random_scene
+
+SCREEN_SIZE = (200, 200)
+TOLERANCES = [0.01, 0.05, 0.1]
+N_MAX_REFLECTIONS = [0, 2]
+
+
+def max_error(full, adaptive) -> float:
+    """
+    Return the maximum difference between the pixels of two images.
+    """
+    return max(abs(a - b) for a, b in zip(full.pixels, adaptive.pixels))
+
+
+def main():
+    """
+    Run benchmark.
+    """
+    print(
+        f"{'scene':>8} {'refl':>4} {'tol':>5} {'rays':>7} {'saved':>6} "
+        f"{'max error':>10} {'full (s)':>9} {'adaptive (s)':>13}"
+    )
+    scenes = {**SCENES, "random": partial(random_scene, seed=0)}
+    for name, build in scenes.items():
+        for n_max_reflections in N_MAX_REFLECTIONS:
+            full, omega, bg_color = build(n_max_reflections, SCREEN_SIZE)
+            start = time.perf_counter()
+            full.ray_trace(omega, bg_color)
+            full_time = time.perf_counter() - start
+            n_pixels = SCREEN_SIZE[0] * SCREEN_SIZE[1]
+
+            for tolerance in TOLERANCES:
+                scene, omega, bg_color = build(n_max_reflections, SCREEN_SIZE)
+                start = time.perf_counter()
+                n_rays = scene.ray_trace_adaptive(omega, bg_color, tolerance)
+                adaptive_time = time.perf_counter() - start
+                print(
+                    f"{name:>8} {n_max_reflections:>4} {tolerance:>5} {n_rays:>7} "
+                    f"{1 - n_rays / n_pixels:>6.1%} "
+                    f"{max_error(full.image, scene.image):>10.4f} "
+                    f"{full_time:>9.2f} {adaptive_time:>13.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark of the incremental rendering of animations.
+
+Usage (from the PyTracer directory):
+    python -m benchmarks.animation --depth 0 --frames 10 --size 200
+
+A small sphere moves across a test scene. Each frame is rendered by
+`Animation` (dirty regions only) and by a full render, and the images
+are compared.
+"""
+
+import argparse
+import time
+
+from scenes import SCENES
+from src.animation import Animation, SceneDelta
+from src.color import Color
+from src.point import Point
+from src.sphere import Sphere
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parse the command line arguments.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scene", choices=list(SCENES), default="scene_4")
+    parser.add_argument("--depth", type=int, default=0, help="reflections")
+    parser.add_argument("--size", type=int, default=200, help="screen size (pixels)")
+    parser.add_argument("--frames", type=int, default=10, help="number of frames")
+    return parser.parse_args()
+
+
+def moving_sphere(frame: int) -> Sphere:
+    """
+    Return the moving sphere at a given frame.
+    """
+    return Sphere(Point(-5 + 0.5 * frame, -2, -4), 1.5, Color(1, 0.2, 0.2), 0.2)
+
+
+def main():
+    """
+    Run benchmark.
+    """
+    args = parse_args()
+    screen_size = (args.size, args.size)
+    scene, omega, bg_color = SCENES[args.scene](args.depth, screen_size)
+    scene.spheres.append(moving_sphere(0))
+    index = len(scene.spheres) - 1
+    reference, _, _ = SCENES[args.scene](args.depth, screen_size)
+    reference.spheres.append(moving_sphere(0))
+
+    animation = Animation(scene, omega, bg_color)
+    deltas = (SceneDelta({index: moving_sphere(f)}) for f in range(1, args.frames))
+    incremental_time = full_time = 0.0
+    n_pixels = args.size * args.size
+    print(f"{'frame':>5} {'traced':>7} {'incremental':>12} {'full':>8}  identical")
+    start = time.perf_counter()
+    for frame, image in enumerate(animation.frames(deltas)):
+        frame_time = time.perf_counter() - start
+        reference.spheres[index] = moving_sphere(frame)
+        start = time.perf_counter()
+        reference.ray_trace(omega, bg_color)
+        reference_time = time.perf_counter() - start
+        identical = bytes(image.pixels.cast("B")) == bytes(
+            reference.image.pixels.cast("B")
+        )
+        print(
+            f"{frame:>5} {animation.n_traced[frame] / n_pixels:>7.1%} "
+            f"{frame_time:>11.3f}s {reference_time:>7.3f}s  {identical}"
+        )
+        if frame > 0:
+            incremental_time += frame_time
+            full_time += reference_time
+        start = time.perf_counter()
+    print(
+        f"Frames 1-{args.frames - 1}: {incremental_time:.3f}s incremental, "
+        f"{full_time:.3f}s full ({full_time / incremental_time:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
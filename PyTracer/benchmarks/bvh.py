@@ -0,0 +1,90 @@
+"""
+Benchmark of the per-ray cost of the linear scan and of the BVH.
+"""
+
+import random
+import time
+
+from src.color import WHITE, Color
+from src.light import Light
+from src.point import Point
+from src.scene import Scene
+from src.sphere import Sphere
+
+N_SPHERES = [10, 100, 1_000, 10_000, 100_000]
+OMEGA = Point(0, 0, 1)
+
+
+def build_scene(n_spheres: int, seed: int = 0) -> Scene:
+    """
+    Create a scene with randomly placed spheres.
+
+    Note: The radius of the spheres shrinks with their number so that
+    the fraction of the box they fill stays constant.
+    """
+    rng = random.Random(seed)
+    scene = Scene((10, 10), (32, 32))
+    rad = 5 * (40 / n_spheres) ** (1 / 3)
+    for _ in range(n_spheres):
+        position = Point(
+            rng.uniform(-50, 50), rng.uniform(-50, 50), rng.uniform(-60, -10)
+        )
+        color = Color(rng.random(), rng.random(), rng.random())
+        scene.spheres.append(Sphere(position, rad * rng.uniform(0.5, 1), color, 0))
+    scene.lights.append(Light(Point(0, 60, 0), WHITE))
+    return scene
+
+
+def time_rays(scene: Scene, n_rays: int) -> tuple[float, float]:
+    """
+    Time closest-hit and shadow queries.
+
+    Returns:
+        tuple[float, float]: Time per primary ray and per shadow ray
+            (in microseconds).
+    """
+    width, height = scene.screen_size
+    pixels = [(i, j) for i in range(height) for j in range(width)]
+    pixels = pixels[:: max(1, len(pixels) // n_rays)][:n_rays]
+    rays = [scene.ray_from_pixel(OMEGA, i, j) for i, j in pixels]
+
+    start = time.perf_counter()
+    hits = [scene.interception(ray) for ray in rays]
+    primary = (time.perf_counter() - start) / len(rays)
+
+    hits = [(p, s) for p, s in hits if p is not None]
+    start = time.perf_counter()
+    for point, sphere in hits:
+        scene.diffused_color(point, sphere)
+    shadow = (time.perf_counter() - start) / max(1, len(hits) * len(scene.lights))
+    return primary * 1e6, shadow * 1e6
+
+
+def main():
+    """
+    Run benchmark.
+    """
+    print(
+        f"{'spheres':>8} {'build (s)':>10} {'nodes':>7} "
+        f"{'linear (us/ray)':>16} {'bvh (us/ray)':>13} "
+        f"{'linear (us/shadow)':>19} {'bvh (us/shadow)':>16}"
+    )
+    for n_spheres in N_SPHERES:
+        scene = build_scene(n_spheres)
+        # Keep the linear scan under a few seconds
+        linear = time_rays(scene, max(8, min(1024, 2_000_000 // n_spheres)))
+
+        start = time.perf_counter()
+        scene.build_bvh()
+        build = time.perf_counter() - start
+        bvh = time_rays(scene, 1024)
+
+        print(
+            f"{n_spheres:>8} {build:>10.3f} {scene.accelerator.n_nodes:>7} "
+            f"{linear[0]:>16.1f} {bvh[0]:>13.1f} "
+            f"{linear[1]:>19.1f} {bvh[1]:>16.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
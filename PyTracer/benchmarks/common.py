@@ -0,0 +1,105 @@
+"""
+Helpers shared by the benchmarks.
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+
+from scenes import SCENES
+from src.color import BLACK, Color
+from src.point import Point
+from src.scene import Scene
+
+from .bvh import OMEGA, build_scene
+
+SceneBuild = Callable[[], tuple[Scene, Point, Color]]
+
+
+def scene_pair(args: argparse.Namespace) -> tuple[Scene, Scene, Point, Color]:
+    """
+    Create a test scene (`args.scene`, `args.depth`, `args.size`) and a
+    copy of it to render as a reference.
+
+    Returns:
+        tuple[Scene, Scene, Point, Color]: Scene, reference scene,
+            observation point and background color.
+    """
+    screen_size = (args.size, args.size)
+    scene, omega, bg_color = SCENES[args.scene](args.depth, screen_size)
+    reference, _, _ = SCENES[args.scene](args.depth, screen_size)
+    return scene, reference, omega, bg_color
+
+
+def timed(func: Callable, *args) -> tuple[object, float]:
+    """
+    Call a function, return its result and duration (in seconds).
+    """
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def same_image(scene: Scene, other: Scene) -> bool:
+    """
+    Indicate if two scenes hold identical images.
+    """
+    return bytes(scene.image.pixels.cast("B")) == bytes(other.image.pixels.cast("B"))
+
+
+def random_scene(
+    n_spheres: int, screen_size: tuple[int, int]
+) -> tuple[Scene, Point, Color]:
+    """
+    Create a random scene (see `benchmarks.bvh.build_scene`).
+    """
+    spheres = build_scene(n_spheres)
+    scene = Scene(spheres.view_size, screen_size)
+    scene.spheres, scene.lights = spheres.spheres, spheres.lights
+    return scene, OMEGA, BLACK
+
+
+def scene_builds(args: argparse.Namespace) -> dict[str, SceneBuild]:
+    """
+    Return the functions creating scene_3, scene_4 (`args.depth`) and
+    random scenes (`args.spheres`) at `args.size`, by name.
+    """
+    screen_size = (args.size, args.size)
+    builds = {
+        name: (lambda name=name: SCENES[name](args.depth, screen_size))
+        for name in ("scene_3", "scene_4")
+    }
+    for n_spheres in args.spheres:
+        builds[f"random ({n_spheres})"] = lambda n=n_spheres: random_scene(
+            n, screen_size
+        )
+    return builds
+
+
+def render_variants(
+    build: SceneBuild, accelerator: str | None, setting: str, values: list
+) -> tuple[list[float], list[bytes]]:
+    """
+    Render a scene once per value of a setting.
+
+    Args:
+        build (SceneBuild): Function creating the scene.
+        accelerator (str | None): "bvh" to build a BVH, `None` for none.
+        setting (str): Attribute of the scene.
+        values (list): Values of the setting.
+
+    Returns:
+        tuple[list[float], list[bytes]]: Render times (in seconds) and
+            images, per value.
+    """
+    times = []
+    images = []
+    for value in values:
+        scene, omega, bg_color = build()
+        if accelerator == "bvh":
+            scene.build_bvh()
+        setattr(scene, setting, value)
+        _, duration = timed(scene.ray_trace, omega, bg_color)
+        times.append(duration)
+        images.append(bytes(scene.image.pixels.cast("B")))
+    return times, images
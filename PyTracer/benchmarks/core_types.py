@@ -0,0 +1,87 @@
+"""
+Micro-benchmarks of the core types (Point, Vector, Color and Ray).
+"""
+
+import sys
+import timeit
+import tracemalloc
+
+from src.color import BLUE, DARK_GREY, WHITE, Color
+from src.light import Light
+from src.point import Point
+from src.ray import Ray
+from src.scene import Scene
+from src.sphere import Sphere
+from src.vector import Vector
+
+N_CALLS = 200_000
+SCENE_1_SIZE = (200, 200)
+
+P_1 = Point(1.0, 2.0, 3.0)
+P_2 = Point(-4.0, 5.0, -6.0)
+V = Vector(0.3, -0.4, 0.5)
+C_1 = Color(0.2, 0.4, 0.6)
+C_2 = Color(0.9, 0.8, 0.7)
+R = Ray(P_1, Vector(1.0, 1.0, 1.0), C_1)
+
+CASES = {
+    "Point(x, y, z)": lambda: Point(1.0, 2.0, 3.0),
+    "Point.distance": lambda: Point.distance(P_1, P_2),
+    "Vector.from_points": lambda: Vector.from_points(P_1, P_2),
+    "Vector.dot_product": lambda: Vector.dot_product(V, V),
+    "Ray(src, dir, color)": lambda: Ray(P_1, Vector(0.3, -0.4, 0.5), C_1),
+    "Ray.follow_ray": lambda: R.follow_ray(2.5),
+    "Color(r, g, b)": lambda: Color(0.2, 0.4, 0.6),
+    "Color * Color": lambda: C_1 * C_2,
+    "Color * float": lambda: C_1 * 0.5,
+    "Color + Color": lambda: C_1 + C_2,
+}
+
+
+def scene_1_peak_memory() -> tuple[float, float]:
+    """
+    Render scene 1 (without reflections) and measure the peak memory.
+
+    Returns:
+        tuple[float, float]: Render time (in seconds) and peak memory
+            (in MB).
+    """
+    tracemalloc.start()
+    scene = Scene((10, 10), SCENE_1_SIZE)
+    scene.spheres = [Sphere(Point(0, 0, -10), 10, BLUE, 0.3)]
+    scene.lights = [Light(Point(0, 5, 0), WHITE)]
+    start = timeit.default_timer()
+    scene.ray_trace(Point(0, 0, 1), DARK_GREY)
+    elapsed = timeit.default_timer() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1e6
+
+
+def main():
+    """
+    Run benchmark.
+    """
+    print(f"{'operation':>22} {'ns/call':>9}")
+    for name, f in CASES.items():
+        best = min(timeit.repeat(f, number=N_CALLS, repeat=5))
+        print(f"{name:>22} {best / N_CALLS * 1e9:>9.1f}")
+
+    print()
+    print(f"{'object':>22} {'bytes':>9}")
+    for name, obj in (("Point", P_1), ("Vector", V), ("Color", C_1), ("Ray", R)):
+        size = sys.getsizeof(obj) + (
+            sys.getsizeof(obj.__dict__) if hasattr(obj, "__dict__") else 0
+        )
+        print(f"{name:>22} {size:>9}")
+
+    print()
+    elapsed, peak = scene_1_peak_memory()
+    print(
+        f"scene_1 {SCENE_1_SIZE[0]}x{SCENE_1_SIZE[1]}: {elapsed:.2f} s "
+        f"(under tracemalloc), peak memory {peak:.3f} MB"
+    )
+
+
+if __name__ == "__main__":
+    main()
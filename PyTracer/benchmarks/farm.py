@@ -0,0 +1,100 @@
+"""
+Render a test scene on a render farm of local worker processes.
+
+Usage (from the PyTracer directory):
+    python -m benchmarks.farm scene_3 --depth 2 --workers 4
+    python -m benchmarks.farm random --kill 1.0 --check
+
+With --kill, a worker is killed after the given time (its tiles are
+re-queued). With --check, the image is compared to a serial render.
+Remote workers can join with `python -m src.distributed HOST:PORT`
+(see --host and --port).
+"""
+
+import argparse
+import multiprocessing
+import os
+import signal
+import threading
+
+from scenes import SCENES
+from src.distributed import RenderFarm, run_worker
+from src.shadow_cache import ShadowCache
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parse the command line arguments.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("scene", choices=list(SCENES), help="scene to render")
+    parser.add_argument("--depth", type=int, default=0, help="reflections")
+    parser.add_argument("--seed", type=int, default=0, help="random scene seed")
+    parser.add_argument("--size", type=int, default=400, help="screen size (pixels)")
+    parser.add_argument("--workers", type=int, default=4, help="local workers")
+    parser.add_argument("--tile-size", type=int, default=32, help="tile size (pixels)")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=0, help="port (default: any)")
+    parser.add_argument(
+        "--timeout", type=float, default=30.0, help="worker timeout (s)"
+    )
+    parser.add_argument("--kill", type=float, help="kill a worker after (s)")
+    parser.add_argument("--check", action="store_true", help="compare to serial")
+    return parser.parse_args()
+
+
+def build(args: argparse.Namespace):
+    """
+    Build the scene to render.
+    """
+    screen_size = (args.size, args.size)
+    if args.scene == "random":
+        return SCENES["random"](args.depth, screen_size, args.seed)
+    return SCENES[args.scene](args.depth, screen_size)
+
+
+def main():
+    """
+    Run render farm.
+    """
+    args = parse_args()
+    scene, omega, bg_color = build(args)
+    scene.shadow_cache_stats = ShadowCache()
+    farm = RenderFarm(
+        scene, omega, bg_color, (args.host, args.port), args.tile_size, args.timeout
+    )
+    print(f"Coordinator listening on {farm.address[0]}:{farm.address[1]}")
+    host = "127.0.0.1" if args.host in ("0.0.0.0", "") else args.host
+    processes = [
+        multiprocessing.Process(
+            target=run_worker, args=(host, farm.address[1]), daemon=True
+        )
+        for _ in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    killer = None
+    if args.kill is not None and processes:
+        killer = threading.Timer(args.kill, os.kill, (processes[0].pid, signal.SIGKILL))
+        killer.start()
+    try:
+        stats = farm.run()
+    finally:
+        if killer is not None:
+            killer.cancel()  # Render done before the kill
+        farm.close()
+        for process in processes:
+            process.join()
+    print(stats.summary())
+
+    if args.check:
+        reference, omega, bg_color = build(args)
+        reference.ray_trace(omega, bg_color, tile_size=args.tile_size)
+        same = bytes(scene.image.pixels.cast("B")) == bytes(
+            reference.image.pixels.cast("B")
+        )
+        print(f"Identical to the serial render: {same}")
+
+
+if __name__ == "__main__":
+    main()
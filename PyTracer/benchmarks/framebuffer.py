@@ -0,0 +1,56 @@
+"""
+Benchmark of the memory used by images.
+"""
+
+import random
+import sys
+import tracemalloc
+
+from src.framebuffer import FrameBuffer
+
+RESOLUTIONS = {
+    "FHD": (1920, 1080),
+    "4K": (3840, 2160),
+    "8K": (7680, 4320),
+}
+
+
+def nested_lists_size(width: int, height: int) -> int:
+    """
+    Estimate the size of a rendered image stored as nested lists (the
+    former `Scene.image`) from the size of one row.
+    """
+    tracemalloc.start()
+    row = [[random.random(), random.random(), random.random()] for _ in range(width)]
+    row_size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del row
+    return row_size * height + sys.getsizeof([None] * height)
+
+
+def framebuffer_size(width: int, height: int) -> int:
+    """
+    Measure the size of a FrameBuffer.
+    """
+    tracemalloc.start()
+    framebuffer = FrameBuffer(width, height)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del framebuffer
+    return size
+
+
+def main():
+    """
+    Run benchmark.
+    """
+    print(f"{'resolution':>10} {'nested lists (MB)':>18} {'framebuffer (MB)':>17}")
+    for name, (width, height) in RESOLUTIONS.items():
+        print(
+            f"{name:>10} {nested_lists_size(width, height) / 1e6:>18.1f} "
+            f"{framebuffer_size(width, height) / 1e6:>17.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
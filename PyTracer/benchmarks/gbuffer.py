@@ -0,0 +1,67 @@
+"""
+Benchmark of shading from a G-buffer (relighting).
+
+Usage (from the PyTracer directory):
+    python -m benchmarks.gbuffer --depth 0 --frames 5 --size 200
+
+The lights of a test scene are dimmed frame by frame. Each frame is
+rendered from the G-buffer of the first one and by a full render, and
+the images are compared.
+"""
+
+import argparse
+
+from scenes import SCENES
+from src.light import Light
+
+from .common import same_image, scene_pair, timed
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parse the command line arguments.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scene", choices=list(SCENES), default="scene_4")
+    parser.add_argument("--depth", type=int, default=0, help="reflections")
+    parser.add_argument("--size", type=int, default=200, help="screen size (pixels)")
+    parser.add_argument("--frames", type=int, default=5, help="number of frames")
+    return parser.parse_args()
+
+
+def dim(lights: list[Light], factor: float) -> list[Light]:
+    """
+    Return the lights with their colors scaled by a factor.
+    """
+    return [Light(light.position, light.color * factor) for light in lights]
+
+
+def main():
+    """
+    Run benchmark.
+    """
+    args = parse_args()
+    scene, reference, omega, bg_color = scene_pair(args)
+    lights = scene.lights
+    scene.use_gbuffer = True
+
+    gbuffer_time = full_time = 0.0
+    print(f"{'frame':>5} {'g-buffer':>9} {'full':>8}  identical")
+    for frame in range(args.frames):
+        scene.lights = reference.lights = dim(lights, 1 - 0.5 * frame / args.frames)
+        _, frame_time = timed(scene.ray_trace, omega, bg_color)
+        _, reference_time = timed(reference.ray_trace, omega, bg_color)
+        identical = same_image(scene, reference)
+        print(f"{frame:>5} {frame_time:>8.3f}s {reference_time:>7.3f}s  {identical}")
+        if frame > 0:
+            gbuffer_time += frame_time
+            full_time += reference_time
+    print(
+        f"G-buffer: {scene.gbuffer.nbytes / 2**20:.1f} MiB. "
+        f"Frames 1-{args.frames - 1}: {gbuffer_time:.3f}s from the G-buffer, "
+        f"{full_time:.3f}s full ({full_time / gbuffer_time:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Benchmark of the uniform grid against the BVH.
+"""
+
+import time
+
+from .bvh import N_SPHERES, build_scene, time_rays
+
+
+def main():
+    """
+    Run benchmark.
+    """
+    print(
+        f"{'spheres':>8} {'resolution':>14} {'grid build (s)':>15} "
+        f"{'cells/ray':>10} {'grid (us/ray)':>14} {'grid (us/shadow)':>17} "
+        f"{'bvh build (s)':>14} {'bvh (us/ray)':>13} {'bvh (us/shadow)':>16}"
+    )
+    for n_spheres in N_SPHERES:
+        scene = build_scene(n_spheres)
+
+        scene.build_grid()
+        grid = scene.accelerator
+        grid_times = time_rays(scene, 1024)
+
+        start = time.perf_counter()
+        scene.build_bvh()
+        bvh_build = time.perf_counter() - start
+        bvh_times = time_rays(scene, 1024)
+
+        resolution = "x".join(str(n) for n in grid.resolution)
+        print(
+            f"{n_spheres:>8} {resolution:>14} {grid.build_time:>15.3f} "
+            f"{grid.cells_per_ray:>10.1f} {grid_times[0]:>14.1f} "
+            f"{grid_times[1]:>17.1f} {bvh_build:>14.3f} {bvh_times[0]:>13.1f} "
+            f"{bvh_times[1]:>16.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
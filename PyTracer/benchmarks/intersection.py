@@ -0,0 +1,70 @@
+"""
+Benchmark of the ray-sphere intersection tests.
+"""
+
+import random
+import time
+
+from src.color import BLACK, WHITE
+from src.point import Point
+from src.ray import Ray
+from src.sphere import Sphere
+from src.vector import Vector
+
+N_RAYS = 1_000
+N_SPHERES = 200
+
+
+def build_tests(seed: int = 0) -> tuple[list[Ray], list[Sphere]]:
+    """
+    Create random rays and spheres.
+    """
+    rng = random.Random(seed)
+    rays = [
+        Ray(
+            Point(0, 0, 1),
+            Vector(rng.uniform(-1, 1), rng.uniform(-1, 1), -1),
+            BLACK,
+        )
+        for _ in range(N_RAYS)
+    ]
+    spheres = [
+        Sphere(
+            Point(rng.uniform(-5, 5), rng.uniform(-5, 5), rng.uniform(-10, -5)),
+            rng.uniform(1, 4),
+            WHITE,
+            0,
+        )
+        for _ in range(N_SPHERES)
+    ]
+    return rays, spheres
+
+
+def tests_per_second(test, rays: list[Ray], spheres: list[Sphere]) -> float:
+    """
+    Measure the number of intersection tests per second.
+    """
+    start = time.perf_counter()
+    for ray in rays:
+        for sphere in spheres:
+            test(sphere, ray)
+    return len(rays) * len(spheres) / (time.perf_counter() - start)
+
+
+def main():
+    """
+    Run benchmark.
+    """
+    rays, spheres = build_tests()
+    hits = sum(s.intersection_distance(r) is not None for r in rays for s in spheres)
+    print(f"{len(rays) * len(spheres)} tests, {hits} hits")
+    for name, test in (
+        ("Sphere.ray_intersection", Sphere.ray_intersection),
+        ("Sphere.intersection_distance", Sphere.intersection_distance),
+    ):
+        best = max(tests_per_second(test, rays, spheres) for _ in range(3))
+        print(f"{name:>30}: {best / 1e6:.2f} Mtests/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Benchmark of the tracing of primary rays by packets.
+
+Usage (from the PyTracer directory):
+    python -m benchmarks.packets --size 160 --spheres 500 2000
+
+scene_3, scene_4 and random scenes (see `benchmarks.bvh`) are rendered
+ray by ray and by packets of 4x4 and 8x8 rays, without and with BVH,
+and the images are compared.
+"""
+
+import argparse
+
+from .common import render_variants, scene_builds
+
+PACKET_SIZES = [0, 4, 8]  # 0: ray by ray
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parse the command line arguments.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--depth", type=int, default=0, help="reflections")
+    parser.add_argument("--size", type=int, default=160, help="screen size (pixels)")
+    parser.add_argument(
+        "--spheres", type=int, nargs="*", default=[500, 2000], help="random scenes"
+    )
+    return parser.parse_args()
+
+
+def main():
+    """
+    Run benchmark.
+    """
+    args = parse_args()
+    print(
+        f"{'scene':>14} {'accelerator':>11} {'rays (s)':>9} {'4x4 (s)':>8} "
+        f"{'8x8 (s)':>8} {'speedup':>8}  identical"
+    )
+    for name, build in scene_builds(args).items():
+        for accelerator in (None, "bvh"):
+            times, images = render_variants(
+                build, accelerator, "packet_size", PACKET_SIZES
+            )
+            print(
+                f"{name:>14} {accelerator or '-':>11} {times[0]:>9.3f} "
+                f"{times[1]:>8.3f} {times[2]:>8.3f} "
+                f"{times[0] / min(times[1:]):>7.2f}x  "
+                f"{all(image == images[0] for image in images)}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Profile the rendering of a test scene.
+
+Usage (from the PyTracer directory):
+    python -m benchmarks.profiler scene_3 --depth 2 --output results/profile
+    python -m benchmarks.profiler random --mode sampling --region 0 50 0 50
+
+Open `results/profile.speedscope.json` in https://www.speedscope.app or
+feed `results/profile.collapsed` to flamegraph.pl.
+"""
+
+import argparse
+
+from scenes import SCENES
+from src.profiling import profile_render
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parse the command line arguments.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("scene", choices=list(SCENES), help="scene to render")
+    parser.add_argument("--depth", type=int, default=0, help="reflections")
+    parser.add_argument("--seed", type=int, default=0, help="random scene seed")
+    parser.add_argument("--size", type=int, default=200, help="screen size (pixels)")
+    parser.add_argument(
+        "--region",
+        nargs=4,
+        type=int,
+        metavar=("I_START", "I_STOP", "J_START", "J_STOP"),
+        help="region of the image to render (default: whole image)",
+    )
+    parser.add_argument(
+        "--mode", choices=["deterministic", "sampling"], default="deterministic"
+    )
+    parser.add_argument(
+        "--interval", type=float, default=0.001, help="sampling interval (s)"
+    )
+    parser.add_argument("--top", type=int, default=20, help="functions to list")
+    parser.add_argument("--output", default="profile", help="output files prefix")
+    return parser.parse_args()
+
+
+def main():
+    """
+    Run profiler.
+    """
+    args = parse_args()
+    screen_size = (args.size, args.size)
+    if args.scene == "random":
+        scene, omega, bg_color = SCENES["random"](args.depth, screen_size, args.seed)
+    else:
+        scene, omega, bg_color = SCENES[args.scene](args.depth, screen_size)
+
+    profile = profile_render(
+        scene,
+        omega,
+        bg_color,
+        tuple(args.region) if args.region else None,
+        args.mode,
+        args.interval,
+    )
+    profile.write(args.output, f"{args.scene}_{args.depth}")
+    print(profile.summary(args.top))
+    print(f"\nWrote {args.output}.collapsed and {args.output}.speedscope.json")
+
+
+if __name__ == "__main__":
+    main()
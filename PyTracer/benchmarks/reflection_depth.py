@@ -0,0 +1,94 @@
+"""
+Benchmark of the adaptive reflection depth.
+
+Usage (from the PyTracer directory):
+    python -m benchmarks.reflection_depth --size 80 --threshold 0.004
+
+`Sphere.reflected_ray` sends a ray back the way it came, so reflected
+rays only hit spheres behind the observation point. The random scene is
+completed with the copies of its spheres mirrored through the
+observation point, so that rays bounce between both halves. It is
+rendered for each maximum depth with and without the threshold, and the
+average number of points reached per pixel hitting a sphere, the render
+times and the largest difference between the images are reported.
+"""
+
+import argparse
+import time
+
+from scenes import SCENES
+from src.point import Point
+from src.sphere import Sphere
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parse the command line arguments.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=80, help="screen size (pixels)")
+    parser.add_argument("--seed", type=int, default=0, help="random scene seed")
+    parser.add_argument(
+        "--threshold", type=float, default=1 / 256, help="reflection threshold"
+    )
+    parser.add_argument("--depths", type=int, nargs="*", default=list(range(3, 9)))
+    parser.add_argument("--repeat", type=int, default=3, help="best of n renders")
+    return parser.parse_args()
+
+
+def build(depth: int, args: argparse.Namespace):
+    """
+    Create the random scene and its mirrored copy.
+    """
+    scene, omega, bg_color = SCENES["random"](depth, (args.size, args.size), args.seed)
+    for sphere in list(scene.spheres):
+        c = sphere.center
+        center = Point(2 * omega.x - c.x, 2 * omega.y - c.y, 2 * omega.z - c.z)
+        scene.spheres.append(
+            Sphere(center, sphere.rad, sphere.color, sphere.reflection)
+        )
+    scene.build_bvh()
+    return scene, omega, bg_color
+
+
+def render(depth: int, threshold: float, args: argparse.Namespace):
+    """
+    Render the scene, return its time (best of `args.repeat`), average
+    depth and pixels.
+    """
+    scene, omega, bg_color = build(depth, args)
+    scene.reflection_threshold = threshold
+    duration = float("inf")
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        scene.ray_trace(omega, bg_color)
+        duration = min(duration, time.perf_counter() - start)
+    pixels = list(scene.image.pixels)
+    # Count the points reached (separate render: counting slows it down)
+    scene.collect_stats = True
+    bounces = scene.ray_trace(omega, bg_color).reflection_bounces
+    return duration, sum(bounces) / max(bounces[0], 1), pixels
+
+
+def main():
+    """
+    Run benchmark.
+    """
+    args = parse_args()
+    print(
+        f"{'depth':>5} {'avg depth':>10} {'adaptive':>9} {'full (s)':>9} "
+        f"{'adaptive (s)':>13} {'saved':>6} {'max diff (/255)':>16}"
+    )
+    for depth in args.depths:
+        full_time, full_depth, full_pixels = render(depth, 0.0, args)
+        time_, average_depth, pixels = render(depth, args.threshold, args)
+        difference = max(abs(a - b) for a, b in zip(full_pixels, pixels)) * 255
+        print(
+            f"{depth:>5} {full_depth:>10.2f} {average_depth:>9.2f} "
+            f"{full_time:>9.3f} {time_:>13.3f} {1 - time_ / full_time:>6.1%} "
+            f"{difference:>16.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark of relighting from per-light visibility masks.
+
+Usage (from the PyTracer directory):
+    python -m benchmarks.relighting --depth 0 --frames 6 --size 200
+
+The lights of a test scene change frame by frame: colors change, the
+first light is switched off and on, and the last one moves every third
+frame. Each frame is rendered by `Relighting` and by a full render, and
+the images are compared.
+"""
+
+import argparse
+
+from scenes import SCENES
+from src.light import Light
+from src.point import Point
+from src.relighting import Relighting
+
+from .common import same_image, scene_pair, timed
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parse the command line arguments.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scene", choices=list(SCENES), default="scene_4")
+    parser.add_argument("--depth", type=int, default=0, help="reflections")
+    parser.add_argument("--size", type=int, default=200, help="screen size (pixels)")
+    parser.add_argument("--frames", type=int, default=6, help="number of frames")
+    return parser.parse_args()
+
+
+def lights_at(lights: list[Light], frame: int) -> list[Light]:
+    """
+    Return the lights at a given frame.
+    """
+    factor = 1 - 0.1 * frame
+    lights = [Light(light.position, light.color * factor) for light in lights]
+    last = lights[-1].position
+    lights[-1] = Light(Point(last.x + frame // 3, last.y, last.z), lights[-1].color)
+    if frame % 2 and len(lights) > 1:
+        del lights[0]
+    return lights
+
+
+def main():
+    """
+    Run benchmark.
+    """
+    args = parse_args()
+    scene, reference, omega, bg_color = scene_pair(args)
+    lights = scene.lights
+    relighting = Relighting(scene, omega)
+
+    relighting_time = full_time = 0.0
+    print(f"{'frame':>5} {'masks':>5} {'relighting':>11} {'full':>8}  identical")
+    for frame in range(args.frames):
+        scene.lights = reference.lights = lights_at(lights, frame)
+        n_masks, frame_time = timed(relighting.render, bg_color)
+        _, reference_time = timed(reference.ray_trace, omega, bg_color)
+        identical = same_image(scene, reference)
+        print(
+            f"{frame:>5} {n_masks:>5} {frame_time:>10.3f}s "
+            f"{reference_time:>7.3f}s  {identical}"
+        )
+        if frame > 0:
+            relighting_time += frame_time
+            full_time += reference_time
+    print(
+        f"Frames 1-{args.frames - 1}: {relighting_time:.3f}s relighting, "
+        f"{full_time:.3f}s full ({full_time / relighting_time:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
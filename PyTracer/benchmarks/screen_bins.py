@@ -0,0 +1,52 @@
+"""
+Benchmark of the screen-space culling of primary rays.
+
+Usage (from the PyTracer directory):
+    python -m benchmarks.screen_bins --size 200 --spheres 50 500
+
+Test scenes and random scenes (see `benchmarks.bvh`, no reflection)
+are rendered with and without `use_screen_bins`, with and without BVH,
+and the images are compared.
+"""
+
+import argparse
+
+from .common import render_variants, scene_builds
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parse the command line arguments.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--depth", type=int, default=0, help="reflections")
+    parser.add_argument("--size", type=int, default=200, help="screen size (pixels)")
+    parser.add_argument(
+        "--spheres", type=int, nargs="*", default=[50, 500], help="random scenes"
+    )
+    return parser.parse_args()
+
+
+def main():
+    """
+    Run benchmark.
+    """
+    args = parse_args()
+    print(
+        f"{'scene':>14} {'accelerator':>11} {'full (s)':>9} {'culled (s)':>11} "
+        f"{'speedup':>8}  identical"
+    )
+    for name, build in scene_builds(args).items():
+        for accelerator in (None, "bvh"):
+            times, images = render_variants(
+                build, accelerator, "use_screen_bins", [False, True]
+            )
+            print(
+                f"{name:>14} {accelerator or '-':>11} {times[0]:>9.3f} "
+                f"{times[1]:>11.3f} {times[0] / times[1]:>7.2f}x  "
+                f"{images[0] == images[1]}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark of the shadow cache.
+"""
+
+import random
+import time
+
+from src.color import Color
+from src.light import Light
+from src.point import Point
+from src.scene import Scene
+from src.sphere import Sphere
+
+N_SPHERES = [10, 40, 200]
+N_LIGHTS = 3
+SCREEN_SIZE = (96, 96)
+OMEGA = Point(0, 0, 1)
+BG_COLOR = Color(0.5, 0.5, 0.5)
+
+
+def build_scene(n_spheres: int, seed: int = 0) -> Scene:
+    """
+    Create a scene with randomly placed spheres casting shadows on a
+    large background sphere.
+    """
+    rng = random.Random(seed)
+    scene = Scene((1, 1), SCREEN_SIZE)
+    scene.spheres.append(Sphere(Point(0, 0, -10040), 10000, Color(0.8, 0.8, 0.8), 0))
+    rad = 3 * (10 / n_spheres) ** (1 / 2)
+    for _ in range(n_spheres):
+        position = Point(
+            rng.uniform(-12, 12), rng.uniform(-12, 12), rng.uniform(-35, -15)
+        )
+        color = Color(rng.random(), rng.random(), rng.random())
+        scene.spheres.append(Sphere(position, rad * rng.uniform(0.5, 1), color, 0))
+    for _ in range(N_LIGHTS):
+        position = Point(rng.uniform(-30, 30), rng.uniform(-30, 30), rng.uniform(0, 20))
+        scene.lights.append(Light(position, Color(0.5, 0.5, 0.5)))
+    return scene
+
+
+def count_tests(scene: Scene) -> tuple[float, int, bytes]:
+    """
+    Render a scene, counting the ray-sphere intersection tests.
+
+    Returns:
+        tuple[float, int, bytes]: Render time (in seconds), number of
+            intersection tests and pixels of the image.
+    """
+    n_tests = 0
+    intersection_distance = Sphere.intersection_distance
+
+    def counted(self, ray, t_max=float("inf")):
+        nonlocal n_tests
+        n_tests += 1
+        return intersection_distance(self, ray, t_max)
+
+    Sphere.intersection_distance = counted
+    try:
+        start = time.perf_counter()
+        scene.ray_trace(OMEGA, BG_COLOR)
+        elapsed = time.perf_counter() - start
+    finally:
+        Sphere.intersection_distance = intersection_distance
+    return elapsed, n_tests, bytes(scene.image.pixels.cast("B"))
+
+
+def main():
+    """
+    Run benchmark.
+    """
+    print(
+        f"{'spheres':>8} {'index':>6} {'shadow tests (off)':>19} "
+        f"{'shadow tests (on)':>18} {'saved':>6} {'hit rate':>9} "
+        f"{'off (s)':>8} {'on (s)':>7} {'same':>5}"
+    )
+    for n_spheres in N_SPHERES:
+        for index in ("none", "bvh"):
+            scene = build_scene(n_spheres)
+            if index == "bvh":
+                scene.build_bvh()
+            # Tests of the primary rays (same with or without the cache)
+            lights, scene.lights = scene.lights, []
+            _, primary_tests, _ = count_tests(scene)
+            scene.lights = lights
+
+            scene.use_shadow_cache = False
+            time_off, tests_off, image_off = count_tests(scene)
+            scene.use_shadow_cache = True
+            time_on, tests_on, image_on = count_tests(scene)
+            tests_off -= primary_tests
+            tests_on -= primary_tests
+            print(
+                f"{n_spheres:>8} {index:>6} {tests_off:>19} {tests_on:>18} "
+                f"{1 - tests_on / tests_off:>6.1%} "
+                f"{scene.shadow_cache_stats.hit_rate:>9.1%} "
+                f"{time_off:>8.2f} {time_on:>7.2f} {image_on == image_off!s:>5}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Reproducible benchmark suite of the test scenes.
+
+Usage (from the PyTracer directory):
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --baseline benchmarks/baseline.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from scenes import SCENES, random_scene
+
+N_MAX_REFLECTIONS = [0, 1, 2, 3]
+SEEDS = [0, 1]
+
+
+def run_case(
+    name: str,
+    n_max_reflections: int,
+    seed: int | None,
+    screen_size: tuple[int, int],
+    n_workers: int,
+    warmup: int,
+    repeats: int,
+    collect_stats: bool = False,
+) -> dict:
+    """
+    Time the rendering of a scene.
+
+    Note: Run in a fresh process so that the peak RSS is the one of the
+    case alone.
+
+    Returns:
+        dict: Times of the repetitions (in seconds), median time,
+            millions of primary rays per second, peak RSS (in MiB) and
+            stats of an extra render (if `collect_stats` is set).
+    """
+
+    def build():
+        if name == "random":
+            return random_scene(n_max_reflections, screen_size, seed)
+        return SCENES[name](n_max_reflections, screen_size)
+
+    times = []
+    for k in range(warmup + repeats):
+        scene, omega, bg_color = build()
+        start = time.perf_counter()
+        scene.ray_trace(omega, bg_color, n_workers)
+        if k >= warmup:
+            times.append(time.perf_counter() - start)
+    median = statistics.median(times)
+    n_rays = screen_size[0] * screen_size[1]
+    result = {
+        "times": times,
+        "median": median,
+        "mrays_per_s": n_rays / median / 1e6,
+        "peak_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+    if collect_stats:
+        # Separate render: the counters slow rendering down
+        scene, omega, bg_color = build()
+        scene.collect_stats = True
+        result["stats"] = scene.ray_trace(omega, bg_color, n_workers).as_dict()
+    return result
+
+
+def cases(names: list[str], depths: list[int], seeds: list[int]):
+    """
+    Generate the benchmark cases.
+
+    Yields:
+        tuple[str, str, int, int | None]: Key, scene name, maximum
+            number of reflections and seed.
+    """
+    for name in names:
+        for n_max_reflections in depths:
+            if name == "random":
+                for seed in seeds:
+                    yield (
+                        f"random_{seed}/{n_max_reflections}",
+                        name,
+                        n_max_reflections,
+                        seed,
+                    )
+            else:
+                yield f"{name}/{n_max_reflections}", name, n_max_reflections, None
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Compare results with a baseline.
+
+    Args:
+        results (dict): Results of the cases.
+        baseline (dict): Results of the baseline cases.
+        threshold (float): Relative slowdown of the median time above
+            which a case is a regression.
+
+    Returns:
+        list[str]: Keys of the regressed cases.
+    """
+    regressions = []
+    print(f"\n{'case':>14} {'baseline (s)':>13} {'median (s)':>11} {'change':>8}")
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        change = result["median"] / baseline[key]["median"] - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(key)
+            flag = "  REGRESSION"
+        print(
+            f"{key:>14} {baseline[key]['median']:>13.3f} "
+            f"{result['median']:>11.3f} {change:>+8.1%}{flag}"
+        )
+    return regressions
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parse the command line arguments.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--scenes", nargs="+", default=list(SCENES), help="scenes to render"
+    )
+    parser.add_argument(
+        "--depths", nargs="+", type=int, default=N_MAX_REFLECTIONS, help="reflections"
+    )
+    parser.add_argument(
+        "--seeds", nargs="+", type=int, default=SEEDS, help="random scene seeds"
+    )
+    parser.add_argument("--size", type=int, default=100, help="screen size (pixels)")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed renders")
+    parser.add_argument("--repeats", type=int, default=5, help="timed renders")
+    parser.add_argument(
+        "--stats", action="store_true", help="add render stats to the results"
+    )
+    parser.add_argument("--output", help="JSON file to write the results to")
+    parser.add_argument("--baseline", help="JSON results to compare with")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="regression threshold"
+    )
+    return parser.parse_args()
+
+
+def main():
+    """
+    Run benchmark.
+    """
+    args = parse_args()
+    screen_size = (args.size, args.size)
+
+    print(
+        f"{'case':>14} {'median (s)':>11} {'min (s)':>8} {'max (s)':>8} "
+        f"{'Mrays/s':>8} {'peak RSS (MiB)':>15}"
+    )
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    for key, name, n_max_reflections, seed in cases(
+        args.scenes, args.depths, args.seeds
+    ):
+        with ProcessPoolExecutor(1, mp_context=context) as executor:
+            result = executor.submit(
+                run_case,
+                name,
+                n_max_reflections,
+                seed,
+                screen_size,
+                args.workers,
+                args.warmup,
+                args.repeats,
+                args.stats,
+            ).result()
+        results[key] = result
+        print(
+            f"{key:>14} {result['median']:>11.3f} {min(result['times']):>8.3f} "
+            f"{max(result['times']):>8.3f} {result['mrays_per_s']:>8.4f} "
+            f"{result['peak_rss_mib']:>15.1f}"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "python": sys.version,
+                    "platform": platform.platform(),
+                    "screen_size": screen_size,
+                    "workers": args.workers,
+                    "warmup": args.warmup,
+                    "repeats": args.repeats,
+                    "results": results,
+                },
+                file,
+                indent=2,
+            )
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline["results"], args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
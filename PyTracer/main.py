@@ -3,58 +3,46 @@ Main file.
 """
 
 import os
-import time
-import random
 from datetime import datetime
 
-from src.color import Color, DARK_GREY, WHITE, RED, BLUE, GREEN
-from src.light import Light
+import scenes
+from src.color import Color
+from src.framebuffer import FrameBuffer
+from src.image_writer import image_writer
 from src.point import Point
-from src.scene import Scene, SceneWithReflections
-from src.sphere import Sphere
+from src.scene import Scene
 
-SCENE_W = 10
-SCENE_H = 10
+ENGINE = "python"  # "python" or "numpy"
+N_WORKERS = 1  # Number of worker processes (python engine only)
+TIME_BUDGET = None  # Seconds, enables progressive rendering (python engine only)
+PROFILE = None  # "deterministic" or "sampling" (python engine, one worker only)
 
-IMG_W = 2000
-IMG_H = 2000
 
-
-def time_func(f):
+def ray_trace(scene: Scene, omega: Point, bg_color: Color):
     """
-    Time function call.
+    Perform ray-tracing with the selected engine.
     """
-    start = time.time()
-    f()
-    stop = time.time()
-    print(f"Function {f.__name__!r} executed in {(stop - start):.4f} s")
+    if ENGINE == "numpy":
+        from src.numpy_tracer import NumpyTracer  # pylint: disable=import-outside-toplevel
+
+        NumpyTracer(scene).ray_trace(omega, bg_color)
+    elif TIME_BUDGET is not None:
+        stride = scene.ray_trace_progressive(omega, bg_color, time_budget=TIME_BUDGET)
+        print(f"Progressive rendering stopped at stride {stride}")
+    else:
+        scene.ray_trace(omega, bg_color, N_WORKERS, profile=PROFILE)
+        if scene.profile is not None:
+            print(scene.profile.summary())
 
 
 def scene_1(n_max_reflections=0):
     """
     Handle test scene 1.
     """
-    # Create scene
-    scene = (
-        SceneWithReflections(
-            (SCENE_W, SCENE_H),
-            (IMG_W, IMG_H),
-            n_max_reflections,
-        )
-        if n_max_reflections > 0
-        else Scene((SCENE_W, SCENE_H), (IMG_W, IMG_H))
-    )
-
-    # Add objects
-    scene.spheres = [Sphere(Point(0, 0, -10), 10, BLUE, 0.3)]
-
-    # Add lights
-    scene.lights = [
-        Light(Point(0, 5, 0), WHITE),
-    ]
+    scene, omega, bg_color = scenes.scene_1(n_max_reflections)
 
     # Perform ray-tracing
-    scene.ray_trace(Point(0, 0, 1), DARK_GREY)
+    ray_trace(scene, omega, bg_color)
 
     # Display
     scene.plot(f"results/scene_1_{n_max_reflections}.png")
@@ -64,28 +52,10 @@ def scene_2(n_max_reflections=0):
     """
     Handle test scene 2.
     """
-    # Create scene
-    scene = (
-        SceneWithReflections(
-            (SCENE_W, SCENE_H),
-            (IMG_W, IMG_H),
-            n_max_reflections,
-        )
-        if n_max_reflections > 0
-        else Scene((SCENE_W, SCENE_H), (IMG_W, IMG_H))
-    )
-
-    # Add objects
-    scene.spheres = [Sphere(Point(0, 0, -10), 10, Color.from_rgb(8, 188, 254), 0.3)]
-
-    # Add lights
-    scene.lights = [
-        Light(Point(-5, 5, 0), WHITE),
-        Light(Point(5, 5, 0), GREEN),
-    ]
+    scene, omega, bg_color = scenes.scene_2(n_max_reflections)
 
     # Perform ray-tracing
-    scene.ray_trace(Point(0, 0, 1), DARK_GREY)
+    ray_trace(scene, omega, bg_color)
 
     # Display
     scene.plot(f"results/scene_2_{n_max_reflections}.png")
@@ -95,30 +65,10 @@ def scene_3(n_max_reflections=0):
     """
     Handle test scene 3.
     """
-    # Create scene
-    scene = (
-        SceneWithReflections(
-            (SCENE_W, SCENE_H),
-            (IMG_W, IMG_H),
-            n_max_reflections,
-        )
-        if n_max_reflections > 0
-        else Scene((SCENE_W, SCENE_H), (IMG_W, IMG_H))
-    )
-
-    # Add objects
-    scene.spheres = [
-        Sphere(Point(-10, 0, -10), 8, Color.from_rgb(8, 188, 254), 0.3),
-        Sphere(Point(10, 0, -10), 8, Color.from_rgb(8, 8, 255), 0.3),
-    ]
-
-    # Add lights
-    scene.lights = [
-        Light(Point(0, 5, 0), WHITE),
-    ]
+    scene, omega, bg_color = scenes.scene_3(n_max_reflections)
 
     # Perform ray-tracing
-    scene.ray_trace(Point(0, 0, 1), DARK_GREY)
+    ray_trace(scene, omega, bg_color)
 
     # Display
     scene.plot(f"results/scene_3_{n_max_reflections}.png")
@@ -128,31 +78,10 @@ def scene_4(n_max_reflections=0):
     """
     Handle test scene 4.
     """
-    # Create scene
-    scene = (
-        SceneWithReflections(
-            (SCENE_W, SCENE_H),
-            (IMG_W, IMG_H),
-            n_max_reflections,
-        )
-        if n_max_reflections > 0
-        else Scene((SCENE_W, SCENE_H), (IMG_W, IMG_H))
-    )
-
-    # Add objects
-    scene.spheres = [
-        Sphere(Point(-10, 0, -10), 8, Color.from_rgb(8, 188, 254), 0.3),
-        Sphere(Point(10, 0, -10), 8, Color.from_rgb(8, 8, 255), 0.3),
-    ]
-
-    # Add lights
-    scene.lights = [
-        Light(Point(-5, 5, 0), WHITE),
-        Light(Point(5, 5, 0), GREEN),
-    ]
+    scene, omega, bg_color = scenes.scene_4(n_max_reflections)
 
     # Perform ray-tracing
-    scene.ray_trace(Point(0, 0, 1), DARK_GREY)
+    ray_trace(scene, omega, bg_color)
 
     # Display
     scene.plot(f"results/scene_4_{n_max_reflections}.png")
@@ -162,51 +91,10 @@ def random_scene(n_max_reflections=0):
     """
     Handle random scenes.
     """
-    # Create scene
-    scene = (
-        SceneWithReflections((SCENE_W, SCENE_H), (IMG_W, IMG_H), n_max_reflections)
-        if n_max_reflections > 0
-        else Scene((SCENE_W, SCENE_H), (IMG_W, IMG_H))
-    )
-
-    min_xy = -50
-    min_z = -20
-
-    max_xy = 50
-    max_z = -10
-
-    range_size_xy = max_xy - min_xy
-    range_size_z = max_z - min_z
-
-    # Add objects
-    nb_spheres = 40
-    for _ in range(nb_spheres):
-        position = Point(
-            random.random() * range_size_xy + min_xy,
-            random.random() * range_size_xy + min_xy,
-            random.random() * range_size_z + min_z,
-        )
-        size = random.random() * 5 + 1
-        color = Color(random.random(), random.random(), random.random())
-        reflection = random.random()
-        sphere = Sphere(position, size, color, reflection)
-        scene.spheres.append(sphere)
-
-    # Add lights
-    nb_lights = 3
-    for _ in range(nb_lights):
-        position = Point(
-            random.random() * range_size_xy + min_xy,
-            random.random() * range_size_xy + min_xy,
-            random.random() * range_size_z + min_z,
-        )
-        color = Color(random.random(), random.random(), random.random())
-        light = Light(position, color)
-        scene.lights.append(light)
+    scene, omega, bg_color = scenes.random_scene(n_max_reflections)
 
     # Perform ray-tracing
-    # scene.ray_trace(Point([0, 0, 1]), Color([0.5, 0.5, 0.5]))
-    scene.ray_trace(Point(0, 0, 1), Color(0.5, 0.5, 0.5))
+    ray_trace(scene, omega, bg_color)
 
     # Plot
     scene.plot(
@@ -214,14 +102,31 @@ def random_scene(n_max_reflections=0):
     )
 
 
+def poster(n_max_reflections=0, size=30000):
+    """
+    Handle a poster of test scene 1, rendered out of core: pixels are
+    stored in a memory-mapped file and the PNG is written row by row.
+    An interrupted render resumes from its checkpoint.
+    """
+    image = FrameBuffer.memory_mapped("results/poster.raw", size, size)
+    scene, omega, bg_color = scenes.scene_1(n_max_reflections, (size, size), image)
+
+    # Perform ray-tracing
+    with image_writer("results/poster.png", size, size) as writer:
+        scene.ray_trace(
+            omega, bg_color, N_WORKERS, writer=writer, checkpoint="results/poster"
+        )
+    image.release()
+
+
 if __name__ == "__main__":
     # Change working directory
     abspath = os.path.abspath(__file__)
     dname = os.path.dirname(abspath)
     os.chdir(dname)
 
-    # Test
-    time_func(scene_1)
+    # Test (see benchmarks.suite for timings)
+    scene_1()
     # scene_2(0)
     # scene_3(0)
     # scene_4(0)
@@ -234,3 +139,5 @@ if __name__ == "__main__":
 
     # for _ in range(10):
     #     random_scene()
+
+    # poster()
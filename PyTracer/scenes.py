@@ -0,0 +1,220 @@
+"""
+Test scenes.
+"""
+
+import random
+
+from src.color import BLUE, DARK_GREY, GREEN, WHITE, Color
+from src.framebuffer import FrameBuffer
+from src.light import Light
+from src.point import Point
+from src.scene import Scene, SceneWithReflections
+from src.sphere import Sphere
+
+SCENE_W = 10
+SCENE_H = 10
+
+IMG_W = 2000
+IMG_H = 2000
+
+OMEGA = Point(0, 0, 1)
+
+
+def empty_scene(
+    n_max_reflections: int = 0,
+    screen_size: tuple[int, int] = (IMG_W, IMG_H),
+    image: FrameBuffer | None = None,
+) -> Scene:
+    """
+    Create an empty scene (with reflections if `n_max_reflections` > 0).
+    """
+    return (
+        SceneWithReflections((SCENE_W, SCENE_H), screen_size, n_max_reflections, image)
+        if n_max_reflections > 0
+        else Scene((SCENE_W, SCENE_H), screen_size, image)
+    )
+
+
+def scene_1(
+    n_max_reflections: int = 0,
+    screen_size: tuple[int, int] = (IMG_W, IMG_H),
+    image: FrameBuffer | None = None,
+) -> tuple[Scene, Point, Color]:
+    """
+    Create test scene 1.
+
+    Returns:
+        tuple[Scene, Point, Color]: Scene, observation point and
+            background color.
+    """
+    scene = empty_scene(n_max_reflections, screen_size, image)
+
+    # Add objects
+    scene.spheres = [Sphere(Point(0, 0, -10), 10, BLUE, 0.3)]
+
+    # Add lights
+    scene.lights = [
+        Light(Point(0, 5, 0), WHITE),
+    ]
+
+    return scene, OMEGA, DARK_GREY
+
+
+def scene_2(
+    n_max_reflections: int = 0,
+    screen_size: tuple[int, int] = (IMG_W, IMG_H),
+    image: FrameBuffer | None = None,
+) -> tuple[Scene, Point, Color]:
+    """
+    Create test scene 2.
+
+    Returns:
+        tuple[Scene, Point, Color]: Scene, observation point and
+            background color.
+    """
+    scene = empty_scene(n_max_reflections, screen_size, image)
+
+    # Add objects
+    scene.spheres = [Sphere(Point(0, 0, -10), 10, Color.from_rgb(8, 188, 254), 0.3)]
+
+    # Add lights
+    scene.lights = [
+        Light(Point(-5, 5, 0), WHITE),
+        Light(Point(5, 5, 0), GREEN),
+    ]
+
+    return scene, OMEGA, DARK_GREY
+
+
+def scene_3(
+    n_max_reflections: int = 0,
+    screen_size: tuple[int, int] = (IMG_W, IMG_H),
+    image: FrameBuffer | None = None,
+) -> tuple[Scene, Point, Color]:
+    """
+    Create test scene 3.
+
+    Returns:
+        tuple[Scene, Point, Color]: Scene, observation point and
+            background color.
+    """
+    scene = empty_scene(n_max_reflections, screen_size, image)
+
+    # Add objects
+    scene.spheres = [
+        Sphere(Point(-10, 0, -10), 8, Color.from_rgb(8, 188, 254), 0.3),
+        Sphere(Point(10, 0, -10), 8, Color.from_rgb(8, 8, 255), 0.3),
+    ]
+
+    # Add lights
+    scene.lights = [
+        Light(Point(0, 5, 0), WHITE),
+    ]
+
+    return scene, OMEGA, DARK_GREY
+
+
+def scene_4(
+    n_max_reflections: int = 0,
+    screen_size: tuple[int, int] = (IMG_W, IMG_H),
+    image: FrameBuffer | None = None,
+) -> tuple[Scene, Point, Color]:
+    """
+    Create test scene 4.
+
+    Returns:
+        tuple[Scene, Point, Color]: Scene, observation point and
+            background color.
+    """
+    scene = empty_scene(n_max_reflections, screen_size, image)
+
+    # Add objects
+    scene.spheres = [
+        Sphere(Point(-10, 0, -10), 8, Color.from_rgb(8, 188, 254), 0.3),
+        Sphere(Point(10, 0, -10), 8, Color.from_rgb(8, 8, 255), 0.3),
+    ]
+
+    # Add lights
+    scene.lights = [
+        Light(Point(-5, 5, 0), WHITE),
+        Light(Point(5, 5, 0), GREEN),
+    ]
+
+    return scene, OMEGA, DARK_GREY
+
+
+def random_scene(
+    n_max_reflections: int = 0,
+    screen_size: tuple[int, int] = (IMG_W, IMG_H),
+    seed: int | None = None,
+    image: FrameBuffer | None = None,
+) -> tuple[Scene, Point, Color]:
+    """
+    Create a random scene.
+
+    Args:
+        n_max_reflections (int, optional): Maximum number of
+            reflections. Defaults to 0.
+        screen_size (tuple[int, int], optional): Size of the screen.
+            Defaults to (IMG_W, IMG_H).
+        seed (int | None, optional): Seed of the random generator.
+            Defaults to None.
+        image (FrameBuffer | None, optional): Image of the scene (e.g.:
+            a memory-mapped framebuffer). Defaults to None (a black
+            image is allocated).
+
+    Returns:
+        tuple[Scene, Point, Color]: Scene, observation point and
+            background color.
+    """
+    rng = random.Random(seed)
+    scene = empty_scene(n_max_reflections, screen_size, image)
+
+    min_xy = -50
+    min_z = -20
+
+    max_xy = 50
+    max_z = -10
+
+    range_size_xy = max_xy - min_xy
+    range_size_z = max_z - min_z
+
+    # Add objects
+    nb_spheres = 40
+    for _ in range(nb_spheres):
+        position = Point(
+            rng.random() * range_size_xy + min_xy,
+            rng.random() * range_size_xy + min_xy,
+            rng.random() * range_size_z + min_z,
+        )
+        size = rng.random() * 5 + 1
+        color = Color(rng.random(), rng.random(), rng.random())
+        reflection = rng.random()
+        sphere = Sphere(position, size, color, reflection)
+        scene.spheres.append(sphere)
+
+    # Add lights
+    nb_lights = 3
+    for _ in range(nb_lights):
+        position = Point(
+            rng.random() * range_size_xy + min_xy,
+            rng.random() * range_size_xy + min_xy,
+            rng.random() * range_size_z + min_z,
+        )
+        color = Color(rng.random(), rng.random(), rng.random())
+        light = Light(position, color)
+        scene.lights.append(light)
+
+    # Build spatial index
+    scene.build_bvh()
+
+    return scene, OMEGA, Color(0.5, 0.5, 0.5)
+
+
+SCENES = {
+    "scene_1": scene_1,
+    "scene_2": scene_2,
+    "scene_3": scene_3,
+    "scene_4": scene_4,
+    "random": random_scene,
+}
@@ -0,0 +1,157 @@
+"""
+This module contains the adaptive (edge-aware) renderer.
+"""
+
+from __future__ import annotations
+
+from itertools import pairwise
+from typing import TYPE_CHECKING
+
+from .color import Color
+from .point import Point
+from .shadow_cache import ShadowCache
+from .sphere import Sphere
+from .stats import collect_stats
+
+if TYPE_CHECKING:
+    from .scene import Scene
+
+
+def grid_coordinates(size: int, block_size: int) -> list[int]:
+    """
+    Return the coordinates of the coarse samples along an axis.
+
+    Args:
+        size (int): Number of pixels along the axis.
+        block_size (int): Distance between the samples (in pixels).
+
+    Returns:
+        list[int]: Coordinates, including the first and last pixels.
+    """
+    return [*range(0, size - 1, block_size), size - 1]
+
+
+def is_uniform(samples: list[tuple[Color, Sphere | None]], tolerance: float) -> bool:
+    """
+    Indicate if samples see the same sphere with close colors.
+
+    Args:
+        samples (list[tuple[Color, Sphere | None]]): Colors and spheres
+            of the samples.
+        tolerance (float): Maximum difference between the components of
+            the colors.
+
+    Returns:
+        bool: `True` if the samples are uniform, `False` otherwise.
+    """
+    first_sphere = samples[0][1]
+    if any(sphere is not first_sphere for _, sphere in samples[1:]):
+        return False
+    for component in ("r", "g", "b"):
+        values = [getattr(color, component) for color, _ in samples]
+        if max(values) - min(values) > tolerance:
+            return False
+    return True
+
+
+def ray_trace_adaptive(
+    scene: Scene,
+    omega: Point,
+    bg_color: Color,
+    tolerance: float = 0.02,
+    block_size: int = 8,
+) -> int:
+    """
+    Generate image of the scene with ray tracing, tracing every pixel
+    only around edges.
+
+    Note: The corners of blocks of `block_size` pixels are traced
+    first. Blocks whose corners see the same sphere (or the background)
+    with colors within `tolerance` are bilinearly interpolated; the
+    other blocks (silhouettes, shadow boundaries, reflections) are
+    traced pixel by pixel. Features smaller than a block that fall
+    between the corners of a uniform block are missed. The stats of the
+    render (if `collect_stats` is set) are stored in `scene.stats`.
+
+    Args:
+        scene (Scene): Scene.
+        omega (Point): Observation point.
+        bg_color (Color): Background color.
+        tolerance (float, optional): Maximum difference between the
+            color components of the corners of an interpolated block.
+            Defaults to 0.02.
+        block_size (int, optional): Distance between the coarse samples
+            (in pixels). Defaults to 8.
+
+    Returns:
+        int: Number of primary rays traced.
+    """
+    with collect_stats(scene):
+        return _ray_trace_adaptive(scene, omega, bg_color, tolerance, block_size)
+
+
+def _ray_trace_adaptive(
+    scene: Scene,
+    omega: Point,
+    bg_color: Color,
+    tolerance: float,
+    block_size: int,
+) -> int:
+    """
+    Generate image of the scene (see `ray_trace_adaptive`).
+    """
+    width, height = scene.screen_size
+    image = scene.image
+    scene.shadow_cache_stats = shadow_cache = ShadowCache()
+    if not scene.use_shadow_cache:
+        shadow_cache = None
+    traced = bytearray(width * height)  # Pixels traced (not interpolated)
+
+    def trace(i: int, j: int) -> tuple[Color, Sphere | None]:
+        color, sphere = scene.pixel_sample(omega, bg_color, i, j, shadow_cache)
+        image.set_pixel(i, j, color.r, color.g, color.b)
+        traced[i * width + j] = 1
+        return color, sphere
+
+    rows = grid_coordinates(height, block_size)
+    cols = grid_coordinates(width, block_size)
+    samples = {(i, j): trace(i, j) for i in rows for j in cols}
+    n_rays = len(samples)
+
+    # Pairs of consecutive coordinates bounding the blocks (inclusive)
+    row_pairs = list(pairwise(rows)) or [(0, 0)]
+    col_pairs = list(pairwise(cols)) or [(0, 0)]
+    for i_0, i_1 in row_pairs:
+        for j_0, j_1 in col_pairs:
+            corners = [
+                samples[(i_0, j_0)],
+                samples[(i_0, j_1)],
+                samples[(i_1, j_0)],
+                samples[(i_1, j_1)],
+            ]
+            if not is_uniform(corners, tolerance):
+                for i in range(i_0, i_1 + 1):
+                    for j in range(j_0, j_1 + 1):
+                        if not traced[i * width + j]:
+                            trace(i, j)
+                            n_rays += 1
+                continue
+            (c_00, _), (c_01, _), (c_10, _), (c_11, _) = corners
+            for i in range(i_0, i_1 + 1):
+                v = (i - i_0) / (i_1 - i_0) if i_1 > i_0 else 0.0
+                for j in range(j_0, j_1 + 1):
+                    if traced[i * width + j]:
+                        continue
+                    u = (j - j_0) / (j_1 - j_0) if j_1 > j_0 else 0.0
+                    w_00 = (1 - u) * (1 - v)
+                    w_01 = u * (1 - v)
+                    w_10 = (1 - u) * v
+                    w_11 = u * v
+                    image.set_pixel(
+                        i,
+                        j,
+                        w_00 * c_00.r + w_01 * c_01.r + w_10 * c_10.r + w_11 * c_11.r,
+                        w_00 * c_00.g + w_01 * c_01.g + w_10 * c_10.g + w_11 * c_11.g,
+                        w_00 * c_00.b + w_01 * c_01.b + w_10 * c_10.b + w_11 * c_11.b,
+                    )
+    return n_rays
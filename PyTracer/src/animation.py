@@ -0,0 +1,383 @@
+"""
+This module contains the Animation class.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from math import acos, asin, inf, sqrt
+from typing import TYPE_CHECKING
+
+from .bvh import BVH
+from .color import Color
+from .framebuffer import FrameBuffer
+from .grid import UniformGrid
+from .light import Light
+from .point import Point
+from .screen_bins import MARGIN, Geometry, screen_bounds
+from .shadow_cache import ShadowCache
+from .sphere import Sphere
+
+if TYPE_CHECKING:
+    from .scene import Scene
+
+SphereState = tuple[float, float, float, float, float, float, float, float]
+
+
+def sphere_state(sphere: Sphere) -> SphereState:
+    """
+    Return the parameters of a sphere (center, radius, color and
+    reflection).
+    """
+    c, color = sphere.center, sphere.color
+    return (c.x, c.y, c.z, sphere.rad, color.r, color.g, color.b, sphere.reflection)
+
+
+def light_state(light: Light) -> tuple[float, ...]:
+    """
+    Return the parameters of a light (position and color).
+    """
+    p, color = light.position, light.color
+    return (p.x, p.y, p.z, color.r, color.g, color.b)
+
+
+@dataclass
+class SceneDelta:
+    """
+    Class representing the changes of a scene between two frames.
+
+    Note: Keys are indices in the lists of the scene before the changes.
+    A sphere (or light) replaces the one at its index, or is appended if
+    the index is past the end of the list. `None` removes the sphere (or
+    light) at its index.
+    """
+
+    spheres: dict[int, Sphere | None] = field(default_factory=dict)
+    lights: dict[int, Light | None] = field(default_factory=dict)
+
+    def apply(self, scene: Scene):
+        """
+        Apply the changes to a scene.
+
+        Args:
+            scene (Scene): Scene.
+        """
+        _apply(scene.spheres, self.spheres)
+        _apply(scene.lights, self.lights)
+
+
+def _apply(items: list, changes: dict):
+    """
+    Apply changes (see `SceneDelta`) to a list.
+    """
+    n_items = len(items)
+    for index, item in sorted(changes.items()):
+        if item is None:
+            continue
+        if index < n_items:
+            items[index] = item
+        else:
+            items.append(item)
+    for index in sorted(
+        (index for index, item in changes.items() if item is None and index < n_items),
+        reverse=True,
+    ):
+        del items[index]
+
+
+def _segment_hits_sphere(a: Point, b: Point, geometry: Geometry) -> bool:
+    """
+    Indicate if a segment may cross a sphere (radius widened by
+    `MARGIN`).
+    """
+    cx, cy, cz, rad = geometry
+    abx, aby, abz = b.x - a.x, b.y - a.y, b.z - a.z
+    acx, acy, acz = cx - a.x, cy - a.y, cz - a.z
+    length2 = abx * abx + aby * aby + abz * abz
+    t = (acx * abx + acy * aby + acz * abz) / length2 if length2 else 0.0
+    t = 0.0 if t < 0 else 1.0 if t > 1 else t
+    dx, dy, dz = acx - t * abx, acy - t * aby, acz - t * abz
+    rad *= 1 + MARGIN
+    return dx * dx + dy * dy + dz * dz <= rad * rad
+
+
+def _half_line_hits_sphere(a: Point, b: Point, geometry: Geometry) -> bool:
+    """
+    Indicate if the half-line from a through b may cross a sphere
+    (radius widened by `MARGIN`).
+    """
+    abx, aby, abz = b.x - a.x, b.y - a.y, b.z - a.z
+    cx, cy, cz, _ = geometry
+    t = (cx - a.x) * abx + (cy - a.y) * aby + (cz - a.z) * abz
+    if t <= 0:
+        return _segment_hits_sphere(a, a, geometry)
+    length2 = abx * abx + aby * aby + abz * abz
+    far = t / length2 if length2 else 0.0
+    return _segment_hits_sphere(
+        a, Point(a.x + far * abx, a.y + far * aby, a.z + far * abz), geometry
+    )
+
+
+def _may_shadow(light: Point, occluder: Geometry, sphere: Geometry) -> bool:
+    """
+    Indicate if a sphere (occluder) may cast a shadow of a light on
+    another sphere: the cones from the light tangent to each sphere
+    overlap.
+    """
+    angles = []
+    directions = []
+    for cx, cy, cz, rad in (occluder, sphere):
+        dx, dy, dz = cx - light.x, cy - light.y, cz - light.z
+        distance = sqrt(dx * dx + dy * dy + dz * dz)
+        rad *= 1 + MARGIN
+        if distance <= rad:
+            return True  # Light inside the sphere
+        angles.append(asin(rad / distance))
+        directions.append((dx / distance, dy / distance, dz / distance))
+    (ux, uy, uz), (vx, vy, vz) = directions
+    cosine = max(-1.0, min(1.0, ux * vx + uy * vy + uz * vz))
+    return acos(cosine) <= angles[0] + angles[1] + MARGIN
+
+
+class Animation:
+    """
+    Class representing a sequence of frames of a scene.
+
+    Note: Only the pixels that the changes of a frame may affect are
+    traced again, the others keep their color from the previous frame.
+    A pixel may be affected if its primary ray may hit a changed sphere
+    (screen-space bounds of the sphere before and after the change), if
+    a changed sphere may shadow the point it sees (shadow cones from the
+    lights, then the shadow rays of the pixel), or if its reflected ray
+    hits a sphere or may hit a changed sphere. Every pixel seeing a
+    sphere is affected by a change of the lights. The tests are
+    conservative and the pixels are traced by `Scene.pixel_sample`, so
+    each frame is identical to a full render. Changes of the color or
+    reflection of a sphere only affect the pixels seeing it (or its
+    reflection).
+    """
+
+    def __init__(self, scene: Scene, omega: Point, bg_color: Color):
+        """
+        Initialise Animation instance.
+
+        Args:
+            scene (Scene): Scene (the frames are rendered in its image).
+            omega (Point): Observation point.
+            bg_color (Color): Background color.
+        """
+        self.scene: Scene = scene
+        self.omega: Point = omega
+        self.bg_color: Color = bg_color
+        self.n_frames: int = 0  # Number of frames rendered
+        self.n_traced: list[int] = []  # Number of pixels traced per frame
+        width, height = scene.screen_size
+        # Index of the sphere seen through each pixel (-1: background)
+        self._hits: array = array("i", [-1]) * (width * height)
+        self._spheres: list[SphereState] = []  # Of the last frame
+        self._lights: list[tuple[float, ...]] = []  # Of the last frame
+
+    @property
+    def image(self) -> FrameBuffer:
+        """
+        Last frame.
+        """
+        return self.scene.image
+
+    def render(self, delta: SceneDelta | None = None) -> int:
+        """
+        Render the next frame.
+
+        Note: Spheres and lights changed directly (without a delta) are
+        detected as well.
+
+        Args:
+            delta (SceneDelta | None, optional): Changes of the scene
+                since the previous frame. Defaults to None.
+
+        Returns:
+            int: Number of pixels traced.
+        """
+        scene = self.scene
+        width, height = scene.screen_size
+        if delta is not None:
+            delta.apply(scene)
+        spheres = [sphere_state(sphere) for sphere in scene.spheres]
+        lights = [light_state(light) for light in scene.lights]
+        if self.n_frames == 0:
+            dirty = bytearray(b"\x01") * (width * height)
+        else:
+            dirty = self._dirty_pixels(spheres, lights)
+        self._spheres = spheres
+        self._lights = lights
+        n_traced = self._trace(dirty)
+        self.n_frames += 1
+        self.n_traced.append(n_traced)
+        return n_traced
+
+    def frames(self, deltas: Iterable[SceneDelta | None]) -> Iterator[FrameBuffer]:
+        """
+        Render the frames of a sequence.
+
+        Args:
+            deltas (Iterable[SceneDelta | None]): Changes of the scene
+                before each frame (after the first one).
+
+        Returns:
+            Iterator[FrameBuffer]: Image after each frame (the same
+                framebuffer, updated in place).
+        """
+        if self.n_frames == 0:
+            self.render()
+            yield self.image
+        for delta in deltas:
+            self.render(delta)
+            yield self.image
+
+    def _rebuild_accelerator(self):
+        """
+        Rebuild the spatial index of the scene over the moved spheres.
+        """
+        accelerator = self.scene.accelerator
+        if isinstance(accelerator, BVH):
+            self.scene.accelerator = BVH(
+                self.scene.spheres, accelerator.max_leaf_size, accelerator.n_bins
+            )
+        elif isinstance(accelerator, UniformGrid):
+            self.scene.accelerator = UniformGrid(
+                self.scene.spheres, accelerator.density, accelerator.max_resolution
+            )
+
+    def _dirty_pixels(
+        self, spheres: list[SphereState], lights: list[tuple[float, ...]]
+    ) -> bytearray:
+        """
+        Return the mask of the pixels that may differ from the previous
+        frame.
+        """
+        scene, omega = self.scene, self.omega
+        width, height = scene.screen_size
+        dirty = bytearray(width * height)
+        hits = self._hits
+        n_spheres = max(len(spheres), len(self._spheres))
+        changed = set()
+        seen = set()  # Geometries of the changed spheres, before and after
+        moved = set()  # Same, for the spheres moved, added or removed only
+        for index in range(n_spheres):
+            old = self._spheres[index] if index < len(self._spheres) else None
+            new = spheres[index] if index < len(spheres) else None
+            if old == new:
+                continue
+            changed.add(index)
+            geometries = {state[:4] for state in (old, new) if state is not None}
+            seen |= geometries
+            if old is None or new is None or old[:4] != new[:4]:
+                moved |= geometries
+        if changed:
+            self._rebuild_accelerator()  # Also holds the replaced spheres
+
+        # Pixels that may see a changed sphere
+        for geometry in seen:
+            bounds = screen_bounds(scene, omega, geometry)
+            if bounds is not None:
+                i_start, i_stop, j_start, j_stop = bounds
+                for i in range(i_start, i_stop):
+                    k = i * width
+                    dirty[k + j_start : k + j_stop] = b"\x01" * (j_stop - j_start)
+
+        if lights != self._lights:
+            for k in range(width * height):
+                if hits[k] >= 0:
+                    dirty[k] = 1
+            return dirty
+
+        # Pixels that may be (un)shadowed by a moved sphere or see a
+        # changed sphere in a reflection
+        shadow_geometries = list(moved)
+        reflection_geometries = (
+            list(seen) if getattr(scene, "n_max_reflections", 0) >= 2 else []
+        )
+        if not shadow_geometries and not reflection_geometries:
+            return dirty
+        for index, state in enumerate(spheres):
+            if index in changed or not (
+                reflection_geometries
+                or any(
+                    _may_shadow(light.position, geometry, state[:4])
+                    for light in scene.lights
+                    for geometry in shadow_geometries
+                )
+            ):
+                continue
+            bounds = screen_bounds(scene, omega, state[:4])
+            if bounds is None:
+                continue
+            sphere = scene.spheres[index]
+            i_start, i_stop, j_start, j_stop = bounds
+            for i in range(i_start, i_stop):
+                for j in range(j_start, j_stop):
+                    k = i * width + j
+                    if hits[k] == index and not dirty[k]:
+                        dirty[k] = self._may_change(
+                            sphere, i, j, shadow_geometries, reflection_geometries
+                        )
+        return dirty
+
+    def _may_change(
+        self,
+        sphere: Sphere,
+        i: int,
+        j: int,
+        shadow_geometries: list[Geometry],
+        reflection_geometries: list[Geometry],
+    ) -> bool:
+        """
+        Indicate if the color of a pixel seeing an unchanged sphere may
+        be affected by changed spheres (no reflection test if
+        `reflection_geometries` is empty).
+        """
+        scene = self.scene
+        ray = scene.ray_from_pixel(self.omega, i, j)
+        t = sphere.intersection_distance(ray)
+        if t is None:
+            return True
+        point = ray.follow_ray(t)
+        for light in scene.lights:
+            for geometry in shadow_geometries:
+                if _segment_hits_sphere(light.position, point, geometry):
+                    return True
+        if reflection_geometries:
+            reflected_ray = sphere.reflected_ray(ray, point)
+            if scene.any_hit(reflected_ray, inf, sphere) is not None:
+                return True  # Reflected colors may change
+            towards = reflected_ray.follow_ray(1.0)
+            for geometry in reflection_geometries:
+                if _half_line_hits_sphere(point, towards, geometry):
+                    return True
+        return False
+
+    def _trace(self, dirty: bytearray) -> int:
+        """
+        Trace the pixels of a mask.
+        """
+        scene = self.scene
+        width, height = scene.screen_size
+        hits = self._hits
+        indices = {id(sphere): index for index, sphere in enumerate(scene.spheres)}
+        n_traced = 0
+        for i in range(height):
+            k = i * width
+            if not any(dirty[k : k + width]):
+                continue
+            shadow_cache = ShadowCache() if scene.use_shadow_cache else None
+            for j in range(width):
+                if dirty[k + j]:
+                    color, sphere = scene.pixel_sample(
+                        self.omega, self.bg_color, i, j, shadow_cache
+                    )
+                    scene.set_pixel_color(i, j, color)
+                    hits[k + j] = -1 if sphere is None else indices[id(sphere)]
+                    n_traced += 1
+        return n_traced
@@ -0,0 +1,95 @@
+"""
+This module contains helpers to handle axis-aligned bounding boxes.
+"""
+
+from math import inf
+
+from .ray import Ray
+from .sphere import Sphere
+
+# Bounds are stored as (min_x, min_y, min_z, max_x, max_y, max_z)
+Bounds = tuple[float, float, float, float, float, float]
+
+
+def sphere_bounds(sphere: Sphere) -> Bounds:
+    """
+    Compute the bounds of a sphere.
+    """
+    c, r = sphere.center, sphere.rad
+    return (c.x - r, c.y - r, c.z - r, c.x + r, c.y + r, c.z + r)
+
+
+def union(a: Bounds, b: Bounds) -> Bounds:
+    """
+    Compute the union of two bounds.
+    """
+    return (
+        min(a[0], b[0]),
+        min(a[1], b[1]),
+        min(a[2], b[2]),
+        max(a[3], b[3]),
+        max(a[4], b[4]),
+        max(a[5], b[5]),
+    )
+
+
+def union_all(bounds) -> Bounds:
+    """
+    Compute the union of several bounds.
+    """
+    result = None
+    for b in bounds:
+        result = b if result is None else union(result, b)
+    return result
+
+
+def surface_area(b: Bounds) -> float:
+    """
+    Compute the surface area of bounds.
+    """
+    d_x = b[3] - b[0]
+    d_y = b[4] - b[1]
+    d_z = b[5] - b[2]
+    return 2 * (d_x * d_y + d_y * d_z + d_z * d_x)
+
+
+def inverse_direction(ray: Ray) -> tuple[float, float, float]:
+    """
+    Compute the inverse of the direction of a ray (infinite for null
+    components).
+    """
+    return tuple(inf if d == 0 else 1 / d for d in (ray.dir.x, ray.dir.y, ray.dir.z))
+
+
+def ray_box(
+    b: Bounds,
+    src: tuple[float, float, float],
+    inv_dir: tuple[float, float, float],
+    t_max: float = inf,
+) -> float | None:
+    """
+    Compute the distance at which a ray enters bounds (slab test).
+
+    Returns:
+        float | None: Entry distance (0 if the source is inside the
+            bounds), `None` if the ray misses the bounds before `t_max`.
+    """
+    t_min = 0.0
+    for axis in range(3):
+        o = src[axis]
+        inv = inv_dir[axis]
+        lo = b[axis]
+        hi = b[axis + 3]
+        if inv == inf:  # Ray parallel to the slab
+            if o < lo or o > hi:
+                return None
+            continue
+        t_0 = (lo - o) * inv
+        t_1 = (hi - o) * inv
+        if t_0 > t_1:
+            t_0, t_1 = t_1, t_0
+        t_min = max(t_min, t_0)
+        t_max = min(t_max, t_1)
+        if t_min > t_max:
+            return None
+    return t_min
@@ -0,0 +1,265 @@
+"""
+This module contains the BVH class.
+"""
+
+from math import inf
+
+from .bounds import (
+    Bounds,
+    inverse_direction,
+    ray_box,
+    sphere_bounds,
+    surface_area,
+    union,
+    union_all,
+)
+from .ray import Ray
+from .sphere import Sphere
+
+
+class BVHNode:
+    """
+    Class representing a node of a bounding volume hierarchy.
+    """
+
+    def __init__(
+        self,
+        bounds: Bounds,
+        left: "BVHNode | None" = None,
+        right: "BVHNode | None" = None,
+        spheres: list[Sphere] | None = None,
+    ):
+        """
+        Initialise BVHNode instance.
+
+        Args:
+            bounds (Bounds): Axis-aligned bounding box of the node.
+            left (BVHNode | None, optional): Left child. Defaults to
+                None.
+            right (BVHNode | None, optional): Right child. Defaults to
+                None.
+            spheres (list[Sphere] | None, optional): Spheres of the node
+                (leaf nodes only). Defaults to None.
+        """
+        self.bounds: Bounds = bounds
+        self.left: BVHNode | None = left
+        self.right: BVHNode | None = right
+        self.spheres: list[Sphere] | None = spheres
+
+    def is_leaf(self) -> bool:
+        """
+        Return `True` if the node is a leaf, `False` otherwise.
+        """
+        return self.spheres is not None
+
+
+class BVH:
+    """
+    Class representing a bounding volume hierarchy over spheres.
+
+    Note: The tree is built with the surface area heuristic (SAH) and
+    answers the same queries as the linear scans of `Scene`. It must
+    be rebuilt if the spheres of the scene change.
+    """
+
+    def __init__(self, spheres: list[Sphere], max_leaf_size: int = 4, n_bins: int = 16):
+        """
+        Initialise BVH instance.
+
+        Args:
+            spheres (list[Sphere]): Spheres.
+            max_leaf_size (int, optional): Maximum number of spheres in
+                a leaf. Defaults to 4.
+            n_bins (int, optional): Number of bins used to evaluate the
+                SAH along each axis. Defaults to 16.
+        """
+        self.max_leaf_size: int = max_leaf_size
+        self.n_bins: int = n_bins
+        self.n_nodes: int = 0
+        self.root: BVHNode | None = (
+            self._build([(s, sphere_bounds(s)) for s in spheres]) if spheres else None
+        )
+
+    def _build(self, items: list[tuple[Sphere, Bounds]]) -> BVHNode:
+        """
+        Recursively build the tree with a binned SAH.
+
+        Args:
+            items (list[tuple[Sphere, Bounds]]): Spheres and their
+                bounds.
+
+        Returns:
+            BVHNode: Root of the (sub)tree.
+        """
+        self.n_nodes += 1
+        bounds = union_all(b for _, b in items)
+        if len(items) <= self.max_leaf_size:
+            return BVHNode(bounds, spheres=[s for s, _ in items])
+
+        # Bounds of the sphere centers
+        centroids = [
+            ((b[0] + b[3]) / 2, (b[1] + b[4]) / 2, (b[2] + b[5]) / 2) for _, b in items
+        ]
+        c_min = [min(c[a] for c in centroids) for a in range(3)]
+        c_max = [max(c[a] for c in centroids) for a in range(3)]
+
+        # Evaluate the SAH cost of every bin boundary on every axis
+        best_cost = inf
+        best_split = None
+        for axis in range(3):
+            extent = c_max[axis] - c_min[axis]
+            if extent <= 0:
+                continue
+            scale = self.n_bins / extent
+            bin_counts = [0] * self.n_bins
+            bin_bounds: list[Bounds | None] = [None] * self.n_bins
+            for (_, b), c in zip(items, centroids):
+                k = min(int((c[axis] - c_min[axis]) * scale), self.n_bins - 1)
+                bin_counts[k] += 1
+                bin_bounds[k] = b if bin_bounds[k] is None else union(bin_bounds[k], b)
+            # Sweep from the left then from the right
+            left_areas, left_counts = _sweep(bin_bounds, bin_counts)
+            right_areas, right_counts = _sweep(bin_bounds[::-1], bin_counts[::-1])
+            for k in range(1, self.n_bins):
+                n_left = left_counts[k - 1]
+                n_right = right_counts[self.n_bins - k - 1]
+                if n_left == 0 or n_right == 0:
+                    continue
+                cost = (
+                    left_areas[k - 1] * n_left
+                    + right_areas[self.n_bins - k - 1] * n_right
+                )
+                if cost < best_cost:
+                    best_cost = cost
+                    best_split = (axis, scale, k)
+
+        # Fall back to a median split when all centers coincide
+        if best_split is None:
+            order = sorted(range(len(items)), key=lambda i: centroids[i][0])
+            half = len(items) // 2
+            left_items = [items[i] for i in order[:half]]
+            right_items = [items[i] for i in order[half:]]
+        else:
+            # Stop splitting when the split costs more than a leaf
+            # (traversal cost ~ one intersection test)
+            if 1 + best_cost / surface_area(bounds) >= len(items):
+                return BVHNode(bounds, spheres=[s for s, _ in items])
+            axis, scale, split_bin = best_split
+            left_items = []
+            right_items = []
+            for it, c in zip(items, centroids):
+                k = min(int((c[axis] - c_min[axis]) * scale), self.n_bins - 1)
+                (left_items if k < split_bin else right_items).append(it)
+
+        return BVHNode(bounds, self._build(left_items), self._build(right_items))
+
+    def closest_hit(
+        self, ray: Ray, t_max: float = inf, exclude: Sphere | None = None
+    ) -> tuple[float, Sphere | None]:
+        """
+        Find the closest sphere hit by a ray.
+
+        Note: Same query as `Scene.closest_hit`.
+
+        Args:
+            ray (Ray): Ray.
+            t_max (float, optional): Ignore hits farther than this
+                distance. Defaults to inf.
+            exclude (Sphere | None, optional): Sphere to ignore.
+                Defaults to None.
+
+        Returns:
+            tuple[float, Sphere | None]: Distance to the hit and sphere
+                hit, (`t_max`, `None`) if the ray does not hit any
+                sphere.
+        """
+        hit_sphere = None
+        if self.root is None:
+            return t_max, hit_sphere
+        src = (ray.src.x, ray.src.y, ray.src.z)
+        inv_dir = inverse_direction(ray)
+        stack = [(self.root, 0.0)]
+        while stack:
+            node, t_entry = stack.pop()
+            if t_entry >= t_max:
+                continue
+            if node.is_leaf():
+                for sphere in node.spheres:
+                    if sphere is exclude:
+                        continue
+                    t = sphere.intersection_distance(ray, t_max)
+                    if t is not None:
+                        t_max = t
+                        hit_sphere = sphere
+                continue
+            # Visit the nearest child first
+            t_left = ray_box(node.left.bounds, src, inv_dir, t_max)
+            t_right = ray_box(node.right.bounds, src, inv_dir, t_max)
+            if t_left is not None and t_right is not None and t_left < t_right:
+                stack.append((node.right, t_right))
+                stack.append((node.left, t_left))
+            else:
+                if t_left is not None:
+                    stack.append((node.left, t_left))
+                if t_right is not None:
+                    stack.append((node.right, t_right))
+        return t_max, hit_sphere
+
+    def any_hit(
+        self, ray: Ray, t_max: float = inf, exclude: Sphere | None = None
+    ) -> Sphere | None:
+        """
+        Find any sphere hit by a ray.
+
+        Note: Same query as `Scene.any_hit`.
+
+        Args:
+            ray (Ray): Ray.
+            t_max (float, optional): Ignore hits farther than this
+                distance. Defaults to inf.
+            exclude (Sphere | None, optional): Sphere to ignore.
+                Defaults to None.
+
+        Returns:
+            Sphere | None: A sphere hit by the ray, `None` if the ray
+                does not hit any sphere.
+        """
+        if self.root is None:
+            return None
+        src = (ray.src.x, ray.src.y, ray.src.z)
+        inv_dir = inverse_direction(ray)
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if ray_box(node.bounds, src, inv_dir, t_max) is None:
+                continue
+            if node.is_leaf():
+                for sphere in node.spheres:
+                    if (
+                        sphere is not exclude
+                        and sphere.intersection_distance(ray, t_max) is not None
+                    ):
+                        return sphere
+            else:
+                stack.append(node.right)
+                stack.append(node.left)
+        return None
+
+
+def _sweep(
+    bin_bounds: list[Bounds | None], bin_counts: list[int]
+) -> tuple[list[float], list[int]]:
+    """
+    Compute the cumulated surface areas and counts of bins.
+    """
+    areas = []
+    counts = []
+    bounds = None
+    count = 0
+    for b, n in zip(bin_bounds, bin_counts):
+        if b is not None:
+            bounds = b if bounds is None else union(bounds, b)
+        count += n
+        areas.append(0.0 if bounds is None else surface_area(bounds))
+        counts.append(count)
+    return areas, counts
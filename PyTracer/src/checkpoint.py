@@ -0,0 +1,225 @@
+"""
+This module contains the Checkpoint class.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import os
+import time
+import zlib
+from typing import TYPE_CHECKING
+
+from .color import Color
+from .framebuffer import FrameBuffer, Tile
+from .point import Point
+
+if TYPE_CHECKING:
+    from .scene import Scene
+
+VERSION = 2
+
+
+def scene_fingerprint(
+    scene: Scene, omega: Point, bg_color: Color, tile_size: int
+) -> str:
+    """
+    Return a fingerprint of everything that determines the pixels of a
+    render.
+
+    Note: Computed from the packed scene (see `shared.pack_scene`), so
+    that every setting it serializes is covered. Settings that do not
+    change the image (`shared.RENDER_SETTINGS`, number of workers) are
+    left out.
+
+    Args:
+        scene (Scene): Scene.
+        omega (Point): Observation point.
+        bg_color (Color): Background color.
+        tile_size (int): Size of the tiles (in pixels).
+
+    Returns:
+        str: SHA-256 digest (hexadecimal).
+    """
+    from .shared import RENDER_SETTINGS, pack_scene  # pylint: disable=import-outside-toplevel
+
+    values = pack_scene(scene, omega, bg_color)
+    for k in RENDER_SETTINGS:
+        values[k] = 0.0
+    digest = hashlib.sha256(repr((VERSION, tile_size)).encode())
+    digest.update(values.tobytes())
+    return digest.hexdigest()
+
+
+class Checkpoint:
+    """
+    Class representing the progress of a render saved to disk.
+
+    Note: The checkpoint is made of two files: `prefix.json` holds the
+    fingerprint of the render and the tiles done, `prefix.raw` the
+    pixels of these tiles (same layout as `FrameBuffer.memory_mapped`).
+    A memory-mapped image is its own pixel store (no copy). The pixels
+    are flushed before the state file is replaced (atomically), so a
+    render killed at any point resumes from a consistent state. A state
+    file with another fingerprint is ignored (the render restarts).
+    """
+
+    def __init__(
+        self, prefix: str, fingerprint: str, image: FrameBuffer, tile_size: int
+    ):
+        """
+        Initialise Checkpoint instance (load the state file if it
+        matches the render).
+
+        Args:
+            prefix (str): Path of the checkpoint files without extension.
+            fingerprint (str): Fingerprint of the render (see
+                `scene_fingerprint`).
+            image (FrameBuffer): Image rendered.
+            tile_size (int): Size of the tiles (in pixels).
+        """
+        self.prefix: str = prefix
+        self.fingerprint: str = fingerprint
+        self.tile_size: int = tile_size
+        self.width: int = image.width
+        self.height: int = image.height
+        self._n_tile_cols: int = -(-self.width // tile_size)
+        n_tiles = self._n_tile_cols * -(-self.height // tile_size)
+        self.done: bytearray = bytearray(n_tiles)  # 1 per tile done
+        self._unsaved: list[Tile] = []  # Tiles done but not in the store
+        self.interval: float = 60.0  # Seconds between saves
+        self._last_save: float = time.monotonic()
+
+        self._source: str | None = None  # Pixels of the loaded state
+        state_path = f"{prefix}.json"
+        if os.path.exists(state_path):
+            with open(state_path, encoding="utf-8") as file:
+                state = json.load(file)
+            if state.get("fingerprint") == fingerprint:
+                self.done = bytearray(zlib.decompress(base64.b64decode(state["done"])))
+                self._source = state["pixels"]
+
+        self.pixels_path: str = image.path or f"{prefix}.raw"
+        self._owns_store: bool = image.path is None
+        self._store: FrameBuffer = (
+            FrameBuffer.memory_mapped(self.pixels_path, self.width, self.height)
+            if self._owns_store
+            else image
+        )
+
+    @property
+    def n_done(self) -> int:
+        """
+        Number of tiles done.
+        """
+        return sum(self.done)
+
+    def _index(self, tile: Tile) -> int:
+        """
+        Return the index of a tile.
+        """
+        return (tile[0] // self.tile_size) * self._n_tile_cols + (
+            tile[2] // self.tile_size
+        )
+
+    def is_done(self, tile: Tile) -> bool:
+        """
+        Indicate if a tile is done.
+        """
+        return bool(self.done[self._index(tile)])
+
+    def restore(self, image: FrameBuffer):
+        """
+        Copy the pixels of the tiles done into the image.
+
+        Args:
+            image (FrameBuffer): Image rendered.
+        """
+        if self._source is None or self._source == image.path:
+            return
+        if self._source == self.pixels_path:
+            source = self._store
+        else:
+            # Pixels stored in the file of a previous memory-mapped image
+            source = FrameBuffer.memory_mapped(self._source, self.width, self.height)
+        for tile in self._done_tiles():
+            _copy_tile(source, image, tile)
+            if source is not self._store:
+                self._unsaved.append(tile)
+        if source is not self._store:
+            source.release()
+
+    def _done_tiles(self):
+        """
+        Generate the tiles done.
+        """
+        for k, done in enumerate(self.done):
+            if done:
+                i = (k // self._n_tile_cols) * self.tile_size
+                j = (k % self._n_tile_cols) * self.tile_size
+                yield (
+                    i,
+                    min(i + self.tile_size, self.height),
+                    j,
+                    min(j + self.tile_size, self.width),
+                )
+
+    def add(self, tile: Tile, image: FrameBuffer):
+        """
+        Mark a tile as done, and save the checkpoint if the last save is
+        older than `interval`.
+
+        Args:
+            tile (Tile): Tile done.
+            image (FrameBuffer): Image holding the pixels of the tile.
+        """
+        self.done[self._index(tile)] = 1
+        if self._store is not image:
+            self._unsaved.append(tile)
+        if time.monotonic() - self._last_save >= self.interval:
+            self.save(image)
+
+    def save(self, image: FrameBuffer):
+        """
+        Save the checkpoint.
+
+        Args:
+            image (FrameBuffer): Image holding the pixels of the tiles.
+        """
+        for tile in self._unsaved:
+            _copy_tile(image, self._store, tile)
+        self._unsaved = []
+        self._store.flush()
+        state = {
+            "fingerprint": self.fingerprint,
+            "tile_size": self.tile_size,
+            "screen_size": [self.width, self.height],
+            "pixels": self.pixels_path,
+            "done": base64.b64encode(zlib.compress(bytes(self.done))).decode(),
+        }
+        tmp_path = f"{self.prefix}.json.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(state, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, f"{self.prefix}.json")
+        self._last_save = time.monotonic()
+
+    def close(self):
+        """
+        Release the pixel store (the image is left untouched).
+        """
+        if self._owns_store:
+            self._store.release()
+
+
+def _copy_tile(source: FrameBuffer, destination: FrameBuffer, tile: Tile):
+    """
+    Copy the pixels of a tile from an image to another.
+    """
+    i_start, i_stop, j_start, j_stop = tile
+    for i in range(i_start, i_stop):
+        row = source.get_row(i)[3 * j_start : 3 * j_stop]
+        destination.write_row(i, row, j_start)
@@ -8,8 +8,13 @@ from __future__ import annotations
 class Color:
     """
     Class representing a color.
+
+    Note: Components are clamped between 0 and 1 on construction.
+    Operations whose result cannot leave this range skip the clamp.
     """
 
+    __slots__ = ("b", "g", "r")
+
     def __init__(self, r: float, g: float, b: float):
         """
         Initialise Color instance.
@@ -19,30 +24,59 @@ class Color:
             g (float): Green component (between 0 and 1).
             b (float): Blue component (between 0 and 1).
         """
-        # Clamp values between 0 and 1
-        self.r = max(0, min(r, 1))
-        self.g = max(0, min(g, 1))
-        self.b = max(0, min(b, 1))
+        # Clamp values between 0 and 1 (conditional expressions are
+        # faster than calls to min and max in this hot path)
+        self.r = 0 if r < 0 else 1 if r > 1 else r  # noqa: FURB136
+        self.g = 0 if g < 0 else 1 if g > 1 else g  # noqa: FURB136
+        self.b = 0 if b < 0 else 1 if b > 1 else b  # noqa: FURB136
 
     def __str__(self):
         return f"Color(r={self.r}, g={self.g}, b={self.b})"
 
-    def __add__(self, other: Color) -> Color:
-        if not isinstance(other, Color):
-            raise TypeError(f"Cannot add a Color to object of type {type(other)}.")
-        return Color(self.r + other.r, self.g + other.g, self.b + other.b)
+    @classmethod
+    def _from_clamped(cls, r: float, g: float, b: float) -> Color:
+        """
+        Create color instance from components already between 0 and 1.
+        """
+        color = object.__new__(cls)
+        color.r = r
+        color.g = g
+        color.b = b
+        return color
 
-    def __iadd__(self, other) -> Color:
-        if not isinstance(other, Color):
-            raise TypeError(f"Cannot add a Color to object of type {type(other)}.")
-        return Color(self.r + other.r, self.g + other.g, self.b + other.b)
+    def __add__(self, other: Color) -> Color:
+        try:
+            r = self.r + other.r
+            g = self.g + other.g
+            b = self.b + other.b
+        except AttributeError:
+            raise TypeError(
+                f"Cannot add a Color to object of type {type(other)}."
+            ) from None
+        # Components are non-negative: only clamp to 1 (no call to min)
+        return Color._from_clamped(
+            1 if r > 1 else r,  # noqa: FURB136
+            1 if g > 1 else g,  # noqa: FURB136
+            1 if b > 1 else b,  # noqa: FURB136
+        )
+
+    __iadd__ = __add__
 
     def __mul__(self, other: int | float | Color) -> Color:
-        if isinstance(other, (int, float)):
+        if type(other) is Color:  # pylint: disable=unidiomatic-typecheck
+            # Product of components between 0 and 1
+            return Color._from_clamped(
+                self.r * other.r, self.g * other.g, self.b * other.b
+            )
+        try:
             return Color(self.r * other, self.g * other, self.b * other)
-        if isinstance(other, Color):
-            return Color(self.r * other.r, self.g * other.g, self.b * other.b)
-        raise TypeError(f"Cannot multiply a Color by object of type {type(other)}.")
+        except TypeError:
+            raise TypeError(
+                f"Cannot multiply a Color by object of type {type(other)}."
+            ) from None
+
+    def __rmul__(self, other: float) -> Color:
+        return self.__mul__(other)
 
     @classmethod
     def from_rgb(cls, r: int, g: int, b: int) -> Color:
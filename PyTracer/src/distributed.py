@@ -0,0 +1,672 @@
+"""
+This module contains the distributed tile renderer (render farm).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import select
+import selectors
+import socket
+import struct
+import sys
+import time
+from array import array
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING
+
+from .color import Color
+from .framebuffer import FrameBuffer, Tile
+from .point import Point
+from .shadow_cache import ShadowCache
+from .shared import pack_scene, unpack_scene
+from .stats import RenderStats, instrument
+
+if TYPE_CHECKING:
+    from .scene import Scene
+
+# Messages: kind (1 byte) | size of the payload (4 bytes) | payload
+# (numbers are little endian)
+HELLO = 1  # Worker -> coordinator: name of the worker
+SCENE = 2  # Coordinator -> worker: packed scene (see `pack_scene`)
+REQUEST = 3  # Worker -> coordinator: queue of the worker (almost) empty
+TILES = 4  # Coordinator -> worker: tiles to render
+RESULT = 5  # Worker -> coordinator: pixels of a tile
+STATS = 6  # Worker -> coordinator: render stats of a tile (JSON)
+STEAL = 7  # Coordinator -> worker: give back up to n queued tiles
+RELEASE = 8  # Worker -> coordinator: tiles given back
+DONE = 9  # Coordinator -> worker: frame complete
+
+HEADER = struct.Struct("<BI")
+# Tile, render time, lookups and hits of the shadow cache
+RESULT_HEADER = struct.Struct("<4IdII")
+
+
+def _pack_tiles(tiles: list[Tile]) -> bytes:
+    """
+    Return the payload of a list of tiles.
+    """
+    return struct.pack(f"<{4 * len(tiles)}I", *(v for tile in tiles for v in tile))
+
+
+def _unpack_tiles(payload: bytes) -> list[Tile]:
+    """
+    Return the tiles of a payload.
+    """
+    values = struct.unpack(f"<{len(payload) // 4}I", payload)
+    return [values[k : k + 4] for k in range(0, len(values), 4)]
+
+
+def _to_little_endian(values: array) -> bytes:
+    """
+    Return the bytes of an array in little endian order.
+    """
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_little_endian(typecode: str, payload: bytes) -> array:
+    """
+    Return the array stored in little endian order in a payload.
+    """
+    values = array(typecode)
+    values.frombytes(payload)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+class Connection:
+    """
+    Class representing a socket exchanging messages (see `HEADER`).
+    """
+
+    def __init__(self, sock: socket.socket):
+        """
+        Initialise Connection instance.
+
+        Args:
+            sock (socket.socket): Connected socket.
+        """
+        self.sock: socket.socket = sock
+        self.n_bytes_sent: int = 0
+        self.n_bytes_received: int = 0
+        self._buffer: bytearray = bytearray()
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def send(self, kind: int, payload: bytes = b""):
+        """
+        Send a message.
+
+        Args:
+            kind (int): Kind of message.
+            payload (bytes, optional): Payload. Defaults to b"".
+        """
+        data = HEADER.pack(kind, len(payload)) + payload
+        self.sock.sendall(data)
+        self.n_bytes_sent += len(data)
+
+    def receive(self) -> list[tuple[int, bytes]]:
+        """
+        Receive the available data (blocks until some arrives).
+
+        Note: Messages may arrive over several calls: only the complete
+        ones are returned.
+
+        Returns:
+            list[tuple[int, bytes]]: Kinds and payloads of the messages
+                completed.
+        """
+        data = self.sock.recv(1 << 16)
+        if not data:
+            raise ConnectionError("Connection closed by peer")
+        self.n_bytes_received += len(data)
+        self._buffer += data
+        messages = []
+        while len(self._buffer) >= HEADER.size:
+            kind, size = HEADER.unpack_from(self._buffer)
+            end = HEADER.size + size
+            if len(self._buffer) < end:
+                break
+            messages.append((kind, bytes(self._buffer[HEADER.size : end])))
+            del self._buffer[:end]
+        return messages
+
+    def close(self):
+        """
+        Close the socket.
+        """
+        self.sock.close()
+
+
+def run_worker(host: str, port: int, name: str | None = None) -> int:
+    """
+    Render tiles for a coordinator until the frame is complete.
+
+    Note: Tiles are rendered from the front of a local queue. The
+    worker asks for more tiles as soon as it starts its last one, and
+    gives tiles back from the end of its queue when the coordinator
+    steals them for an idle worker.
+
+    Args:
+        host (str): Host of the coordinator.
+        port (int): Port of the coordinator.
+        name (str | None, optional): Name of the worker. Defaults to
+            None ("host:pid").
+
+    Returns:
+        int: Number of tiles rendered.
+    """
+    name = name or f"{socket.gethostname()}:{os.getpid()}"
+    conn = Connection(socket.create_connection((host, port)))
+    conn.send(HELLO, name.encode())
+    scene = omega = bg_color = None
+    queue = deque()
+    requested = False
+    n_tiles = 0
+    try:
+        while True:
+            if scene is not None and not queue and not requested:
+                conn.send(REQUEST)
+                requested = True
+            # Wait for messages when idle, only poll them otherwise
+            if not queue or select.select([conn.sock], [], [], 0)[0]:
+                try:
+                    messages = conn.receive()
+                except ConnectionError:
+                    return n_tiles  # Coordinator gone
+                for kind, payload in messages:
+                    if kind == SCENE:
+                        # Tiles are sent back, not stored: no framebuffer
+                        scene, omega, bg_color = unpack_scene(
+                            _from_little_endian("d", payload), FrameBuffer(0, 0)
+                        )
+                    elif kind == TILES:
+                        queue.extend(_unpack_tiles(payload))
+                        requested = False
+                    elif kind == STEAL:
+                        (n,) = struct.unpack("<I", payload)
+                        # Keep the next tile (requested tiles may be on the way)
+                        released = [queue.pop() for _ in range(min(n, len(queue) - 1))]
+                        conn.send(RELEASE, _pack_tiles(released))
+                    elif kind == DONE:
+                        return n_tiles
+                continue
+
+            tile = queue.popleft()
+            if not queue and not requested:
+                conn.send(REQUEST)  # Prefetch while rendering the last tile
+                requested = True
+            start = time.perf_counter()
+            scene.shadow_cache_stats = ShadowCache()
+            stats = RenderStats() if scene.collect_stats else None
+            with instrument(scene, stats):
+                colors = scene.render_tile(omega, bg_color, tile)
+            values = array(
+                "f", [v for row in colors for c in row for v in (c.r, c.g, c.b)]
+            )
+            render_time = time.perf_counter() - start
+            if stats is not None:
+                conn.send(STATS, json.dumps(stats.as_dict()).encode())
+            conn.send(
+                RESULT,
+                RESULT_HEADER.pack(
+                    *tile,
+                    render_time,
+                    scene.shadow_cache_stats.n_lookups,
+                    scene.shadow_cache_stats.n_hits,
+                )
+                + _to_little_endian(values),
+            )
+            n_tiles += 1
+    finally:
+        conn.close()
+
+
+@dataclass
+class WorkerStats:
+    """
+    Class representing the activity of a worker of the render farm.
+    """
+
+    name: str
+    n_tiles: int = 0
+    n_pixels: int = 0
+    busy_time: float = 0.0  # Rendering (measured by the worker)
+    connected_time: float = 0.0
+    n_stolen_tiles: int = 0  # Given back to feed idle workers
+    n_requeued_tiles: int = 0  # Assigned when the worker died
+    alive: bool = True
+
+    @property
+    def throughput(self) -> float:
+        """
+        Number of pixels rendered per second of connection.
+        """
+        return self.n_pixels / self.connected_time if self.connected_time else 0.0
+
+    @property
+    def idle_time(self) -> float:
+        """
+        Time connected but not rendering (waiting for tiles, sending
+        pixels).
+        """
+        return max(self.connected_time - self.busy_time, 0.0)
+
+
+@dataclass
+class FarmStats:
+    """
+    Class representing the activity of the render farm during a frame.
+
+    Note: `scheduling_time` is the time the coordinator spent handing
+    out, stealing and re-queueing tiles and `assembly_time` the time it
+    spent writing pixels to the framebuffer. `overhead` is the fraction
+    of the time of the workers not spent rendering.
+    """
+
+    elapsed: float = 0.0
+    n_tiles: int = 0
+    scheduling_time: float = 0.0
+    assembly_time: float = 0.0
+    n_steals: int = 0  # Steal requests sent
+    n_bytes_sent: int = 0
+    n_bytes_received: int = 0
+    workers: list[WorkerStats] = field(default_factory=list)
+
+    @property
+    def overhead(self) -> float:
+        """
+        Fraction of the time of the workers not spent rendering.
+        """
+        connected_time = sum(w.connected_time for w in self.workers)
+        if not connected_time:
+            return 0.0
+        return sum(w.idle_time for w in self.workers) / connected_time
+
+    def summary(self) -> str:
+        """
+        Return a table of the activity of the workers.
+
+        Returns:
+            str: Table (one worker per line) and totals.
+        """
+        lines = [
+            (
+                f"{'tiles':>7} {'pixels/s':>10} {'busy':>8} {'idle':>8} "
+                f"{'stolen':>7} {'requeued':>9}  worker"
+            )
+        ]
+        for w in self.workers:
+            lines.append(
+                f"{w.n_tiles:>7} {w.throughput:>10.0f} {w.busy_time:>7.2f}s "
+                f"{w.idle_time:>7.2f}s {w.n_stolen_tiles:>7} "
+                f"{w.n_requeued_tiles:>9}  {w.name}{'' if w.alive else ' (dead)'}"
+            )
+        lines.append(
+            f"{self.n_tiles} tiles in {self.elapsed:.2f}s, {self.n_steals} steals, "
+            f"worker overhead {self.overhead:.1%}, scheduling "
+            f"{self.scheduling_time * 1000:.1f}ms, assembly "
+            f"{self.assembly_time * 1000:.1f}ms, "
+            f"{(self.n_bytes_sent + self.n_bytes_received) / 1e6:.1f}MB transferred"
+        )
+        return "\n".join(lines)
+
+    def as_dict(self) -> dict:
+        """
+        Return the stats as a dictionary (e.g.: to dump them as JSON).
+        """
+        return asdict(self) | {"overhead": self.overhead}
+
+
+class _RemoteWorker:
+    """
+    Class representing a worker connected to the coordinator.
+    """
+
+    def __init__(self, conn: Connection, name: str):
+        self.conn: Connection = conn
+        self.stats: WorkerStats = WorkerStats(name)
+        self.assigned: dict[Tile, None] = {}  # Not rendered yet (in order)
+        self.waiting: bool = False  # Asked for tiles
+        self.stealing: bool = False  # Steal request sent
+        self.connected_at: float = time.perf_counter()
+        self.last_seen: float = self.connected_at
+
+
+class RenderFarm:
+    """
+    Class representing the coordinator of a render farm.
+
+    Note: Workers (see `run_worker`) connect over TCP and receive the
+    packed scene once. Tiles are handed out in batches (guided: large
+    at first, smaller as the frame completes). When no tile is left, an
+    idle worker gets half of the queued tiles of the most loaded worker
+    (work stealing). The tiles of a worker that disconnects or stays
+    silent for `timeout` seconds are re-queued. Each pixel is computed
+    by the same code as the serial path, so the image is identical.
+    """
+
+    def __init__(
+        self,
+        scene: Scene,
+        omega: Point,
+        bg_color: Color,
+        address: tuple[str, int] = ("127.0.0.1", 0),
+        tile_size: int = 32,
+        timeout: float = 30.0,
+        max_batch: int = 64,
+    ):
+        """
+        Initialise RenderFarm instance (listen for workers).
+
+        Args:
+            scene (Scene): Scene.
+            omega (Point): Observation point.
+            bg_color (Color): Background color.
+            address (tuple[str, int], optional): Address to listen on.
+                Defaults to ("127.0.0.1", 0) (local workers only, any
+                free port).
+            tile_size (int, optional): Size of the tiles (in pixels).
+                Defaults to 32.
+            timeout (float, optional): Time after which a worker that
+                has tiles but sends nothing is considered dead (in
+                seconds, longer than the render of a tile). Defaults to
+                30.
+            max_batch (int, optional): Maximum number of tiles handed
+                out at once. Defaults to 64.
+        """
+        self.scene: Scene = scene
+        self.tile_size: int = tile_size
+        self.timeout: float = timeout
+        self.max_batch: int = max_batch
+        self.stats: FarmStats = FarmStats()
+        self._scene_payload: bytes = _to_little_endian(
+            pack_scene(scene, omega, bg_color)
+        )
+        self._listener: socket.socket = socket.create_server(address)
+        self._listener.setblocking(False)
+        self.address: tuple[str, int] = self._listener.getsockname()[:2]
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._listener, selectors.EVENT_READ)
+        self._workers: list[_RemoteWorker] = []
+        width, height = scene.screen_size
+        self._n_tile_cols: int = -(-width // tile_size)
+        self._n_tiles: int = self._n_tile_cols * -(-height // tile_size)
+        self._next_tile: int = 0  # Index of the next tile never handed out
+        self._requeued: deque[Tile] = deque()  # Stolen or from dead workers
+        self._n_done: int = 0
+
+    def _n_unassigned(self) -> int:
+        """
+        Return the number of tiles waiting to be handed out.
+        """
+        return self._n_tiles - self._next_tile + len(self._requeued)
+
+    def _take(self, n: int) -> list[Tile]:
+        """
+        Take tiles to hand out (re-queued tiles first).
+        """
+        tiles = []
+        while self._requeued and len(tiles) < n:
+            tiles.append(self._requeued.popleft())
+        width, height = self.scene.screen_size
+        size = self.tile_size
+        while self._next_tile < self._n_tiles and len(tiles) < n:
+            i, j = divmod(self._next_tile, self._n_tile_cols)
+            i *= size
+            j *= size
+            tiles.append((i, min(i + size, height), j, min(j + size, width)))
+            self._next_tile += 1
+        return tiles
+
+    def _send(self, worker: _RemoteWorker, kind: int, payload: bytes = b"") -> bool:
+        """
+        Send a message to a worker (dropped if the connection is lost).
+        """
+        try:
+            worker.conn.send(kind, payload)
+            return True
+        except OSError:
+            self._drop(worker)
+            return False
+
+    def _accept(self):
+        """
+        Accept a worker and send it the scene.
+        """
+        sock, address = self._listener.accept()
+        sock.setblocking(True)
+        worker = _RemoteWorker(Connection(sock), f"{address[0]}:{address[1]}")
+        self._workers.append(worker)
+        self.stats.workers.append(worker.stats)
+        self._selector.register(sock, selectors.EVENT_READ, worker)
+        self._send(worker, SCENE, self._scene_payload)
+
+    def _drop(self, worker: _RemoteWorker):
+        """
+        Disconnect a worker and re-queue its tiles.
+        """
+        if worker not in self._workers:
+            return
+        self._workers.remove(worker)
+        self._selector.unregister(worker.conn.sock)
+        self._close(worker)
+        worker.stats.alive = False
+        worker.stats.n_requeued_tiles += len(worker.assigned)
+        self._requeued.extendleft(reversed(worker.assigned))
+        worker.assigned.clear()
+
+    def _close(self, worker: _RemoteWorker):
+        """
+        Close the connection of a worker and record its stats.
+        """
+        worker.stats.connected_time = time.perf_counter() - worker.connected_at
+        self.stats.n_bytes_sent += worker.conn.n_bytes_sent
+        self.stats.n_bytes_received += worker.conn.n_bytes_received
+        worker.conn.close()
+
+    def _handle(self, worker: _RemoteWorker):
+        """
+        Handle the messages of a worker.
+        """
+        try:
+            messages = worker.conn.receive()
+        except OSError:  # Includes ConnectionError
+            self._drop(worker)
+            return
+        worker.last_seen = time.perf_counter()
+        for kind, payload in messages:
+            if kind == HELLO:
+                worker.stats.name = payload.decode()
+            elif kind == REQUEST:
+                worker.waiting = True
+            elif kind == RESULT:
+                *tile, render_time, n_lookups, n_hits = RESULT_HEADER.unpack_from(
+                    payload
+                )
+                tile = tuple(tile)
+                if tile not in worker.assigned:
+                    continue  # Re-queued meanwhile (should not happen)
+                del worker.assigned[tile]
+                start = time.perf_counter()
+                self.scene.image.write_tile(
+                    tile, _from_little_endian("f", payload[RESULT_HEADER.size :])
+                )
+                self.stats.assembly_time += time.perf_counter() - start
+                self.scene.shadow_cache_stats.n_lookups += n_lookups
+                self.scene.shadow_cache_stats.n_hits += n_hits
+                worker.stats.n_tiles += 1
+                worker.stats.n_pixels += (tile[1] - tile[0]) * (tile[3] - tile[2])
+                worker.stats.busy_time += render_time
+                self._n_done += 1
+            elif kind == STATS:
+                if self.scene.stats is not None:
+                    self.scene.stats.merge(RenderStats(**json.loads(payload)))
+            elif kind == RELEASE:
+                worker.stealing = False
+                tiles = [t for t in _unpack_tiles(payload) if t in worker.assigned]
+                for tile in tiles:
+                    del worker.assigned[tile]
+                worker.stats.n_stolen_tiles += len(tiles)
+                self._requeued.extendleft(reversed(tiles))
+
+    def _dispatch(self):
+        """
+        Hand out tiles to the idle workers, stealing tiles if needed.
+        """
+        for worker in [w for w in self._workers if w.waiting]:
+            n_unassigned = self._n_unassigned()
+            if not n_unassigned:
+                break
+            n = math.ceil(n_unassigned / (2 * len(self._workers)))
+            tiles = self._take(min(n, self.max_batch))
+            worker.assigned.update(dict.fromkeys(tiles))
+            worker.waiting = False
+            self._send(worker, TILES, _pack_tiles(tiles))
+
+        n_waiting = sum(w.waiting for w in self._workers)
+        n_stealing = sum(w.stealing for w in self._workers)
+        while n_stealing < n_waiting:
+            victims = [
+                w
+                for w in self._workers
+                if not w.waiting and not w.stealing and len(w.assigned) >= 2
+            ]
+            if not victims:
+                break
+            victim = max(victims, key=lambda w: len(w.assigned))
+            victim.stealing = True
+            n_stealing += 1
+            self.stats.n_steals += 1
+            self._send(victim, STEAL, struct.pack("<I", len(victim.assigned) // 2))
+
+    def run(self, n_local_workers: int = 0) -> FarmStats:
+        """
+        Render the frame into the image of the scene.
+
+        Args:
+            n_local_workers (int, optional): Number of worker processes
+                to start on this machine. Defaults to 0 (workers are
+                started separately, e.g.: `python -m src.distributed
+                HOST:PORT` on other machines).
+
+        Returns:
+            FarmStats: Stats of the farm.
+        """
+        start = time.perf_counter()
+        host, port = self.address
+        if host in ("0.0.0.0", "::"):
+            host = "localhost"
+        processes = [
+            multiprocessing.Process(target=run_worker, args=(host, port), daemon=True)
+            for _ in range(n_local_workers)
+        ]
+        for process in processes:
+            process.start()
+        try:
+            while self._n_done < self._n_tiles:
+                if (
+                    processes
+                    and not self._workers
+                    and not any(process.is_alive() for process in processes)
+                ):
+                    raise RuntimeError("All the local workers died")
+                events = self._selector.select(timeout=min(self.timeout, 1.0))
+                scheduling_start = time.perf_counter()
+                assembly_time = self.stats.assembly_time
+                for key, _ in events:
+                    if key.data is None:
+                        self._accept()
+                    else:
+                        self._handle(key.data)
+                now = time.perf_counter()
+                for worker in list(self._workers):
+                    if worker.assigned and now - worker.last_seen > self.timeout:
+                        self._drop(worker)
+                self._dispatch()
+                self.stats.scheduling_time += (
+                    time.perf_counter()
+                    - scheduling_start
+                    - (self.stats.assembly_time - assembly_time)
+                )
+            for worker in self._workers:
+                try:
+                    worker.conn.send(DONE)
+                except OSError:
+                    pass
+        finally:
+            for worker in self._workers:
+                self._selector.unregister(worker.conn.sock)
+                self._close(worker)
+            self._workers.clear()
+            for process in processes:
+                process.join(timeout=self.timeout)
+                if process.is_alive():
+                    process.terminate()
+        self.stats.n_tiles = self._n_tiles
+        self.stats.elapsed = time.perf_counter() - start
+        return self.stats
+
+    def close(self):
+        """
+        Stop listening for workers.
+        """
+        self._selector.close()
+        self._listener.close()
+
+
+def ray_trace_distributed(
+    scene: Scene,
+    omega: Point,
+    bg_color: Color,
+    address: tuple[str, int] = ("127.0.0.1", 0),
+    n_local_workers: int = 0,
+    tile_size: int = 32,
+    timeout: float = 30.0,
+) -> FarmStats:
+    """
+    Generate image of the scene with ray tracing on a render farm (see
+    `RenderFarm`).
+
+    Args:
+        scene (Scene): Scene.
+        omega (Point): Observation point.
+        bg_color (Color): Background color.
+        address (tuple[str, int], optional): Address the coordinator
+            listens on. Defaults to ("127.0.0.1", 0).
+        n_local_workers (int, optional): Number of worker processes to
+            start on this machine. Defaults to 0.
+        tile_size (int, optional): Size of the tiles (in pixels).
+            Defaults to 32.
+        timeout (float, optional): Time after which a silent worker is
+            considered dead (in seconds). Defaults to 30.
+
+    Returns:
+        FarmStats: Stats of the farm.
+    """
+    scene.shadow_cache_stats = ShadowCache()
+    scene.stats = RenderStats() if scene.collect_stats else None
+    farm = RenderFarm(scene, omega, bg_color, address, tile_size, timeout)
+    try:
+        stats = farm.run(n_local_workers)
+    finally:
+        farm.close()
+    if scene.stats is not None:
+        scene.stats.add_time("total", stats.elapsed)
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Worker of a render farm.")
+    parser.add_argument("address", help="address of the coordinator (HOST:PORT)")
+    args = parser.parse_args()
+    coordinator_host, coordinator_port = args.address.rsplit(":", 1)
+    print(f"{run_worker(coordinator_host, int(coordinator_port))} tiles rendered")
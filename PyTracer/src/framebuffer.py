@@ -0,0 +1,348 @@
+"""
+This module contains the FrameBuffer class.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import weakref
+from array import array
+from collections.abc import Iterator
+from multiprocessing import shared_memory
+
+Tile = tuple[int, int, int, int]  # (i_start, i_stop, j_start, j_stop)
+
+
+class FrameBuffer:
+    """
+    Class representing an RGB image stored in a contiguous buffer.
+
+    Note: Pixels are stored row by row as float32 RGB triplets. The
+    class exposes the buffer protocol with shape (height, width, 3) so
+    that `numpy.asarray(framebuffer)` and `plt.imshow(framebuffer)`
+    work without copying or converting the pixels. Images too large
+    for memory can be stored in a file (see `memory_mapped`), images
+    rendered by several processes in shared memory (see `shared`).
+    """
+
+    def __init__(self, width: int, height: int, buffer=None):
+        """
+        Initialise FrameBuffer instance.
+
+        Args:
+            width (int): Width of the image (in pixels).
+            height (int): Height of the image (in pixels).
+            buffer (optional): Writable buffer of at least
+                `12 * width * height` bytes to store the pixels in
+                (e.g.: shared memory). Defaults to None (a black image
+                is allocated).
+        """
+        self.width: int = width
+        self.height: int = height
+        self.path: str | None = None  # File of a memory-mapped framebuffer
+        self.shm_name: str | None = None  # Block of a shared framebuffer
+        # Destroys the shared memory block of a shared framebuffer
+        self._shm: weakref.finalize | None = None
+        if buffer is None:
+            buffer = array("f", [0.0]) * (3 * width * height)
+        self._mmap: mmap.mmap | None = buffer if isinstance(buffer, mmap.mmap) else None
+        self._pixels: memoryview = memoryview(buffer).cast("B")[: self.nbytes].cast("f")
+
+    @classmethod
+    def memory_mapped(cls, path: str, width: int, height: int) -> FrameBuffer:
+        """
+        Create a framebuffer stored in a file.
+
+        Note: The file holds the raw pixels (float32 RGB, row by row, no
+        header) and can be read with `numpy.memmap(path,
+        dtype=numpy.float32, mode="r", shape=(height, width, 3))`. Only
+        the pages being accessed are resident in memory, and `evict`
+        hands finished rows back to the page cache, so memory stays
+        bounded whatever the size of the image. An existing file of the
+        right size is reused as is (e.g.: to resume a render).
+
+        Args:
+            path (str): Path to the file (created if needed).
+            width (int): Width of the image (in pixels).
+            height (int): Height of the image (in pixels).
+
+        Returns:
+            FrameBuffer: Memory-mapped framebuffer.
+        """
+        nbytes = 12 * width * height
+        with open(path, "a+b") as file:
+            if os.fstat(file.fileno()).st_size != nbytes:
+                file.truncate(nbytes)  # Sparse file of zeros (black image)
+            buffer = mmap.mmap(file.fileno(), nbytes)
+        framebuffer = cls(width, height, buffer)
+        framebuffer.path = path
+        return framebuffer
+
+    @classmethod
+    def shared(cls, width: int, height: int) -> FrameBuffer:
+        """
+        Create a framebuffer stored in a shared memory block.
+
+        Note: Other processes attach to the block by its name
+        (`shm_name`) and write the pixels in place. The framebuffer owns
+        the block: it is destroyed when the framebuffer is released or
+        garbage collected.
+
+        Args:
+            width (int): Width of the image (in pixels).
+            height (int): Height of the image (in pixels).
+
+        Returns:
+            FrameBuffer: Shared framebuffer (black image).
+        """
+        block = shared_memory.SharedMemory(create=True, size=12 * width * height)
+        framebuffer = cls(width, height, block.buf)
+        framebuffer._own_block(block)
+        return framebuffer
+
+    def share(self):
+        """
+        Move the pixels of an in-memory framebuffer to a shared memory
+        block (see `shared`). No-op for shared framebuffers.
+
+        Note: The framebuffer stays the same object (e.g.: the image of
+        a scene rendered by several processes), only its storage
+        changes: views of the pixels taken before (`pixels`, NumPy
+        arrays) do not see the later changes.
+
+        Raises:
+            ValueError: If the framebuffer is memory-mapped (other
+                processes map its file instead).
+        """
+        if self.shm_name is not None:
+            return
+        if self.path is not None:
+            raise ValueError("A memory-mapped framebuffer is shared through its file.")
+        block = shared_memory.SharedMemory(create=True, size=self.nbytes)
+        pixels = memoryview(block.buf).cast("B")[: self.nbytes].cast("f")
+        pixels[:] = self._pixels
+        self._pixels = pixels
+        self._own_block(block)
+
+    def _own_block(self, block: shared_memory.SharedMemory):
+        """
+        Register the shared memory block the pixels are stored in.
+        """
+        self.shm_name = block.name
+        self._shm = weakref.finalize(self, _destroy_block, block, self._pixels)
+
+    def __buffer__(self, flags: int) -> memoryview:
+        return self._pixels.cast("B").cast("f", (self.height, self.width, 3))
+
+    def __len__(self) -> int:
+        return self.height
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Size of the pixels (in bytes).
+        """
+        return 12 * self.width * self.height
+
+    @property
+    def pixels(self) -> memoryview:
+        """
+        Flat float32 view of the pixels (row by row).
+        """
+        return self._pixels
+
+    def set_pixel(self, i: int, j: int, r: float, g: float, b: float):
+        """
+        Set the color of a given pixel.
+
+        Args:
+            i (int): Pixel row coordinate.
+            j (int): Pixel column coordinate.
+            r (float): Red component.
+            g (float): Green component.
+            b (float): Blue component.
+        """
+        k = 3 * (i * self.width + j)
+        pixels = self._pixels
+        pixels[k] = r
+        pixels[k + 1] = g
+        pixels[k + 2] = b
+
+    def get_pixel(self, i: int, j: int) -> tuple[float, float, float]:
+        """
+        Return the color of a given pixel.
+
+        Args:
+            i (int): Pixel row coordinate.
+            j (int): Pixel column coordinate.
+
+        Returns:
+            tuple[float, float, float]: RGB components.
+        """
+        k = 3 * (i * self.width + j)
+        return tuple(self._pixels[k : k + 3])
+
+    def get_row(self, i: int) -> memoryview:
+        """
+        Return a row of the image.
+
+        Args:
+            i (int): Pixel row coordinate.
+
+        Returns:
+            memoryview: Flat float32 view of the RGB values of the row.
+        """
+        start = 3 * i * self.width
+        return self._pixels[start : start + 3 * self.width]
+
+    def write_row(self, i: int, values, j_start: int = 0):
+        """
+        Write consecutive pixels of a row.
+
+        Args:
+            i (int): Pixel row coordinate.
+            values: Flat RGB values of the pixels (float32 buffer or
+                iterable of floats).
+            j_start (int, optional): Column of the first pixel.
+                Defaults to 0.
+        """
+        values = _as_float32(values)
+        start = 3 * (i * self.width + j_start)
+        self._pixels[start : start + len(values)] = values
+
+    def write_tile(self, tile: Tile, values):
+        """
+        Write the pixels of a tile.
+
+        Args:
+            tile (Tile): First row, last row (excluded), first column
+                and last column (excluded) of the tile.
+            values: Flat RGB values of the pixels of the tile (row by
+                row).
+        """
+        i_start, i_stop, j_start, j_stop = tile
+        values = _as_float32(values)
+        row_size = 3 * (j_stop - j_start)
+        for k, i in enumerate(range(i_start, i_stop)):
+            self.write_row(
+                i, values[k * row_size : (k + 1) * row_size], j_start=j_start
+            )
+
+    def fill_tile(self, tile: Tile, r: float, g: float, b: float):
+        """
+        Set the color of all the pixels of a tile.
+
+        Args:
+            tile (Tile): First row, last row (excluded), first column
+                and last column (excluded) of the tile.
+            r (float): Red component.
+            g (float): Green component.
+            b (float): Blue component.
+        """
+        i_start, i_stop, j_start, j_stop = tile
+        row = array("f", [r, g, b]) * (j_stop - j_start)
+        for i in range(i_start, i_stop):
+            self.write_row(i, row, j_start=j_start)
+
+    def evict(self, i_start: int, i_stop: int):
+        """
+        Drop rows of a memory-mapped framebuffer from the memory of the
+        process (their pixels stay in the file). No-op for in-memory
+        framebuffers.
+
+        Args:
+            i_start (int): First row.
+            i_stop (int): Last row (excluded).
+        """
+        if self._mmap is None:
+            return
+        start = 12 * self.width * i_start
+        start -= start % mmap.PAGESIZE
+        stop = min(12 * self.width * i_stop, self.nbytes)
+        if stop > start:
+            self._mmap.madvise(mmap.MADV_DONTNEED, start, stop - start)
+
+    def flush(self):
+        """
+        Write the pixels of a memory-mapped framebuffer to its file.
+        No-op for in-memory framebuffers.
+        """
+        if self._mmap is not None:
+            self._mmap.flush()
+
+    def release(self):
+        """
+        Release the buffer the pixels are stored in (e.g.: before
+        closing a shared memory block). Memory-mapped framebuffers are
+        flushed to their file and unmapped.
+        """
+        self._pixels.release()
+        if self._mmap is not None:
+            self._mmap.flush()
+            self._mmap.close()
+        if self._shm is not None:
+            self._shm()
+
+    def to_numpy(self):
+        """
+        Return a NumPy view (no copy) of the pixels.
+
+        Returns:
+            numpy.ndarray: Array of shape (height, width, 3).
+        """
+        import numpy as np  # pylint: disable=import-outside-toplevel
+
+        return np.asarray(self)
+
+    def tolist(self) -> list[list[list[float]]]:
+        """
+        Return the pixels as nested lists.
+        """
+        return self.__buffer__(0).tolist()
+
+
+def _destroy_block(block: shared_memory.SharedMemory, pixels: memoryview):
+    """
+    Close and destroy the shared memory block of a framebuffer.
+    """
+    try:
+        pixels.release()
+        block.close()
+    except BufferError:
+        pass  # Still viewed (e.g.: NumPy array), unmapped on exit
+    try:
+        block.unlink()
+    except FileNotFoundError:
+        pass  # Already destroyed
+
+
+def _as_float32(values) -> array | memoryview:
+    """
+    Return values as a float32 buffer (converted only if needed).
+    """
+    if isinstance(values, array) and values.typecode == "f":
+        return values
+    if isinstance(values, memoryview) and values.format == "f":
+        return values
+    return array("f", values)
+
+
+def split_tiles(screen_size: tuple[int, int], tile_size: int) -> Iterator[Tile]:
+    """
+    Split the screen into square tiles.
+
+    Args:
+        screen_size (tuple[int, int]): Size of the screen.
+        tile_size (int): Size of the tiles (in pixels).
+
+    Returns:
+        Iterator[Tile]: Tiles covering the screen (row by row), created
+            lazily (there are ~1M tiles in a 30000x30000 image).
+    """
+    width, height = screen_size
+    return (
+        (i, min(i + tile_size, height), j, min(j + tile_size, width))
+        for i in range(0, height, tile_size)
+        for j in range(0, width, tile_size)
+    )
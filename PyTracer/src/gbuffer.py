@@ -0,0 +1,211 @@
+"""
+This module contains the GBuffer class and the G-buffer tile renderer.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from array import array
+from typing import TYPE_CHECKING
+
+from .color import Color
+from .framebuffer import Tile
+from .point import Point
+from .shadow_cache import ShadowCache
+from .vector import Vector
+
+if TYPE_CHECKING:
+    from .scene import Scene
+
+
+def geometry_fingerprint(scene: Scene, omega: Point) -> str:
+    """
+    Return a fingerprint of everything that determines the primary hits
+    of a render: geometry of the spheres and camera.
+
+    Note: Colors, reflection coefficients, lights and background color
+    are left out (they only change the shading).
+
+    Args:
+        scene (Scene): Scene.
+        omega (Point): Observation point.
+
+    Returns:
+        str: SHA-256 digest (hexadecimal).
+    """
+    values = [*scene.view_size, *scene.screen_size, omega.x, omega.y, omega.z]
+    for s in scene.spheres:
+        values += [s.center.x, s.center.y, s.center.z, s.rad]
+    return hashlib.sha256(repr(values).encode()).hexdigest()
+
+
+class GBuffer:
+    """
+    Class representing the primary hits of a render (geometry buffer).
+
+    Note: For each pixel: index of the sphere hit by the primary ray (-1
+    for the background), distance to the hit along the ray and normal
+    of the sphere at the hit point (36 bytes per pixel). Distances and
+    normals are kept in double precision so that shading from the
+    buffer gives exactly the colors of a full render.
+    """
+
+    def __init__(self, width: int, height: int):
+        """
+        Initialise GBuffer instance (no pixel stored).
+
+        Args:
+            width (int): Width of the image (in pixels).
+            height (int): Height of the image (in pixels).
+        """
+        self.width: int = width
+        self.height: int = height
+        # Fingerprint of the geometry and camera (see
+        # `geometry_fingerprint`), `None` until all pixels are stored
+        self.fingerprint: str | None = None
+        n_pixels = width * height
+        self.spheres: array = array("i", [-1]) * n_pixels
+        self.distances: array = array("d", [0.0]) * n_pixels
+        self.normals: array = array("d", [0.0]) * (3 * n_pixels)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Size of the buffer (in bytes).
+        """
+        return (
+            self.spheres.itemsize * len(self.spheres)
+            + self.distances.itemsize * len(self.distances)
+            + self.normals.itemsize * len(self.normals)
+        )
+
+    def store(
+        self, i: int, j: int, sphere: int, distance: float, normal: Vector | None
+    ):
+        """
+        Store the primary hit of a pixel.
+
+        Args:
+            i (int): Pixel row coordinate.
+            j (int): Pixel column coordinate.
+            sphere (int): Index of the sphere hit (-1 for the
+                background).
+            distance (float): Distance to the hit along the ray.
+            normal (Vector | None): Normal of the sphere at the hit
+                point (`None` for the background).
+        """
+        k = i * self.width + j
+        self.spheres[k] = sphere
+        self.distances[k] = distance
+        if normal is None:
+            return
+        self.normals[3 * k] = normal.x
+        self.normals[3 * k + 1] = normal.y
+        self.normals[3 * k + 2] = normal.z
+
+    def hit(self, i: int, j: int) -> tuple[int, float, Vector]:
+        """
+        Return the primary hit of a pixel.
+
+        Args:
+            i (int): Pixel row coordinate.
+            j (int): Pixel column coordinate.
+
+        Returns:
+            tuple[int, float, Vector]: Index of the sphere hit (-1 for
+                the background), distance to the hit along the ray and
+                normal of the sphere at the hit point.
+        """
+        k = i * self.width + j
+        normals = self.normals
+        return (
+            self.spheres[k],
+            self.distances[k],
+            Vector(normals[3 * k], normals[3 * k + 1], normals[3 * k + 2]),
+        )
+
+
+def gbuffer_pixel_color(
+    scene: Scene,
+    omega: Point,
+    bg_color: Color,
+    i: int,
+    j: int,
+    gbuffer: GBuffer,
+    indices: dict[int, int],
+    shadow_cache: ShadowCache | None = None,
+) -> Color:
+    """
+    Compute the color of a given pixel, shading its primary hit from
+    a G-buffer if complete, or storing it in the G-buffer otherwise.
+
+    Args:
+        scene (Scene): Scene.
+        omega (Point): Observation point.
+        bg_color (Color): Background color.
+        i (int): Pixel row coordinate.
+        j (int): Pixel column coordinate.
+        gbuffer (GBuffer): G-buffer of the geometry and camera.
+        indices (dict[int, int]): Index of each sphere (by `id`).
+        shadow_cache (ShadowCache | None, optional): Cache of the
+            last occluders. Defaults to None.
+
+    Returns:
+        Color: Color of the pixel.
+    """
+    if gbuffer.fingerprint is None:
+        ray = scene.ray_from_pixel(omega, i, j)
+        t, sphere = scene.closest_hit(ray)
+        if sphere is None:
+            gbuffer.store(i, j, -1, t, None)
+            return bg_color
+        point = ray.follow_ray(t)
+        normal = sphere.normal_at_point(point)
+        gbuffer.store(i, j, indices[id(sphere)], t, normal)
+    else:
+        index, t, normal = gbuffer.hit(i, j)
+        if index < 0:
+            return bg_color  # No ray needed
+        sphere = scene.spheres[index]
+        ray = scene.ray_from_pixel(omega, i, j)
+        point = ray.follow_ray(t)
+    return scene.shade(ray, bg_color, point, sphere, shadow_cache, normal)
+
+
+def render_gbuffer_tile(
+    scene: Scene,
+    omega: Point,
+    bg_color: Color,
+    tile: Tile,
+    gbuffer: GBuffer,
+    shadow_cache: ShadowCache | None = None,
+) -> list[list[Color]]:
+    """
+    Compute the colors of the pixels of a tile from a G-buffer (see
+    `gbuffer_pixel_color`).
+
+    Args:
+        scene (Scene): Scene.
+        omega (Point): Observation point.
+        bg_color (Color): Background color.
+        tile (Tile): First row, last row (excluded), first column and
+            last column (excluded) of the tile.
+        gbuffer (GBuffer): G-buffer to shade from (or to fill).
+        shadow_cache (ShadowCache | None, optional): Cache of the last
+            occluders. Defaults to None.
+
+    Returns:
+        list[list[Color]]: Colors of the pixels of the tile (row by
+            row).
+    """
+    i_start, i_stop, j_start, j_stop = tile
+    indices = {id(sphere): k for k, sphere in enumerate(scene.spheres)}
+    return [
+        [
+            gbuffer_pixel_color(
+                scene, omega, bg_color, i, j, gbuffer, indices, shadow_cache
+            )
+            for j in range(j_start, j_stop)
+        ]
+        for i in range(i_start, i_stop)
+    ]
@@ -0,0 +1,232 @@
+"""
+This module contains the UniformGrid class.
+"""
+
+import time
+from math import inf
+
+from .bounds import Bounds, inverse_direction, ray_box, sphere_bounds, union_all
+from .ray import Ray
+from .sphere import Sphere
+
+
+class UniformGrid:
+    """
+    Class representing a uniform grid over spheres.
+
+    Note: Rays walk through the cells of the grid with a 3D-DDA and
+    only test the spheres overlapping the cells they cross. The grid
+    answers the same queries as the linear scans of `Scene` and must be
+    rebuilt if the spheres of the scene change.
+    """
+
+    def __init__(
+        self,
+        spheres: list[Sphere],
+        density: float = 2.0,
+        max_resolution: int = 128,
+    ):
+        """
+        Initialise UniformGrid instance.
+
+        Note: The resolution is chosen so that the grid has about
+        `density` cells per sphere, with cells as close to cubes as
+        the bounds of the scene allow.
+
+        Args:
+            spheres (list[Sphere]): Spheres.
+            density (float, optional): Number of cells per sphere.
+                Defaults to 2.0.
+            max_resolution (int, optional): Maximum number of cells
+                along an axis. Defaults to 128.
+        """
+        start = time.perf_counter()
+
+        self.density: float = density
+        self.max_resolution: int = max_resolution
+
+        # Statistics
+        self.n_rays: int = 0
+        self.n_cells_visited: int = 0
+
+        self.bounds: Bounds | None = None
+        self.resolution: tuple[int, int, int] = (0, 0, 0)
+        self.cells: list[list[Sphere]] = []
+        if spheres:
+            self._build(spheres, density, max_resolution)
+
+        self.build_time: float = time.perf_counter() - start
+
+    def _build(self, spheres: list[Sphere], density: float, max_resolution: int):
+        """
+        Choose the resolution of the grid and insert the spheres in the
+        cells they overlap.
+        """
+        all_bounds = [sphere_bounds(s) for s in spheres]
+        b = union_all(all_bounds)
+        extent = [max(b[axis + 3] - b[axis], 1e-9) for axis in range(3)]
+        volume = extent[0] * extent[1] * extent[2]
+        cells_per_unit = (density * len(spheres) / volume) ** (1 / 3)
+        self.resolution = tuple(
+            max(1, min(max_resolution, round(e * cells_per_unit))) for e in extent
+        )
+        self.bounds = b
+        self._cell_size = tuple(extent[a] / self.resolution[a] for a in range(3))
+
+        n_x, n_y, n_z = self.resolution
+        self.cells = [[] for _ in range(n_x * n_y * n_z)]
+        for sphere, sb in zip(spheres, all_bounds):
+            lo = self._cell_coordinates(sb[0], sb[1], sb[2])
+            hi = self._cell_coordinates(sb[3], sb[4], sb[5])
+            for i_z in range(lo[2], hi[2] + 1):
+                for i_y in range(lo[1], hi[1] + 1):
+                    for i_x in range(lo[0], hi[0] + 1):
+                        self.cells[(i_z * n_y + i_y) * n_x + i_x].append(sphere)
+
+    def _cell_coordinates(self, x: float, y: float, z: float) -> tuple[int, int, int]:
+        """
+        Return the coordinates of the cell containing a point (clamped
+        to the grid).
+        """
+        return tuple(
+            max(
+                0,
+                min(
+                    self.resolution[a] - 1,
+                    int((v - self.bounds[a]) / self._cell_size[a]),
+                ),
+            )
+            for a, v in enumerate((x, y, z))
+        )
+
+    @property
+    def cells_per_ray(self) -> float:
+        """
+        Average number of cells visited per ray since the grid was
+        built.
+        """
+        return self.n_cells_visited / self.n_rays if self.n_rays else 0.0
+
+    def _walk(self, ray: Ray):
+        """
+        Walk through the cells crossed by a ray (3D-DDA).
+
+        Args:
+            ray (Ray): Ray.
+
+        Yields:
+            tuple[list[Sphere], float, float]: Spheres of the cell, and
+                distances at which the ray enters and exits the cell.
+        """
+        self.n_rays += 1
+        if self.bounds is None:
+            return
+        src = (ray.src.x, ray.src.y, ray.src.z)
+        inv_dir = inverse_direction(ray)
+        t_entry = ray_box(self.bounds, src, inv_dir)
+        if t_entry is None:
+            return
+
+        # Cell containing the entry point
+        cell = list(
+            self._cell_coordinates(
+                ray.src.x + t_entry * ray.dir.x,
+                ray.src.y + t_entry * ray.dir.y,
+                ray.src.z + t_entry * ray.dir.z,
+            )
+        )
+        step = [0, 0, 0]
+        t_next = [inf, inf, inf]  # Distance to the next cell boundary
+        t_delta = [inf, inf, inf]  # Distance between cell boundaries
+        for a in range(3):
+            if inv_dir[a] == inf:
+                continue
+            if inv_dir[a] > 0:
+                step[a] = 1
+                boundary = self.bounds[a] + (cell[a] + 1) * self._cell_size[a]
+            else:
+                step[a] = -1
+                boundary = self.bounds[a] + cell[a] * self._cell_size[a]
+            t_next[a] = (boundary - src[a]) * inv_dir[a]
+            t_delta[a] = self._cell_size[a] * abs(inv_dir[a])
+
+        n_x, n_y, n_z = self.resolution
+        while True:
+            self.n_cells_visited += 1
+            axis = min(range(3), key=t_next.__getitem__)
+            t_exit = t_next[axis]
+            yield self.cells[(cell[2] * n_y + cell[1]) * n_x + cell[0]], t_entry, t_exit
+            cell[axis] += step[axis]
+            if not 0 <= cell[axis] < (n_x, n_y, n_z)[axis]:
+                return
+            t_entry = t_exit
+            t_next[axis] += t_delta[axis]
+
+    def closest_hit(
+        self, ray: Ray, t_max: float = inf, exclude: Sphere | None = None
+    ) -> tuple[float, Sphere | None]:
+        """
+        Find the closest sphere hit by a ray.
+
+        Note: Same query as `Scene.closest_hit`.
+
+        Args:
+            ray (Ray): Ray.
+            t_max (float, optional): Ignore hits farther than this
+                distance. Defaults to inf.
+            exclude (Sphere | None, optional): Sphere to ignore.
+                Defaults to None.
+
+        Returns:
+            tuple[float, Sphere | None]: Distance to the hit and sphere
+                hit, (`t_max`, `None`) if the ray does not hit any
+                sphere.
+        """
+        hit_sphere = None
+        tested = set()  # Spheres overlapping several cells are tested once
+        for spheres, t_entry, t_exit in self._walk(ray):
+            if t_entry >= t_max:
+                break
+            for sphere in spheres:
+                if sphere is exclude or id(sphere) in tested:
+                    continue
+                tested.add(id(sphere))
+                t = sphere.intersection_distance(ray, t_max)
+                if t is not None:
+                    t_max = t
+                    hit_sphere = sphere
+            # Hits in later cells are necessarily farther
+            if t_max <= t_exit:
+                break
+        return t_max, hit_sphere
+
+    def any_hit(
+        self, ray: Ray, t_max: float = inf, exclude: Sphere | None = None
+    ) -> Sphere | None:
+        """
+        Find any sphere hit by a ray.
+
+        Note: Same query as `Scene.any_hit`.
+
+        Args:
+            ray (Ray): Ray.
+            t_max (float, optional): Ignore hits farther than this
+                distance. Defaults to inf.
+            exclude (Sphere | None, optional): Sphere to ignore.
+                Defaults to None.
+
+        Returns:
+            Sphere | None: A sphere hit by the ray, `None` if the ray
+                does not hit any sphere.
+        """
+        tested = set()
+        for spheres, t_entry, _ in self._walk(ray):
+            if t_entry >= t_max:
+                break
+            for sphere in spheres:
+                if sphere is exclude or id(sphere) in tested:
+                    continue
+                tested.add(id(sphere))
+                if sphere.intersection_distance(ray, t_max) is not None:
+                    return sphere
+        return None
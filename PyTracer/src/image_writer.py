@@ -0,0 +1,213 @@
+"""
+This module contains the ImageWriter classes.
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+import zlib
+from abc import ABC, abstractmethod
+from typing import Self
+
+from .framebuffer import FrameBuffer
+
+
+class ImageWriter(ABC):
+    """
+    Class representing an image file written row by row.
+
+    Note: Rows are flat RGB float values in [0, 1] (e.g.:
+    `FrameBuffer.get_row`), converted to 8 bits per component. Only the
+    current row is held in memory, whatever the size of the image.
+    """
+
+    def __init__(self, path: str, width: int, height: int):
+        """
+        Initialise ImageWriter instance.
+
+        Args:
+            path (str): Path to the image file.
+            width (int): Width of the image (in pixels).
+            height (int): Height of the image (in pixels).
+        """
+        self.path: str = path
+        self.width: int = width
+        self.height: int = height
+        self.n_rows: int = 0  # Number of rows written
+        self._file = open(path, "wb")  # noqa: SIM115  # pylint: disable=consider-using-with
+        self._write_header()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()  # Incomplete file
+
+    def _write_header(self):
+        """
+        Write the beginning of the file.
+        """
+
+    @abstractmethod
+    def _write_pixels(self, data: bytes):
+        """
+        Write the 8-bit RGB components of a row.
+        """
+
+    def _write_footer(self):
+        """
+        Write the end of the file.
+        """
+
+    def write_row(self, values):
+        """
+        Write the next row of the image.
+
+        Args:
+            values: Flat RGB values of the pixels of the row (floats in
+                [0, 1]).
+        """
+        if self.n_rows >= self.height:
+            raise ValueError(f"{self.path}: all {self.height} rows already written")
+        if len(values) != 3 * self.width:
+            raise ValueError(
+                f"{self.path}: expected {3 * self.width} values, got {len(values)}"
+            )
+        self._write_pixels(bytes([int(v * 255 + 0.5) for v in values]))
+        self.n_rows += 1
+
+    def close(self):
+        """
+        Finish writing the file.
+        """
+        if self._file.closed:
+            return
+        try:
+            if self.n_rows != self.height:
+                raise ValueError(
+                    f"{self.path}: {self.n_rows} of {self.height} rows written"
+                )
+            self._write_footer()
+        finally:
+            self._file.close()
+
+
+class PPMWriter(ImageWriter):
+    """
+    Class representing a binary PPM (P6) image written row by row.
+    """
+
+    def _write_header(self):
+        self._file.write(f"P6\n{self.width} {self.height}\n255\n".encode("ascii"))
+
+    def _write_pixels(self, data: bytes):
+        self._file.write(data)
+
+
+class PNGWriter(ImageWriter):
+    """
+    Class representing a PNG image written row by row.
+
+    Note: Rows are compressed with zlib as they are written and emitted
+    in IDAT chunks of about `CHUNK_SIZE` bytes.
+    """
+
+    CHUNK_SIZE = 1 << 16
+
+    def __init__(self, path: str, width: int, height: int, compression: int = 6):
+        """
+        Initialise PNGWriter instance.
+
+        Args:
+            path (str): Path to the image file.
+            width (int): Width of the image (in pixels).
+            height (int): Height of the image (in pixels).
+            compression (int, optional): zlib compression level (0 to
+                9). Defaults to 6.
+        """
+        self._compressor = zlib.compressobj(compression)
+        self._pending: list[bytes] = []
+        self._n_pending: int = 0
+        super().__init__(path, width, height)
+
+    def _write_chunk(self, chunk_type: bytes, data: bytes):
+        """
+        Write a PNG chunk.
+        """
+        self._file.write(struct.pack(">I", len(data)))
+        self._file.write(chunk_type)
+        self._file.write(data)
+        self._file.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(chunk_type))))
+
+    def _flush_pending(self):
+        """
+        Write the pending compressed data in an IDAT chunk.
+        """
+        if self._pending:
+            self._write_chunk(b"IDAT", b"".join(self._pending))
+            self._pending = []
+            self._n_pending = 0
+
+    def _write_header(self):
+        self._file.write(b"\x89PNG\r\n\x1a\n")
+        # Bit depth 8, color type 2 (RGB), default compression and
+        # filter methods, no interlacing
+        self._write_chunk(
+            b"IHDR", struct.pack(">IIBBBBB", self.width, self.height, 8, 2, 0, 0, 0)
+        )
+
+    def _write_pixels(self, data: bytes):
+        compressed = self._compressor.compress(b"\x00" + data)  # Filter type 0
+        if compressed:
+            self._pending.append(compressed)
+            self._n_pending += len(compressed)
+            if self._n_pending >= self.CHUNK_SIZE:
+                self._flush_pending()
+
+    def _write_footer(self):
+        self._pending.append(self._compressor.flush())
+        self._flush_pending()
+        self._write_chunk(b"IEND", b"")
+
+
+WRITERS = {".ppm": PPMWriter, ".png": PNGWriter}
+
+
+def image_writer(path: str, width: int, height: int) -> ImageWriter:
+    """
+    Create an image writer for the format given by the extension of the
+    path.
+
+    Args:
+        path (str): Path to the image file (".png" or ".ppm").
+        width (int): Width of the image (in pixels).
+        height (int): Height of the image (in pixels).
+
+    Returns:
+        ImageWriter: Image writer.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in WRITERS:
+        raise ValueError(f"Unsupported image format {extension!r} ({path})")
+    return WRITERS[extension](path, width, height)
+
+
+def save_image(path: str, image: FrameBuffer):
+    """
+    Write an image to a file (pixel-exact, no resampling).
+
+    Note: Rows are read one at a time, so a memory-mapped image is
+    converted without loading it in memory.
+
+    Args:
+        path (str): Path to the image file (".png" or ".ppm").
+        image (FrameBuffer): Image.
+    """
+    with image_writer(path, image.width, image.height) as writer:
+        for i in range(image.height):
+            writer.write_row(image.get_row(i))
+            image.evict(i, i + 1)
@@ -0,0 +1,253 @@
+"""
+This module contains the NumpyTracer class.
+"""
+
+import numpy as np
+
+from .color import Color
+from .point import Point
+from .scene import Scene, SceneWithReflections
+
+
+class NumpyTracer:
+    """
+    Class representing a vectorised ray tracing engine.
+
+    Note: The engine renders the scene described by a `Scene` (or
+    `SceneWithReflections`) instance. All the rays of a frame are
+    handled at once as NumPy arrays and the loops only run over the
+    spheres, the lights and the reflections.
+    """
+
+    def __init__(self, scene: Scene):
+        """
+        Initialise NumpyTracer instance.
+
+        Args:
+            scene (Scene): Scene to render.
+        """
+        self.scene: Scene = scene
+
+        # Sphere attributes as arrays
+        n_spheres = len(scene.spheres)
+        self._centers = np.array(
+            [(s.center.x, s.center.y, s.center.z) for s in scene.spheres],
+            dtype=np.float64,
+        ).reshape(n_spheres, 3)
+        self._rads = np.array([s.rad for s in scene.spheres], dtype=np.float64)
+        self._colors = np.array(
+            [(s.color.r, s.color.g, s.color.b) for s in scene.spheres],
+            dtype=np.float64,
+        ).reshape(n_spheres, 3)
+        self._reflections = np.array(
+            [s.reflection for s in scene.spheres], dtype=np.float64
+        )
+
+    def primary_rays(self, omega: Point) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Create the rays going through every pixel of the screen.
+
+        Args:
+            omega (Point): Observation point.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Sources and normalised
+                directions of the rays (arrays of shape (H, W, 3)).
+        """
+        scene = self.scene
+        width, height = scene.screen_size
+        # See Scene.pixel_to_point
+        x = (np.arange(width) - scene._center[0] + 0.5) * scene._delta_x  # pylint: disable=protected-access
+        y = -(np.arange(height) - scene._center[1] + 0.5) * scene._delta_y  # pylint: disable=protected-access
+        dirs = np.empty((height, width, 3), dtype=np.float64)
+        dirs[..., 0] = x[np.newaxis, :] - omega.x
+        dirs[..., 1] = y[:, np.newaxis] - omega.y
+        dirs[..., 2] = -omega.z  # The screen is located on the plane z = 0
+        srcs = np.empty_like(dirs)
+        srcs[...] = (omega.x, omega.y, omega.z)
+        return srcs, _normalise(dirs)
+
+    def _ray_intersection(
+        self, k: int, srcs: np.ndarray, dirs: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Compute the intersections of rays with a sphere.
+
+        Note: Batched version of `Sphere.ray_intersection`.
+
+        Args:
+            k (int): Sphere index.
+            srcs (np.ndarray): Sources of the rays.
+            dirs (np.ndarray): Normalised directions of the rays.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Mask of the rays hitting the
+                sphere and corresponding distance along the rays.
+        """
+        center_to_src = srcs - self._centers[k]
+        sq_dist = _dot(center_to_src, center_to_src)
+        b = 2 * _dot(dirs, center_to_src)
+        c = sq_dist - self._rads[k] * self._rads[k]
+        delta = b * b - 4 * c
+        sqrt_delta = np.sqrt(np.maximum(delta, 0))
+        r1 = -b - sqrt_delta
+        r2 = -b + sqrt_delta
+        hit = (
+            (np.sqrt(sq_dist) > self._rads[k])  # Ray source outside the sphere
+            & (delta >= 0)
+            & ((r1 >= 0) | (r2 >= 0))
+        )
+        return hit, np.minimum(r1, r2) / 2
+
+    def interception(
+        self, srcs: np.ndarray, dirs: np.ndarray, exception_spheres: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Compute the first material point reached by each ray.
+
+        Note: Batched version of `Scene.interception`.
+
+        Args:
+            srcs (np.ndarray): Sources of the rays.
+            dirs (np.ndarray): Normalised directions of the rays.
+            exception_spheres (np.ndarray): Index of the sphere to
+                ignore for each ray (-1 to consider every sphere).
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Points reached by the rays
+                and index of the corresponding sphere (-1 if the ray
+                does not intercept any object).
+        """
+        best_distance = np.full(srcs.shape[:-1], np.inf)
+        best_t = np.zeros(srcs.shape[:-1])
+        best_sphere = np.full(srcs.shape[:-1], -1, dtype=np.intp)
+        for k in range(len(self.scene.spheres)):
+            hit, t = self._ray_intersection(k, srcs, dirs)
+            # Rays are normalised so the distance to the source is |t|
+            closer = hit & (exception_spheres != k) & (np.abs(t) < best_distance)
+            best_distance = np.where(closer, np.abs(t), best_distance)
+            best_t = np.where(closer, t, best_t)
+            best_sphere = np.where(closer, k, best_sphere)
+        points = srcs + best_t[..., np.newaxis] * dirs
+        return points, best_sphere
+
+    def diffused_color(self, points: np.ndarray, spheres: np.ndarray) -> np.ndarray:
+        """
+        Compute the color diffused by points on the surface of spheres.
+
+        Note: Batched version of `Scene.diffused_color`.
+
+        Args:
+            points (np.ndarray): Points on the surface of the spheres.
+            spheres (np.ndarray): Index of the sphere of each point.
+
+        Returns:
+            np.ndarray: Colors diffused by the points.
+        """
+        centers = self._centers[spheres]
+        normals = _normalise(points - centers)
+        colors = np.zeros_like(points)
+        for light in self.scene.lights:
+            light_position = np.array(
+                (light.position.x, light.position.y, light.position.z)
+            )
+            light_color = np.array((light.color.r, light.color.g, light.color.b))
+            # See Sphere.is_ray_above_surface
+            visible = _dot(normals, light_position - points) > 0
+            # Check if ray not hidden by other sphere before reaching the point
+            # (see Scene.any_hit)
+            light_to_points = points - light_position
+            dst = np.linalg.norm(light_to_points, axis=-1)
+            dirs = _normalise(light_to_points)
+            srcs = np.broadcast_to(light_position, points.shape)
+            for k in range(len(self.scene.spheres)):
+                candidates = visible & (spheres != k)
+                if not candidates.any():
+                    continue
+                hit, t = self._ray_intersection(k, srcs, dirs)
+                visible &= ~(candidates & hit & (t < dst))
+            # See Sphere.diffused_color
+            diffused = (
+                self._colors[spheres]
+                * light_color
+                * np.cos(_dot(dirs, normals))[..., np.newaxis]
+            )
+            colors += np.where(visible[..., np.newaxis], diffused, 0)
+        return np.clip(colors, 0, 1)
+
+    def ray_trace(self, omega: Point, bg_color: Color):
+        """
+        Generate image of the scene with ray tracing.
+
+        Note: Handle light reflections if the scene is a
+        `SceneWithReflections` instance. The result is stored in the
+        `image` attribute of the scene.
+
+        Args:
+            omega (Point): Observation point.
+            bg_color (Color): Background color.
+        """
+        srcs, dirs = self.primary_rays(omega)
+        n_reflections = (
+            self.scene.n_max_reflections
+            if isinstance(self.scene, SceneWithReflections)
+            else 1
+        )
+        threshold = getattr(self.scene, "reflection_threshold", 0.0)
+
+        # Compute the successive material points reached by the rays
+        # (see SceneWithReflections.reflections)
+        intersections = []
+        spheres = np.full(srcs.shape[:-1], -1, dtype=np.intp)
+        active = np.ones(srcs.shape[:-1], dtype=bool)
+        weights = np.ones(srcs.shape[:-1])  # Of the colors of the last points
+        for level in range(n_reflections):
+            points, spheres = self.interception(srcs, dirs, spheres)
+            active &= spheres >= 0
+            if level > 0 and threshold > 0:
+                weights = weights * self._reflections[np.maximum(spheres, 0)]
+                active &= weights >= threshold
+            if not active.any():
+                break
+            spheres = np.where(active, spheres, -1)
+            intersections.append((points, spheres, active.copy()))
+            # See Sphere.reflected_ray
+            srcs, dirs = points, -dirs
+
+        # Combine colors from the last reflection to the first one
+        # (see SceneWithReflections.reflected_color)
+        image = np.empty(srcs.shape)
+        image[...] = (bg_color.r, bg_color.g, bg_color.b)
+        next_color = None
+        next_spheres = None
+        next_active = None
+        for points, spheres, active in reversed(intersections):
+            color = self.diffused_color(points, np.maximum(spheres, 0))
+            if next_color is not None:
+                reflected = (
+                    self._reflections[np.maximum(next_spheres, 0)][..., np.newaxis]
+                    * next_color
+                )
+                color = np.where(
+                    next_active[..., np.newaxis],
+                    np.clip(color + reflected, 0, 1),
+                    color,
+                )
+            image = np.where(active[..., np.newaxis], color, image)
+            next_color, next_spheres, next_active = color, spheres, active
+        self.scene.image.to_numpy()[...] = image
+
+
+def _dot(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Compute the dot product between arrays of vectors.
+    """
+    return np.einsum("...i,...i->...", a, b)
+
+
+def _normalise(vectors: np.ndarray) -> np.ndarray:
+    """
+    Normalise arrays of vectors (null vectors are left untouched).
+    """
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return np.divide(vectors, norms, out=vectors.copy(), where=norms > 0)
@@ -0,0 +1,302 @@
+"""
+This module contains helpers to trace primary rays by packets.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from math import inf, sqrt
+from typing import TYPE_CHECKING
+
+from .bvh import BVH
+from .color import Color
+from .framebuffer import Tile
+from .point import Point
+from .ray import Ray
+from .screen_bins import MARGIN, ScreenBins
+from .shadow_cache import ShadowCache
+from .sphere import Sphere, quadratic_distance
+
+if TYPE_CHECKING:
+    from .scene import Scene
+
+Plane = tuple[float, float, float]  # Normal of a plane through omega
+
+
+def packet_frustum(scene: Scene, omega: Point, block: Tile) -> list[Plane] | None:
+    """
+    Compute the side planes of the frustum bounding the primary rays of
+    a block of pixels.
+
+    Note: The planes go through the observation point and the edges of
+    the rectangle of the screen spanned by the centers of the pixels.
+    Their normals point inwards: every primary ray of the block is on
+    the positive side of every plane.
+
+    Args:
+        scene (Scene): Scene.
+        omega (Point): Observation point.
+        block (Tile): First row, last row (excluded), first column and
+            last column (excluded) of the block.
+
+    Returns:
+        list[Plane] | None: Normals of the planes, `None` if the
+            observation point is on the screen (no frustum).
+    """
+    if omega.z == 0:
+        return None
+    i_start, i_stop, j_start, j_stop = block
+    first = scene.pixel_to_point(i_start, j_start)
+    last = scene.pixel_to_point(i_stop - 1, j_stop - 1)
+    x_min, x_max = min(first.x, last.x), max(first.x, last.x)
+    y_min, y_max = min(first.y, last.y), max(first.y, last.y)
+    s = 1.0 if omega.z > 0 else -1.0
+    oz = s * omega.z
+    return [
+        (oz, 0.0, s * (x_min - omega.x)),  # Left
+        (-oz, 0.0, -s * (x_max - omega.x)),  # Right
+        (0.0, oz, s * (y_min - omega.y)),  # Bottom
+        (0.0, -oz, -s * (y_max - omega.y)),  # Top
+    ]
+
+
+def sphere_in_frustum(omega: Point, planes: list[Plane], sphere: Sphere) -> bool:
+    """
+    Indicate if a sphere may intersect a frustum (radius widened by
+    `MARGIN`).
+    """
+    c = sphere.center
+    dx, dy, dz = c.x - omega.x, c.y - omega.y, c.z - omega.z
+    rad = sphere.rad * (1 + MARGIN)
+    for nx, ny, nz in planes:
+        if nx * dx + ny * dy + nz * dz < -rad * sqrt(nx * nx + ny * ny + nz * nz):
+            return False
+    return True
+
+
+def frustum_spheres(
+    scene: Scene,
+    omega: Point,
+    planes: list[Plane] | None,
+    spheres: Iterable[Sphere] | None = None,
+) -> list[Sphere]:
+    """
+    Return the spheres that may intersect a frustum, in the order of the
+    scene.
+
+    Note: Without candidates, the nodes of the BVH of the scene (if any)
+    outside the frustum are rejected with all their spheres.
+
+    Args:
+        scene (Scene): Scene.
+        omega (Point): Observation point.
+        planes (list[Plane] | None): Side planes of the frustum (see
+            `packet_frustum`), `None` for no culling.
+        spheres (Iterable[Sphere] | None, optional): Candidate spheres,
+            in the order of the scene (e.g.: from `ScreenBins`).
+            Defaults to None (all the spheres).
+
+    Returns:
+        list[Sphere]: Spheres that may intersect the frustum.
+    """
+    if spheres is None:
+        if planes is None:
+            return scene.spheres
+        if isinstance(scene.accelerator, BVH):
+            found = _bvh_frustum_spheres(scene.accelerator, omega, planes)
+            indices = {id(sphere): k for k, sphere in enumerate(scene.spheres)}
+            return sorted(found, key=lambda sphere: indices[id(sphere)])
+        spheres = scene.spheres
+    if planes is None:
+        return list(spheres)
+    return [sphere for sphere in spheres if sphere_in_frustum(omega, planes, sphere)]
+
+
+def _bvh_frustum_spheres(bvh: BVH, omega: Point, planes: list[Plane]) -> list[Sphere]:
+    """
+    Collect the spheres of the leaves of a BVH that may intersect a
+    frustum.
+    """
+    found = []
+    stack = [bvh.root] if bvh.root is not None else []
+    while stack:
+        node = stack.pop()
+        b = node.bounds
+        outside = False
+        for nx, ny, nz in planes:
+            # Corner of the box the farthest along the normal
+            px = b[3] if nx > 0 else b[0]
+            py = b[4] if ny > 0 else b[1]
+            pz = b[5] if nz > 0 else b[2]
+            distance = nx * (px - omega.x) + ny * (py - omega.y) + nz * (pz - omega.z)
+            if distance < -MARGIN * sqrt(nx * nx + ny * ny + nz * nz):
+                outside = True
+                break
+        if outside:
+            continue
+        if node.is_leaf():
+            found += [s for s in node.spheres if sphere_in_frustum(omega, planes, s)]
+        else:
+            stack += [node.left, node.right]
+    return found
+
+
+def packet_closest_hits(
+    omega: Point, rays: list[Ray], spheres: Iterable[Sphere]
+) -> tuple[list[float], list[Sphere | None], int]:
+    """
+    Find the closest sphere hit by each ray of a packet.
+
+    Note: The vector from each sphere to the observation point (common
+    source of the rays) is computed once, then each ray goes through the
+    same steps as `Sphere.intersection_distance` (see
+    `quadratic_distance`) with the spheres in the given order: the hits
+    are the ones of `Scene.closest_hit`.
+
+    Args:
+        omega (Point): Observation point (source of the rays).
+        rays (list[Ray]): Rays of the packet.
+        spheres (Iterable[Sphere]): Spheres, in the order of the scene.
+
+    Returns:
+        tuple[list[float], list[Sphere | None], int]: Distance to the
+            hit and sphere hit by each ray ((`inf`, `None`) if the ray
+            does not hit any sphere), and number of tests that found a
+            closer hit (see `RenderStats.hits`).
+    """
+    directions = [(ray.dir.x, ray.dir.y, ray.dir.z) for ray in rays]
+    distances = [inf] * len(rays)
+    hits: list[Sphere | None] = [None] * len(rays)
+    n_hits = 0
+    for sphere in spheres:
+        # Shared by all the rays of the packet
+        center = sphere.center
+        o_x = omega.x - center.x
+        o_y = omega.y - center.y
+        o_z = omega.z - center.z
+        sq_dist = o_x * o_x + o_y * o_y + o_z * o_z
+        rad = sphere.rad
+        for k, (d_x, d_y, d_z) in enumerate(directions):
+            t = quadratic_distance(
+                sq_dist, d_x * o_x + d_y * o_y + d_z * o_z, rad, distances[k]
+            )
+            if t is not None:
+                distances[k] = t
+                hits[k] = sphere
+                n_hits += 1
+    return distances, hits, n_hits
+
+
+def trace_packet(
+    scene: Scene,
+    omega: Point,
+    bg_color: Color,
+    block: Tile,
+    spheres: Iterable[Sphere] | None = None,
+    shadow_cache: ShadowCache | None = None,
+) -> list[list[Color]]:
+    """
+    Compute the colors of a block of pixels, tracing their primary rays
+    together.
+
+    Note: The spheres outside the frustum of the block are rejected once
+    for all its rays, then the closest hits of the rays are found
+    together (see `Scene.closest_hits`). Hits are shaded one by one (see
+    `Scene.shade`).
+
+    Args:
+        scene (Scene): Scene.
+        omega (Point): Observation point.
+        bg_color (Color): Background color.
+        block (Tile): First row, last row (excluded), first column and
+            last column (excluded) of the block.
+        spheres (Iterable[Sphere] | None, optional): Candidate spheres
+            (see `frustum_spheres`). Defaults to None (all the spheres).
+        shadow_cache (ShadowCache | None, optional): Cache of the last
+            occluders. Defaults to None.
+
+    Returns:
+        list[list[Color]]: Colors of the pixels of the block (row by
+            row).
+    """
+    i_start, i_stop, j_start, j_stop = block
+    planes = packet_frustum(scene, omega, block)
+    spheres = frustum_spheres(scene, omega, planes, spheres)
+    rays = [
+        scene.ray_from_pixel(omega, i, j)
+        for i in range(i_start, i_stop)
+        for j in range(j_start, j_stop)
+    ]
+    distances, hits, _ = scene.closest_hits(omega, rays, spheres)
+
+    width = j_stop - j_start
+    colors = []
+    for row in range(i_stop - i_start):
+        colors.append([])
+        for k in range(row * width, (row + 1) * width):
+            sphere = hits[k]
+            if sphere is None:
+                colors[-1].append(bg_color)
+            else:
+                ray = rays[k]
+                colors[-1].append(
+                    scene.shade(
+                        ray,
+                        bg_color,
+                        ray.follow_ray(distances[k]),
+                        sphere,
+                        shadow_cache,
+                    )
+                )
+    return colors
+
+
+def render_packet_tile(
+    scene: Scene,
+    omega: Point,
+    bg_color: Color,
+    tile: Tile,
+    bins: ScreenBins | None = None,
+    shadow_cache: ShadowCache | None = None,
+) -> list[list[Color]]:
+    """
+    Compute the colors of the pixels of a tile, tracing the primary
+    rays of each block of `scene.packet_size` pixels together (see
+    `trace_packet`).
+
+    Args:
+        scene (Scene): Scene.
+        omega (Point): Observation point.
+        bg_color (Color): Background color.
+        tile (Tile): First row, last row (excluded), first column and
+            last column (excluded) of the tile.
+        bins (ScreenBins | None, optional): Screen bins to take the
+            candidate spheres of each block from. Defaults to None (all
+            the spheres).
+        shadow_cache (ShadowCache | None, optional): Cache of the last
+            occluders. Defaults to None.
+
+    Returns:
+        list[list[Color]]: Colors of the pixels of the tile (row by
+            row).
+    """
+    i_start, i_stop, j_start, j_stop = tile
+    size = scene.packet_size
+    colors = [[] for _ in range(i_start, i_stop)]
+    for block_i in range(i_start, i_stop, size):
+        for block_j in range(j_start, j_stop, size):
+            block = (
+                block_i,
+                min(block_i + size, i_stop),
+                block_j,
+                min(block_j + size, j_stop),
+            )
+            spheres = None
+            if bins is not None:
+                spheres = [sphere for sphere, _ in bins.candidates(block)]
+            block_colors = trace_packet(
+                scene, omega, bg_color, block, spheres, shadow_cache
+            )
+            for row, block_row in zip(colors[block_i - i_start :], block_colors):
+                row += block_row
+    return colors
@@ -0,0 +1,175 @@
+"""
+This module contains the multi-process tile renderer.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+from collections import Counter
+from multiprocessing import shared_memory
+from typing import TYPE_CHECKING
+
+from .checkpoint import Checkpoint
+from .color import Color
+from .framebuffer import FrameBuffer, Tile, split_tiles
+from .image_writer import ImageWriter
+from .point import Point
+from .shadow_cache import ShadowCache
+from .shared import SharedScene
+from .stats import RenderStats, instrument
+
+if TYPE_CHECKING:
+    from .scene import Scene
+
+# Per-process state of the workers (set by `_init_worker`)
+_worker_scene: Scene | None = None
+_worker_omega: Point | None = None
+_worker_bg_color: Color | None = None
+_worker_framebuffer: shared_memory.SharedMemory | None = None
+
+
+def _init_worker(scene_name: str, framebuffer_name: str, memory_mapped: bool):
+    """
+    Attach the worker process to the shared scene and framebuffer.
+
+    Args:
+        scene_name (str): Name of the shared memory block holding the
+            scene.
+        framebuffer_name (str): Name of the shared memory block holding
+            the framebuffer, or path to the file of a memory-mapped
+            framebuffer.
+        memory_mapped (bool): Whether the framebuffer is memory-mapped.
+    """
+    global _worker_scene, _worker_omega, _worker_bg_color  # pylint: disable=global-statement
+    global _worker_framebuffer  # pylint: disable=global-statement
+    shared_scene = SharedScene(scene_name)
+    if memory_mapped:
+        image = FrameBuffer.memory_mapped(framebuffer_name, *shared_scene.screen_size)
+    else:
+        _worker_framebuffer = shared_memory.SharedMemory(framebuffer_name)
+        image = FrameBuffer(*shared_scene.screen_size, _worker_framebuffer.buf)
+    _worker_scene, _worker_omega, _worker_bg_color = shared_scene.to_scene(image)
+    shared_scene.close()
+
+
+def _render_tile(tile: Tile) -> tuple[Tile, int, int, RenderStats | None]:
+    """
+    Render a tile in the worker process and write it to the shared
+    framebuffer.
+
+    Returns:
+        tuple[Tile, int, int, RenderStats | None]: Rendered tile, number
+            of lookups and hits of the shadow cache, and stats of the
+            tile (if the scene collects stats).
+    """
+    _worker_scene.shadow_cache_stats = ShadowCache()
+    stats = RenderStats() if _worker_scene.collect_stats else None
+    with instrument(_worker_scene, stats):
+        colors = _worker_scene.render_tile(_worker_omega, _worker_bg_color, tile)
+    _worker_scene.image.write_tile(
+        tile, [v for row in colors for c in row for v in (c.r, c.g, c.b)]
+    )
+    _worker_scene.image.evict(tile[0], tile[1])
+    shadow_cache_stats = _worker_scene.shadow_cache_stats
+    return tile, shadow_cache_stats.n_lookups, shadow_cache_stats.n_hits, stats
+
+
+def ray_trace_parallel(
+    scene: Scene,
+    omega: Point,
+    bg_color: Color,
+    n_workers: int,
+    tile_size: int = 32,
+    writer: ImageWriter | None = None,
+    checkpoint: Checkpoint | None = None,
+):
+    """
+    Generate image of the scene with ray tracing using a pool of
+    processes.
+
+    Note: The scene and the framebuffer live in shared memory blocks
+    that the workers attach to by name: nothing but tile coordinates
+    goes through the pool queues. An in-memory image of the scene is
+    moved to shared memory in place (see `FrameBuffer.share`, kept for
+    the next renders): the workers write its pixels directly, so that
+    nothing is copied when the render ends. A memory-mapped image is shared
+    through its file instead. Tiles are handed out one at a time so
+    that idle workers pick up the remaining tiles, whatever their cost
+    (background tiles are much cheaper than tiles covering reflective
+    spheres). Each pixel is computed by the same code as the serial
+    path. Rows are streamed to `writer` (in order) as soon as all the
+    tiles of their strip are done. Tiles already done in `checkpoint`
+    are restored instead of rendered.
+
+    Args:
+        scene (Scene): Scene.
+        omega (Point): Observation point.
+        bg_color (Color): Background color.
+        n_workers (int): Number of worker processes.
+        tile_size (int, optional): Size of the tiles (in pixels).
+            Defaults to 32.
+        writer (ImageWriter | None, optional): Image file to stream the
+            rows to. Defaults to None.
+        checkpoint (Checkpoint | None, optional): Progress of the render
+            to resume and save. Defaults to None.
+    """
+    width, height = scene.screen_size
+    n_tiles_per_strip = -(-width // tile_size)
+    n_done_tiles = Counter()  # By strip (first row)
+    n_written_strips = 0
+    memory_mapped = scene.image.path is not None
+    if not memory_mapped:
+        # Render straight into the image of the scene: no copy afterwards
+        scene.image.share()
+    shared_image = scene.image
+    shared_scene = SharedScene.from_scene(scene, omega, bg_color)
+
+    def write_done_strips():
+        # Write the strips done (in order) to the image file
+        nonlocal n_written_strips
+        while (
+            writer is not None
+            and n_done_tiles[n_written_strips * tile_size] == n_tiles_per_strip
+        ):
+            i_start = n_written_strips * tile_size
+            i_stop = min(i_start + tile_size, height)
+            for i in range(i_start, i_stop):
+                writer.write_row(shared_image.get_row(i))
+            shared_image.evict(i_start, i_stop)
+            del n_done_tiles[i_start]
+            n_written_strips += 1
+
+    tiles = split_tiles(scene.screen_size, tile_size)
+    try:
+        if checkpoint is not None:
+            checkpoint.restore(shared_image)
+            for tile in split_tiles(scene.screen_size, tile_size):
+                if checkpoint.is_done(tile):
+                    n_done_tiles[tile[0]] += 1
+            tiles = (tile for tile in tiles if not checkpoint.is_done(tile))
+        with multiprocessing.Pool(
+            n_workers,
+            initializer=_init_worker,
+            initargs=(
+                shared_scene.name,
+                scene.image.path if memory_mapped else scene.image.shm_name,
+                memory_mapped,
+            ),
+        ) as pool:
+            for tile, n_lookups, n_hits, stats in pool.imap_unordered(
+                _render_tile, tiles, chunksize=1
+            ):
+                scene.shadow_cache_stats.n_lookups += n_lookups
+                scene.shadow_cache_stats.n_hits += n_hits
+                if stats is not None:
+                    scene.stats.merge(stats)
+                if checkpoint is not None:
+                    checkpoint.add(tile, shared_image)
+                n_done_tiles[tile[0]] += 1
+                write_done_strips()
+        write_done_strips()  # Strips restored from the checkpoint only
+    finally:
+        if checkpoint is not None:
+            checkpoint.save(shared_image)  # Also when interrupted
+        shared_scene.close()
+        shared_scene.unlink()
@@ -12,6 +12,8 @@ class Point:
     Class representing a 3D point.
     """
 
+    __slots__ = ("x", "y", "z")
+
     def __init__(self, x: float, y: float, z: float):
         """
         Initialise Point instance.
@@ -38,13 +40,6 @@ class Point:
         """
         Compute distance between two points.
         """
-        if not isinstance(point_1, Point) or not isinstance(point_2, Point):
-            raise TypeError(
-                "Cannot compute distance between objects of type "
-                f"{type(point_1)} and {type(point_1)}."
-            )
-        if point_1 == point_2:
-            return 0.0
         d_x = point_1.x - point_2.x
         d_y = point_1.y - point_2.y
         d_z = point_1.z - point_2.z
@@ -0,0 +1,361 @@
+"""
+This module contains the Profile class and the render profiler.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+from .color import Color
+from .framebuffer import Tile
+from .point import Point
+
+if TYPE_CHECKING:
+    from .scene import Scene
+
+Frame = tuple[str, str, int]  # (name, file, line)
+
+
+class Profile:
+    """
+    Class representing the call stacks recorded while profiling.
+
+    Note: Each stack (from the outermost frame) is weighted by the time
+    spent in its innermost frame: seconds for deterministic profiles,
+    number of samples for sampling profiles.
+    """
+
+    def __init__(self, mode: str, stacks: Counter, calls: Counter | None = None):
+        """
+        Initialise Profile instance.
+
+        Args:
+            mode (str): "deterministic" or "sampling".
+            stacks (Counter): Weights of the stacks (tuples of frames).
+            calls (Counter | None, optional): Number of calls of the
+                frames (deterministic profiles only). Defaults to None.
+        """
+        self.mode: str = mode
+        self.stacks: Counter = stacks
+        self.calls: Counter | None = calls
+
+    @property
+    def unit(self) -> str:
+        """
+        Unit of the weights.
+        """
+        return "seconds" if self.mode == "deterministic" else "samples"
+
+    @property
+    def total(self) -> float:
+        """
+        Sum of the weights.
+        """
+        return sum(self.stacks.values())
+
+    @staticmethod
+    def frame_name(frame: Frame) -> str:
+        """
+        Return the display name of a frame.
+        """
+        name, file, line = frame
+        return f"{name} ({os.path.basename(file)}:{line})" if file else name
+
+    def hot_functions(self) -> list[tuple[Frame, float, float]]:
+        """
+        Return the self and total weights of the functions.
+
+        Returns:
+            list[tuple[Frame, float, float]]: Frame, self weight and
+                total weight (self weight included), by decreasing self
+                weight.
+        """
+        self_weights = Counter()
+        total_weights = Counter()
+        for stack, weight in self.stacks.items():
+            self_weights[stack[-1]] += weight
+            for frame in set(stack):  # Recursive frames are counted once
+                total_weights[frame] += weight
+        return [
+            (frame, weight, total_weights[frame])
+            for frame, weight in self_weights.most_common()
+        ]
+
+    def summary(self, n: int = 20) -> str:
+        """
+        Return a table of the hottest functions.
+
+        Args:
+            n (int, optional): Number of functions. Defaults to 20.
+
+        Returns:
+            str: Table (one function per line).
+        """
+        total = self.total or 1
+        lines = [
+            (
+                f"{'calls':>10} {'self':>10} {'self %':>7} {'total':>10} "
+                f"{'total %':>8}  function ({self.unit})"
+            )
+        ]
+        for frame, self_weight, total_weight in self.hot_functions()[:n]:
+            calls = self.calls[frame] if self.calls is not None else "-"
+            lines.append(
+                f"{calls:>10} {self_weight:>10.4g} {self_weight / total:>7.1%} "
+                f"{total_weight:>10.4g} {total_weight / total:>8.1%}  "
+                f"{self.frame_name(frame)}"
+            )
+        return "\n".join(lines)
+
+    def collapsed(self) -> str:
+        """
+        Return the stacks in the collapsed format of flamegraph.pl.
+
+        Note: Deterministic weights are converted to microseconds.
+
+        Returns:
+            str: One "frame;frame;...;frame weight" line per stack.
+        """
+        scale = 1e6 if self.mode == "deterministic" else 1
+        lines = []
+        for stack, weight in self.stacks.items():
+            weight = round(weight * scale)
+            if weight > 0:
+                names = ";".join(self.frame_name(frame) for frame in stack)
+                lines.append(f"{names} {weight}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, name: str = "render") -> dict:
+        """
+        Return the stacks in the file format of speedscope.
+
+        Args:
+            name (str, optional): Name of the profile. Defaults to
+                "render".
+
+        Returns:
+            dict: Speedscope document (to be dumped as JSON).
+        """
+        frames = {}
+        samples = []
+        weights = []
+        for stack, weight in self.stacks.items():
+            samples.append([frames.setdefault(frame, len(frames)) for frame in stack])
+            weights.append(weight)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "exporter": "PyTracer",
+            "name": name,
+            "activeProfileIndex": 0,
+            "shared": {
+                "frames": [
+                    {"name": frame[0], "file": frame[1], "line": frame[2]}
+                    if frame[1]
+                    else {"name": frame[0]}
+                    for frame in frames
+                ]
+            },
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "seconds" if self.mode == "deterministic" else "none",
+                    "startValue": 0,
+                    "endValue": self.total,
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+        }
+
+    def write(self, prefix: str, name: str = "render"):
+        """
+        Write the collapsed stacks (`prefix.collapsed`) and the
+        speedscope document (`prefix.speedscope.json`).
+
+        Args:
+            prefix (str): Path of the files without extension.
+            name (str, optional): Name of the profile. Defaults to
+                "render".
+        """
+        with open(f"{prefix}.collapsed", "w", encoding="utf-8") as file:
+            file.write(self.collapsed())
+        with open(f"{prefix}.speedscope.json", "w", encoding="utf-8") as file:
+            json.dump(self.speedscope(name), file)
+
+
+def _code_frame(frame) -> Frame:
+    """
+    Return the frame of a Python function.
+    """
+    code = frame.f_code
+    return code.co_qualname, code.co_filename, code.co_firstlineno
+
+
+def _builtin_frame(function) -> Frame:
+    """
+    Return the frame of a built-in function.
+    """
+    return f"{getattr(function, '__qualname__', repr(function))} (built-in)", "", 0
+
+
+def profile_deterministic(func: Callable[[], object]) -> Profile:
+    """
+    Profile a function by tracing every call (Python and built-in).
+
+    Args:
+        func (Callable[[], object]): Function.
+
+    Returns:
+        Profile: Profile (weights in seconds).
+    """
+    stacks = Counter()
+    calls = Counter()
+    stack = []
+    clock = time.perf_counter
+    last = clock()
+
+    def profiler(frame, event, arg):
+        nonlocal last
+        now = clock()
+        if stack:
+            stacks[tuple(stack)] += now - last
+        if event == "call":
+            entry = _code_frame(frame)
+        elif event == "c_call":
+            entry = _builtin_frame(arg)
+        else:  # "return", "c_return" or "c_exception"
+            if stack:
+                stack.pop()
+            last = clock()  # Do not count the time spent in the profiler
+            return
+        stack.append(entry)
+        calls[entry] += 1
+        last = clock()
+
+    sys.setprofile(profiler)
+    try:
+        func()
+    finally:
+        sys.setprofile(None)
+    return Profile("deterministic", stacks, calls)
+
+
+def profile_sampling(func: Callable[[], object], interval: float = 0.001) -> Profile:
+    """
+    Profile a function by sampling its call stack at regular intervals.
+
+    Note: Much lighter than deterministic profiling but statistical,
+    and without call counts.
+
+    Args:
+        func (Callable[[], object]): Function.
+        interval (float, optional): Sampling interval (in seconds).
+            Defaults to 0.001.
+
+    Returns:
+        Profile: Profile (weights in samples).
+    """
+    stacks = Counter()
+    thread_id = threading.get_ident()
+    depth = 0  # Frames of the caller, not to be recorded
+    frame = sys._getframe()  # pylint: disable=protected-access
+    while frame is not None:
+        depth += 1
+        frame = frame.f_back
+    done = threading.Event()
+
+    def sample():
+        while not done.wait(interval):
+            frame = sys._current_frames().get(thread_id)  # pylint: disable=protected-access
+            stack = []
+            while frame is not None:
+                stack.append(_code_frame(frame))
+                frame = frame.f_back
+            stack.reverse()
+            if len(stack) > depth:
+                stacks[tuple(stack[depth:])] += 1
+
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(min(switch_interval, interval / 2))
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    try:
+        func()
+    finally:
+        done.set()
+        sampler.join()
+        sys.setswitchinterval(switch_interval)
+    return Profile("sampling", stacks)
+
+
+def profile_call(
+    func: Callable[[], object], mode: str = "deterministic", interval: float = 0.001
+) -> Profile:
+    """
+    Profile a function with the given mode.
+
+    Args:
+        func (Callable[[], object]): Function.
+        mode (str, optional): "deterministic" (see
+            `profile_deterministic`) or "sampling" (see
+            `profile_sampling`). Defaults to "deterministic".
+        interval (float, optional): Sampling interval (in seconds).
+            Defaults to 0.001.
+
+    Raises:
+        ValueError: If the mode is unknown.
+
+    Returns:
+        Profile: Profile of the function.
+    """
+    if mode == "deterministic":
+        return profile_deterministic(func)
+    if mode == "sampling":
+        return profile_sampling(func, interval)
+    raise ValueError(f"Unknown profiling mode {mode!r}")
+
+
+def profile_render(
+    scene: Scene,
+    omega: Point,
+    bg_color: Color,
+    region: Tile | None = None,
+    mode: str = "deterministic",
+    interval: float = 0.001,
+) -> Profile:
+    """
+    Profile the rendering of a region of the image.
+
+    Note: The region is rendered by the same code as the tiles of
+    `Scene.ray_trace` (in the current process).
+
+    Args:
+        scene (Scene): Scene.
+        omega (Point): Observation point.
+        bg_color (Color): Background color.
+        region (Tile | None, optional): First row, last row (excluded),
+            first column and last column (excluded) of the region.
+            Defaults to None (whole image).
+        mode (str, optional): "deterministic" or "sampling". Defaults
+            to "deterministic".
+        interval (float, optional): Sampling interval (in seconds).
+            Defaults to 0.001.
+
+    Returns:
+        Profile: Profile of the render.
+    """
+    if region is None:
+        region = (0, scene.screen_size[1], 0, scene.screen_size[0])
+
+    def render():
+        scene.render_tile(omega, bg_color, region)
+
+    return profile_call(render, mode, interval)
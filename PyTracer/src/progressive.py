@@ -0,0 +1,130 @@
+"""
+This module contains the progressive (coarse-to-fine) renderer.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+from .color import Color
+from .framebuffer import FrameBuffer
+from .point import Point
+from .shadow_cache import ShadowCache
+from .stats import collect_stats
+
+if TYPE_CHECKING:
+    from .scene import Scene
+
+
+def strides(max_stride: int) -> list[int]:
+    """
+    Return the strides of the successive passes.
+
+    Args:
+        max_stride (int): Stride of the first pass (rounded down to a
+            power of two).
+
+    Returns:
+        list[int]: Strides (in pixels), from the coarsest to 1.
+    """
+    stride = 1
+    while 2 * stride <= max_stride:
+        stride *= 2
+    result = []
+    while stride >= 1:
+        result.append(stride)
+        stride //= 2
+    return result
+
+
+def ray_trace_progressive(
+    scene: Scene,
+    omega: Point,
+    bg_color: Color,
+    callback: Callable[[FrameBuffer, int], None] | None = None,
+    time_budget: float | None = None,
+    max_stride: int = 16,
+) -> int:
+    """
+    Generate image of the scene with ray tracing, from coarse to fine.
+
+    Note: A pass of stride `s` traces one pixel every `s` rows and
+    columns and paints it over the `s` x `s` block it starts. Each pass
+    only traces the pixels the previous passes did not trace (a traced
+    pixel already holds its color in the top-left quarter of its
+    previous block, the other quarters are painted over): the last
+    pass (stride 1) completes the image and the total number of rays is
+    the same as with `Scene.ray_trace`. The final image is identical to
+    the one of `Scene.ray_trace`. The stats of the render (if
+    `collect_stats` is set) are stored in `scene.stats`.
+
+    Args:
+        scene (Scene): Scene.
+        omega (Point): Observation point.
+        bg_color (Color): Background color.
+        callback (Callable[[FrameBuffer, int], None] | None, optional):
+            Function called with the image of the scene and the stride
+            after each pass. Defaults to None.
+        time_budget (float | None, optional): Maximum rendering time (in
+            seconds). When it runs out, rendering stops and the image
+            holds the last pass, partially refined by the interrupted
+            pass. Defaults to None (no limit).
+        max_stride (int, optional): Stride of the first pass (in
+            pixels). Defaults to 16.
+
+    Returns:
+        int: Stride of the finest pass completed (1 if the image is
+            complete, 0 if not even the first pass completed).
+    """
+    with collect_stats(scene):
+        return _ray_trace_progressive(
+            scene, omega, bg_color, callback, time_budget, max_stride
+        )
+
+
+def _ray_trace_progressive(
+    scene: Scene,
+    omega: Point,
+    bg_color: Color,
+    callback: Callable[[FrameBuffer, int], None] | None,
+    time_budget: float | None,
+    max_stride: int,
+) -> int:
+    """
+    Generate image of the scene (see `ray_trace_progressive`).
+    """
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    width, height = scene.screen_size
+    image = scene.image
+    scene.shadow_cache_stats = ShadowCache()
+    finest = 0
+    previous = None
+    for stride in strides(max_stride):
+        shadow_cache = ShadowCache() if scene.use_shadow_cache else None
+        for i in range(0, height, stride):
+            i_stop = min(i + stride, height)
+            for j in range(0, width, stride):
+                if previous and i % previous == 0 and j % previous == 0:
+                    continue  # Traced by a previous pass
+                if deadline is not None and time.perf_counter() > deadline:
+                    if shadow_cache is not None:
+                        scene.shadow_cache_stats.merge(shadow_cache)
+                    return finest
+                color = scene.pixel_color(omega, bg_color, i, j, shadow_cache)
+                if stride == 1:
+                    image.set_pixel(i, j, color.r, color.g, color.b)
+                else:
+                    image.fill_tile(
+                        (i, i_stop, j, min(j + stride, width)),
+                        color.r,
+                        color.g,
+                        color.b,
+                    )
+        if shadow_cache is not None:
+            scene.shadow_cache_stats.merge(shadow_cache)
+        finest = previous = stride
+        if callback is not None:
+            callback(image, stride)
+    return finest
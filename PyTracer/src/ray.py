@@ -12,6 +12,8 @@ class Ray:
     Class representing a light ray.
     """
 
+    __slots__ = ("color", "dir", "src")
+
     def __init__(self, src: Point, dir: Vector, color: Color):  # pylint: disable=redefined-builtin
         """
         Initialise Ray instance.
@@ -0,0 +1,243 @@
+"""
+This module contains the Relighting class.
+"""
+
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from .color import BLACK, Color
+from .framebuffer import FrameBuffer
+from .gbuffer import geometry_fingerprint
+from .light import Light
+from .point import Point
+from .ray import Ray
+from .shadow_cache import ShadowCache
+from .stats import collect_stats
+from .vector import Vector
+
+if TYPE_CHECKING:
+    from .scene import Scene
+
+LightKey = tuple[float, float, float]  # Position of the light
+
+
+def light_position(light: Light) -> LightKey:
+    """
+    Return the position of a light (key of its mask).
+    """
+    position = light.position
+    return (position.x, position.y, position.z)
+
+
+@dataclass
+class LightMask:
+    """
+    Class representing the visibility of a light from the points seen
+    through the pixels (and their reflections).
+
+    Note: One entry per pixel and reflection level: whether the light is
+    visible from the point (not shadowed), and the factor its color is
+    diffused with (see `Sphere.diffusion_factor`).
+    """
+
+    visible: bytearray
+    factors: array
+
+
+class Relighting:
+    """
+    Class representing a scene rendered again and again with changing
+    lights (e.g.: look-dev sessions).
+
+    Note: The points reached by the primary ray of each pixel and its
+    reflections are computed once per geometry and camera. The shadow
+    rays are cast once per light position: a visibility mask and a
+    diffusion factor per point are kept for every position seen (see
+    `LightMask`). Changing the color of a light, the color or the
+    reflection of a sphere, or adding back a light then only costs a
+    multiply-add per light and point. Moving a light only computes the
+    mask of its new position. The images are identical to a full render
+    (same operations, in the same order). Changes of the geometry or the
+    camera discard everything (so do changes of the reflection
+    coefficients if the scene has a `reflection_threshold`: they end the
+    paths).
+    """
+
+    def __init__(self, scene: Scene, omega: Point):
+        """
+        Initialise Relighting instance.
+
+        Args:
+            scene (Scene): Scene (rendered in its image).
+            omega (Point): Observation point.
+        """
+        self.scene: Scene = scene
+        self.omega: Point = omega
+        self.n_masks: list[int] = []  # Number of masks computed per render
+        self.masks: dict[LightKey, LightMask] = {}  # By light position
+        self._key: tuple | None = None  # Geometry of the paths
+        self._depth: int = 0  # Maximum number of points per pixel
+        # Per reflection level: index of the sphere reached (-1: none),
+        # coordinates of the point and normal of the sphere at the point
+        self._spheres: list[array] = []
+        self._points: list[array] = []
+        self._normals: list[array] = []
+
+    @property
+    def image(self) -> FrameBuffer:
+        """
+        Last render.
+        """
+        return self.scene.image
+
+    def render(self, bg_color: Color) -> int:
+        """
+        Render the scene with its current lights.
+
+        Note: The stats of the render (if `collect_stats` is set) are
+        stored in `scene.stats`.
+
+        Args:
+            bg_color (Color): Background color.
+
+        Returns:
+            int: Number of masks computed (i.e.: new light positions).
+        """
+        scene = self.scene
+        depth = getattr(scene, "n_max_reflections", 1)
+        key = (geometry_fingerprint(scene, self.omega), depth)
+        if getattr(scene, "reflection_threshold", 0.0) > 0:
+            # The reflection coefficients end the paths
+            key += (scene.reflection_threshold,) + tuple(
+                sphere.reflection for sphere in scene.spheres
+            )
+        scene.shadow_cache_stats = ShadowCache()
+        n_masks = 0
+        with collect_stats(scene):
+            if key != self._key:
+                self._trace_paths(depth)
+                self.masks.clear()
+                self._key = key
+            for light in scene.lights:
+                light_key = light_position(light)
+                if light_key not in self.masks:
+                    self.masks[light_key] = self._light_mask(light)
+                    n_masks += 1
+            self._shade(bg_color)
+        self.n_masks.append(n_masks)
+        return n_masks
+
+    def discard_unused(self):
+        """
+        Discard the masks of the positions no light is at.
+        """
+        used = {light_position(light) for light in self.scene.lights}
+        for light_key in list(self.masks):
+            if light_key not in used:
+                del self.masks[light_key]
+
+    def _trace_paths(self, depth: int):
+        """
+        Compute the points reached by the primary ray of each pixel and
+        its reflections.
+        """
+        scene = self.scene
+        width, height = scene.screen_size
+        n_pixels = width * height
+        indices = {id(sphere): k for k, sphere in enumerate(scene.spheres)}
+        self._depth = depth
+        self._spheres = [array("i", [-1]) * n_pixels for _ in range(depth)]
+        self._points = [array("d", [0.0]) * (3 * n_pixels) for _ in range(depth)]
+        self._normals = [array("d", [0.0]) * (3 * n_pixels) for _ in range(depth)]
+        for i in range(height):
+            for j in range(width):
+                ray = scene.ray_from_pixel(self.omega, i, j)
+                if hasattr(scene, "reflections"):
+                    path = scene.reflections(ray)
+                else:
+                    point, sphere = scene.interception(ray)
+                    path = [] if sphere is None else [(point, sphere)]
+                k = i * width + j
+                for level, (point, sphere) in enumerate(path):
+                    normal = sphere.normal_at_point(point)
+                    self._spheres[level][k] = indices[id(sphere)]
+                    points, normals = self._points[level], self._normals[level]
+                    points[3 * k : 3 * k + 3] = array("d", (point.x, point.y, point.z))
+                    normals[3 * k : 3 * k + 3] = array(
+                        "d", (normal.x, normal.y, normal.z)
+                    )
+
+    def _light_mask(self, light: Light) -> LightMask:
+        """
+        Cast the shadow rays from a light to every point reached.
+        """
+        scene = self.scene
+        n_pixels = scene.screen_size[0] * scene.screen_size[1]
+        visible = bytearray(self._depth * n_pixels)
+        factors = array("d", [0.0]) * (self._depth * n_pixels)
+        shadow_cache = ShadowCache() if scene.use_shadow_cache else None
+        for level in range(self._depth):
+            spheres, points = self._spheres[level], self._points[level]
+            normals = self._normals[level]
+            for k in range(n_pixels):
+                index = spheres[k]
+                if index < 0:
+                    continue
+                sphere = scene.spheres[index]
+                point = Point(points[3 * k], points[3 * k + 1], points[3 * k + 2])
+                ray = Ray(
+                    light.position,
+                    Vector.from_points(light.position, point),
+                    light.color,
+                )
+                if scene.is_ray_visible_from_point(ray, sphere, point, shadow_cache):
+                    normal = Vector(
+                        normals[3 * k], normals[3 * k + 1], normals[3 * k + 2]
+                    )
+                    visible[level * n_pixels + k] = 1
+                    factors[level * n_pixels + k] = sphere.diffusion_factor(ray, normal)
+        if shadow_cache is not None:
+            scene.shadow_cache_stats.merge(shadow_cache)
+        return LightMask(visible, factors)
+
+    def _shade(self, bg_color: Color):
+        """
+        Compute the color of every pixel from the masks of the lights
+        (see `Scene.diffused_color` and
+        `SceneWithReflections.reflected_color`).
+        """
+        scene = self.scene
+        width, height = scene.screen_size
+        n_pixels = width * height
+        masks = [self.masks[light_position(light)] for light in scene.lights]
+        # Color of each sphere lit by each light (before the factor)
+        products = [
+            [sphere.color * light.color for light in scene.lights]
+            for sphere in scene.spheres
+        ]
+        reflections = [sphere.reflection for sphere in scene.spheres]
+        for i in range(height):
+            for j in range(width):
+                k = i * width + j
+                hits = []  # Sphere and diffused color per level
+                for level in range(self._depth):
+                    index = self._spheres[level][k]
+                    if index < 0:
+                        break
+                    offset = level * n_pixels + k
+                    colors = [
+                        product * mask.factors[offset]
+                        for product, mask in zip(products[index], masks)
+                        if mask.visible[offset]
+                    ]
+                    hits.append((index, sum(colors, start=BLACK)))
+                if not hits:
+                    scene.set_pixel_color(i, j, bg_color)
+                    continue
+                color = hits[-1][1]  # Last object is not subject to reflection
+                for level in range(len(hits) - 2, -1, -1):
+                    color = hits[level][1] + reflections[hits[level + 1][0]] * color
+                scene.set_pixel_color(i, j, color)
@@ -2,17 +2,35 @@
 This module contains the Scene class.
 """
 
-from typing import override
-
-import matplotlib.pyplot as plt
-
+import os
+import time
+from collections.abc import Callable
+from math import inf
+from typing import TYPE_CHECKING, override
+
+from .adaptive import ray_trace_adaptive
+from .bvh import BVH
+from .checkpoint import Checkpoint, scene_fingerprint
 from .color import BLACK, Color
+from .framebuffer import FrameBuffer, Tile, split_tiles
+from .gbuffer import GBuffer, geometry_fingerprint, render_gbuffer_tile
+from .grid import UniformGrid
+from .image_writer import ImageWriter, save_image
 from .light import Light
+from .packets import packet_closest_hits, render_packet_tile
 from .point import Point
+from .profiling import Profile, profile_call
+from .progressive import ray_trace_progressive
 from .ray import Ray
+from .screen_bins import ScreenBins, render_culled_tile
+from .shadow_cache import ShadowCache
 from .sphere import Sphere
+from .stats import RenderStats, instrument
 from .vector import Vector
 
+if TYPE_CHECKING:
+    from .distributed import FarmStats
+
 
 class Scene:
     """
@@ -23,6 +41,7 @@ class Scene:
         self,
         view_size: tuple[int, int] = (16, 9),
         screen_size: tuple[int, int] = (1600, 900),
+        image: FrameBuffer | None = None,
     ):
         """
         Initialise a Scene instance.
@@ -33,15 +52,28 @@ class Scene:
                 (16, 9).
             screen_size (tuple[int, int], optional): Size of the screen
                 (i.e.: screen resolution). Defaults to (1600, 900).
+            image (FrameBuffer | None, optional): Image to render into
+                (e.g.: a shared framebuffer). Defaults to None (a black
+                image is allocated).
         """
         self.view_size: tuple[int, int] = view_size
         self.screen_size: tuple[int, int] = screen_size
-        self.image: list[list[list[float]]] = [
-            [[0, 0, 0] for _ in range(self.screen_size[0])]
-            for _ in range(self.screen_size[1])
-        ]
+        self.image: FrameBuffer = (
+            FrameBuffer(*self.screen_size) if image is None else image
+        )
         self.lights: list[Light] = []
         self.spheres: list[Sphere] = []
+        self.accelerator: BVH | UniformGrid | None = None  # Optional spatial index
+        self.use_shadow_cache: bool = True  # Test last shadow occluders first
+        self.shadow_cache_stats: ShadowCache = ShadowCache()  # Of the last render
+        self.collect_stats: bool = False  # Count rays and time phases
+        self.stats: RenderStats | None = None  # Of the last render
+        self.use_gbuffer: bool = False  # Shade from the primary hits kept
+        self.gbuffer: GBuffer | None = None  # Of the last serial render
+        self.use_screen_bins: bool = False  # Cull primary rays in screen space
+        self.screen_bins: ScreenBins | None = None  # Of the current render
+        self.packet_size: int = 0  # Trace primary rays by blocks (e.g.: 4, 8)
+        self.profile: Profile | None = None  # Of the last profiled render
 
         # Display attributes
         self._center = (
@@ -55,6 +87,35 @@ class Scene:
             self.view_size[1] / self.screen_size[1]
         )  # Vertical space covered by a pixel
 
+    def build_bvh(self, max_leaf_size: int = 4):
+        """
+        Build a bounding volume hierarchy over the spheres of the scene.
+
+        Note: Once built, the hierarchy replaces the linear scans of
+        `interception` and `is_ray_visible_from_point`. It must be
+        rebuilt if the spheres change (set `accelerator` to `None` to
+        go back to linear scans).
+
+        Args:
+            max_leaf_size (int, optional): Maximum number of spheres in
+                a leaf. Defaults to 4.
+        """
+        self.accelerator = BVH(self.spheres, max_leaf_size)
+
+    def build_grid(self, density: float = 2.0):
+        """
+        Build a uniform grid over the spheres of the scene.
+
+        Note: Alternative to `build_bvh` suited to many similar-sized
+        spheres spread evenly through the scene. The resolution is
+        chosen from the number of spheres and the bounds of the scene.
+
+        Args:
+            density (float, optional): Number of cells per sphere.
+                Defaults to 2.0.
+        """
+        self.accelerator = UniformGrid(self.spheres, density)
+
     def set_pixel_color(self, i: int, j: int, color: Color):
         """
         Set the color of a given pixel.
@@ -64,9 +125,7 @@ class Scene:
             j (int): Pixel column coordinate.
             color (Color): Color.
         """
-        self.image[i][j][0] = color.r
-        self.image[i][j][1] = color.g
-        self.image[i][j][2] = color.b
+        self.image.set_pixel(i, j, color.r, color.g, color.b)
 
     def pixel_to_point(self, i: int, j: int) -> Point:
         """
@@ -100,7 +159,14 @@ class Scene:
         screen_point = self.pixel_to_point(i, j)
         return Ray(omega, Vector.from_points(omega, screen_point), BLACK)
 
-    def is_ray_visible_from_point(self, ray: Ray, sphere: Sphere, point: Point) -> bool:
+    def is_ray_visible_from_point(
+        self,
+        ray: Ray,
+        sphere: Sphere,
+        point: Point,
+        shadow_cache: ShadowCache | None = None,
+        light_index: int = 0,
+    ) -> bool:
         """
         Indicate if a ray is visible from a given point on the surface of the sphere.
 
@@ -108,6 +174,10 @@ class Scene:
             ray (Ray): Ray.
             sphere (Sphere): Sphere.
             point (Point): Point on the surface of the sphere.
+            shadow_cache (ShadowCache | None, optional): Cache of the
+                last occluders. Defaults to None.
+            light_index (int, optional): Index of the light the ray
+                comes from (key of the cache). Defaults to 0.
 
         Returns:
             bool: `True` if the ray is visible, `False` otherwise.
@@ -116,107 +186,591 @@ class Scene:
         if not sphere.is_ray_above_surface(ray, point):
             return False
 
-        # Check if ray not hidden by other sphere
-        dst = Point.distance(sphere.center, ray.src)
-        for s in self.spheres:
-            if s != sphere and Point.distance(s.center, ray.src) < dst:
-                if s.ray_intersection(ray) is not None:
-                    return False
-        return True
+        # Check if ray not hidden by other sphere before reaching the point
+        dst = Point.distance(ray.src, point)
+        if shadow_cache is not None:
+            return shadow_cache.occluder(self, light_index, ray, dst, sphere) is None
+        return self.any_hit(ray, dst, sphere) is None
+
+    def closest_hit(
+        self,
+        ray: Ray,
+        t_max: float = inf,
+        exclude: Sphere | None = None,
+        spheres: list[Sphere] | None = None,
+    ) -> tuple[float, Sphere | None]:
+        """
+        Find the closest sphere hit by a ray.
+
+        Note: Spheres that cannot be hit before the current closest hit
+        are rejected without solving the intersection.
+
+        Args:
+            ray (Ray): Ray.
+            t_max (float, optional): Ignore hits farther than this
+                distance. Defaults to inf.
+            exclude (Sphere | None, optional): Sphere to ignore (e.g.:
+                the sphere the ray starts from). Defaults to None.
+            spheres (list[Sphere] | None, optional): Only spheres the
+                ray may hit, in the order of the scene (e.g.: from
+                `ScreenBins`). Defaults to None (all the spheres).
+
+        Returns:
+            tuple[float, Sphere | None]: Distance to the hit and sphere
+                hit, (`t_max`, `None`) if the ray does not hit any
+                sphere.
+        """
+        if spheres is None:
+            if self.accelerator is not None:
+                return self.accelerator.closest_hit(ray, t_max, exclude)
+            spheres = self.spheres
+        hit_sphere = None
+        for sphere in spheres:
+            if sphere is exclude:
+                continue
+            t = sphere.intersection_distance(ray, t_max)
+            if t is not None:
+                t_max = t
+                hit_sphere = sphere
+        return t_max, hit_sphere
+
+    def closest_hits(
+        self, omega: Point, rays: list[Ray], spheres: list[Sphere]
+    ) -> tuple[list[float], list[Sphere | None], int]:
+        """
+        Find the closest sphere hit by each primary ray of a packet (see
+        `packet_closest_hits`).
+
+        Args:
+            omega (Point): Observation point (source of the rays).
+            rays (list[Ray]): Rays of the packet.
+            spheres (list[Sphere]): Only spheres the rays may hit, in
+                the order of the scene (see `frustum_spheres`).
+
+        Returns:
+            tuple[list[float], list[Sphere | None], int]: Distance to
+                the hit and sphere hit by each ray, and number of tests
+                that found a closer hit.
+        """
+        return packet_closest_hits(omega, rays, spheres)
+
+    def any_hit(
+        self, ray: Ray, t_max: float = inf, exclude: Sphere | None = None
+    ) -> Sphere | None:
+        """
+        Find any sphere hit by a ray.
+
+        Note: Return as soon as a hit is found (e.g.: shadow rays).
+
+        Args:
+            ray (Ray): Ray.
+            t_max (float, optional): Ignore hits farther than this
+                distance. Defaults to inf.
+            exclude (Sphere | None, optional): Sphere to ignore (e.g.:
+                the sphere the ray is aimed at). Defaults to None.
+
+        Returns:
+            Sphere | None: A sphere hit by the ray, `None` if the ray
+                does not hit any sphere.
+        """
+        if self.accelerator is not None:
+            return self.accelerator.any_hit(ray, t_max, exclude)
+        for sphere in self.spheres:
+            if (
+                sphere is not exclude
+                and sphere.intersection_distance(ray, t_max) is not None
+            ):
+                return sphere
+        return None
 
     def interception(
-        self, ray: Ray, exception_spheres: list = None
+        self,
+        ray: Ray,
+        exclude: Sphere | None = None,
+        spheres: list[Sphere] | None = None,
     ) -> tuple[Point | None, Sphere | None]:
         """
         Compute the first material point reached by a ligth ray in the scene.
 
         Args:
             ray (Ray): Ray.
-            exception_spheres (list, optional): List of spheres to
-                ignore. Defaults to None.
+            exclude (Sphere | None, optional): Sphere to ignore.
+                Defaults to None.
+            spheres (list[Sphere] | None, optional): Only spheres the
+                ray may hit (see `closest_hit`). Defaults to None (all
+                the spheres).
 
         Returns:
             tuple[Point | None, Sphere | None]: Point and corresponding
                 sphere reached if the ray intercept an object,
                 (`None`, `None`) otherwise.
         """
-        exception_spheres = [] if exception_spheres is None else exception_spheres
-        intersection_point = None
-        intersection_distance = None
-        intersection_sphere = None
-        for sphere in [s for s in self.spheres if s not in exception_spheres]:
-            new_intersection_point = sphere.ray_intersection(ray)
-            if new_intersection_point is not None:
-                new_intersection_distance = Point.distance(
-                    new_intersection_point, ray.src
-                )
-                if (
-                    intersection_point is None
-                    or new_intersection_distance < intersection_distance
-                ):
-                    intersection_point = new_intersection_point
-                    intersection_distance = new_intersection_distance
-                    intersection_sphere = sphere
-        return intersection_point, intersection_sphere
+        t, sphere = self.closest_hit(ray, inf, exclude, spheres)
+        if sphere is None:
+            return None, None
+        return ray.follow_ray(t), sphere
 
-    def diffused_color(self, point: Point, sphere: Sphere) -> Color:
+    def diffused_color(
+        self,
+        point: Point,
+        sphere: Sphere,
+        shadow_cache: ShadowCache | None = None,
+        normal: Vector | None = None,
+    ) -> Color:
         """
         Return the color diffused by a given point on the surface of a sphere.
 
         Args:
             point (Point): Point on the surface of a sphere.
             sphere (Sphere): Sphere.
+            shadow_cache (ShadowCache | None, optional): Cache of the
+                last occluders. Defaults to None.
+            normal (Vector | None, optional): Normal of the sphere at
+                the point. Defaults to None (computed if needed).
 
         Returns:
             Color: Color diffused by the point.
         """
         colors = []
-        for light in self.lights:
+        for light_index, light in enumerate(self.lights):
             ray = Ray(
                 light.position, Vector.from_points(light.position, point), light.color
             )
-            if self.is_ray_visible_from_point(ray, sphere, point):
-                colors.append(sphere.diffused_color(ray, sphere.normal_at_point(point)))
+            if self.is_ray_visible_from_point(
+                ray, sphere, point, shadow_cache, light_index
+            ):
+                if normal is None:
+                    normal = sphere.normal_at_point(point)
+                colors.append(sphere.diffused_color(ray, normal))
         return sum(colors, start=BLACK)
 
-    def ray_trace(self, omega: Point, bg_color: Color):
+    def shade(
+        self,
+        _ray: Ray,
+        bg_color: Color,
+        point: Point | None,
+        sphere: Sphere | None,
+        shadow_cache: ShadowCache | None = None,
+        normal: Vector | None = None,
+    ) -> Color:
+        """
+        Compute the color seen along a primary ray from its first hit.
+
+        Args:
+            _ray (Ray): Primary ray (only used to follow reflections,
+                see `SceneWithReflections.shade`).
+            bg_color (Color): Background color.
+            point (Point | None): Point hit by the ray (`None` for the
+                background).
+            sphere (Sphere | None): Sphere hit by the ray (`None` for
+                the background).
+            shadow_cache (ShadowCache | None, optional): Cache of the
+                last occluders. Defaults to None.
+            normal (Vector | None, optional): Normal of the sphere at
+                the point. Defaults to None (computed if needed).
+
+        Returns:
+            Color: Color of the pixel.
+        """
+        if sphere is None:
+            return bg_color
+        return self.diffused_color(point, sphere, shadow_cache, normal)
+
+    def pixel_sample(
+        self,
+        omega: Point,
+        bg_color: Color,
+        i: int,
+        j: int,
+        shadow_cache: ShadowCache | None = None,
+    ) -> tuple[Color, Sphere | None]:
+        """
+        Compute the color of a given pixel with ray tracing, and the
+        sphere seen through the pixel.
+
+        Args:
+            omega (Point): Observation point.
+            bg_color (Color): Background color.
+            i (int): Pixel row coordinate.
+            j (int): Pixel column coordinate.
+            shadow_cache (ShadowCache | None, optional): Cache of the
+                last occluders. Defaults to None.
+
+        Returns:
+            tuple[Color, Sphere | None]: Color of the pixel and sphere
+                hit by the primary ray (`None` for the background).
+        """
+        # Create ray going through pixel (i,j)
+        ray = self.ray_from_pixel(omega, i, j)
+        # Compute intersection point and sphere, and color pixel accordingly
+        intersection_point, intersection_sphere = self.interception(ray)
+        return (
+            self.shade(
+                ray, bg_color, intersection_point, intersection_sphere, shadow_cache
+            ),
+            intersection_sphere,
+        )
+
+    def pixel_color(
+        self,
+        omega: Point,
+        bg_color: Color,
+        i: int,
+        j: int,
+        shadow_cache: ShadowCache | None = None,
+    ) -> Color:
+        """
+        Compute the color of a given pixel with ray tracing.
+
+        Args:
+            omega (Point): Observation point.
+            bg_color (Color): Background color.
+            i (int): Pixel row coordinate.
+            j (int): Pixel column coordinate.
+            shadow_cache (ShadowCache | None, optional): Cache of the
+                last occluders. Defaults to None.
+
+        Returns:
+            Color: Color of the pixel.
+        """
+        return self.pixel_sample(omega, bg_color, i, j, shadow_cache)[0]
+
+    def render_tile(
+        self,
+        omega: Point,
+        bg_color: Color,
+        tile: Tile,
+        gbuffer: GBuffer | None = None,
+    ) -> list[list[Color]]:
+        """
+        Compute the colors of the pixels of a tile with ray tracing.
+
+        Note: Shadow occluders are cached for the duration of the tile
+        (if `use_shadow_cache` is set) and the statistics of the cache
+        are added to `shadow_cache_stats`. If `use_screen_bins` is set,
+        the primary rays are only tested against the spheres whose
+        screen-space bounds contain their pixel (see
+        `render_culled_tile`). If `packet_size` is set, the primary rays
+        of each block of pixels of this size are traced together (see
+        `render_packet_tile`).
+
+        Args:
+            omega (Point): Observation point.
+            bg_color (Color): Background color.
+            tile (Tile): First row, last row (excluded), first column
+                and last column (excluded) of the tile.
+            gbuffer (GBuffer | None, optional): G-buffer to shade from
+                (or to fill, see `render_gbuffer_tile`). Defaults to
+                None.
+
+        Returns:
+            list[list[Color]]: Colors of the pixels of the tile (row by
+                row).
+        """
+        i_start, i_stop, j_start, j_stop = tile
+        shadow_cache = ShadowCache() if self.use_shadow_cache else None
+        if gbuffer is not None:
+            colors = render_gbuffer_tile(
+                self, omega, bg_color, tile, gbuffer, shadow_cache
+            )
+        elif self.packet_size > 0:
+            bins = self._screen_bins(omega) if self.use_screen_bins else None
+            colors = render_packet_tile(self, omega, bg_color, tile, bins, shadow_cache)
+        elif self.use_screen_bins:
+            colors = render_culled_tile(
+                self, omega, bg_color, tile, self._screen_bins(omega), shadow_cache
+            )
+        else:
+            colors = [
+                [
+                    self.pixel_color(omega, bg_color, i, j, shadow_cache)
+                    for j in range(j_start, j_stop)
+                ]
+                for i in range(i_start, i_stop)
+            ]
+        if shadow_cache is not None:
+            self.shadow_cache_stats.merge(shadow_cache)
+        return colors
+
+    def _screen_bins(self, omega: Point) -> ScreenBins:
+        """
+        Return the screen bins of the current render (built on first
+        use, see `ScreenBins`).
+        """
+        omega_key = (omega.x, omega.y, omega.z)
+        if self.screen_bins is None or self.screen_bins.omega != omega_key:
+            self.screen_bins = ScreenBins(self, omega)
+        return self.screen_bins
+
+    def ray_trace(
+        self,
+        omega: Point,
+        bg_color: Color,
+        n_workers: int = 1,
+        tile_size: int = 32,
+        writer: ImageWriter | None = None,
+        checkpoint: str | None = None,
+        checkpoint_interval: float = 60.0,
+        profile: str | None = None,
+    ) -> RenderStats | None:
         """
         Generate image of the scene with ray tracing.
 
+        Note: The screen is split into tiles. With several workers, the
+        tiles are rendered by a pool of processes (see `parallel`). The
+        image is identical to the one rendered by a single process. With
+        a writer, rows are written to the image file as soon as the
+        strip of tiles they belong to is done. With a checkpoint, the
+        tiles done are saved periodically (see `Checkpoint`): running
+        the same render again (same scene, camera and tile size) skips
+        them and only renders the others. With `use_gbuffer` set, the
+        primary hits of a serial render are kept in `gbuffer` (see
+        `GBuffer`): the next serial renders with the same geometry and
+        camera (i.e.: only colors, reflection coefficients, lights or
+        background color changed) skip the primary rays and only shade
+        the hits. The G-buffer is not used with several workers, and a
+        render resumed from a checkpoint does not complete it (the
+        primary hits of the restored tiles are missing). With a
+        profiling mode, the call stacks of the render are recorded in
+        `profile` (see `profiling`).
+
         Args:
             omega (Point): Observation point.
             bg_color (Color): Background color.
+            n_workers (int, optional): Number of worker processes.
+                Defaults to 1.
+            tile_size (int, optional): Size of the tiles (in pixels).
+                Defaults to 32.
+            writer (ImageWriter | None, optional): Image file to stream
+                the rows to (see `image_writer`). Defaults to None.
+            checkpoint (str | None, optional): Path of the checkpoint
+                files without extension. Defaults to None (no
+                checkpoint).
+            checkpoint_interval (float, optional): Time between two
+                saves of the checkpoint (in seconds). Defaults to 60.
+            profile (str | None, optional): Profiling mode
+                ("deterministic" or "sampling", see `profile_call`).
+                Defaults to None (no profiling).
+
+        Returns:
+            RenderStats | None: Stats of the render if `collect_stats`
+                is set, `None` otherwise (also stored in `stats`).
         """
-        # Iterate over all pixels
-        for j in range(self.screen_size[0]):
-            for i in range(self.screen_size[1]):
-                # Create ray going through pixel (i,j)
-                ray = self.ray_from_pixel(omega, i, j)
-                # Compute intersection point and sphere, and color pixel accordingly
-                intersection_point, intersection_sphere = self.interception(ray)
-                if intersection_point is None:
-                    self.set_pixel_color(i, j, bg_color)
-                else:
-                    self.set_pixel_color(
-                        i,
-                        j,
-                        self.diffused_color(intersection_point, intersection_sphere),
-                    )
-
-    def plot(self, path: str = None):  # TODO handle path properly
+        if profile is not None:
+            if n_workers > 1:
+                raise ValueError("Profiled renders run in a single process.")
+            self.profile = profile_call(
+                lambda: self.ray_trace(
+                    omega,
+                    bg_color,
+                    1,
+                    tile_size,
+                    writer,
+                    checkpoint,
+                    checkpoint_interval,
+                ),
+                profile,
+            )
+            return self.stats
+        start = time.perf_counter()
+        self.shadow_cache_stats = ShadowCache()
+        self.stats = RenderStats() if self.collect_stats else None
+        self.screen_bins = None  # Spheres may have changed since the last render
+        ckpt = None
+        if checkpoint is not None:
+            ckpt = Checkpoint(
+                checkpoint,
+                scene_fingerprint(self, omega, bg_color, tile_size),
+                self.image,
+                tile_size,
+            )
+            ckpt.interval = checkpoint_interval
+        try:
+            if n_workers > 1:
+                from .parallel import ray_trace_parallel  # pylint: disable=import-outside-toplevel
+
+                ray_trace_parallel(
+                    self, omega, bg_color, n_workers, tile_size, writer, ckpt
+                )
+            else:
+                gbuffer = None
+                if self.use_gbuffer:
+                    fingerprint = geometry_fingerprint(self, omega)
+                    if self.gbuffer is None or self.gbuffer.fingerprint != fingerprint:
+                        self.gbuffer = GBuffer(*self.screen_size)
+                    gbuffer = self.gbuffer
+                complete = self._ray_trace_serial(
+                    omega, bg_color, tile_size, writer, ckpt, gbuffer
+                )
+                if gbuffer is not None and complete:
+                    gbuffer.fingerprint = fingerprint  # All pixels stored
+        finally:
+            if ckpt is not None:
+                ckpt.close()
+        if self.stats is not None:
+            self.stats.add_time("total", time.perf_counter() - start)
+        return self.stats
+
+    def _ray_trace_serial(
+        self,
+        omega: Point,
+        bg_color: Color,
+        tile_size: int,
+        writer: ImageWriter | None,
+        checkpoint: Checkpoint | None,
+        gbuffer: GBuffer | None = None,
+    ) -> bool:
+        """
+        Generate image of the scene with ray tracing in the current
+        process (see `ray_trace`).
+
+        Returns:
+            bool: `True` if every tile was rendered, `False` if some
+                were restored from the checkpoint (their primary hits
+                are missing from the G-buffer).
+        """
+        complete = True
+        if checkpoint is not None:
+            checkpoint.restore(self.image)
+        try:
+            with instrument(self, self.stats):
+                # Iterate over all tiles
+                for tile in split_tiles(self.screen_size, tile_size):
+                    i_start, _, j_start, _ = tile
+                    if checkpoint is None or not checkpoint.is_done(tile):
+                        colors = self.render_tile(omega, bg_color, tile, gbuffer)
+                        for i, row in enumerate(colors, i_start):
+                            for j, color in enumerate(row, j_start):
+                                self.set_pixel_color(i, j, color)
+                        if checkpoint is not None:
+                            checkpoint.add(tile, self.image)
+                    else:
+                        complete = False
+                    if tile[3] == self.screen_size[0]:  # Last tile of the strip
+                        if writer is not None:
+                            for i in range(i_start, tile[1]):
+                                writer.write_row(self.image.get_row(i))
+                        self.image.evict(i_start, tile[1])
+        finally:
+            if checkpoint is not None:
+                checkpoint.save(self.image)  # Also when interrupted
+        return complete
+
+    def ray_trace_progressive(
+        self,
+        omega: Point,
+        bg_color: Color,
+        callback: Callable[[FrameBuffer, int], None] | None = None,
+        time_budget: float | None = None,
+        max_stride: int = 16,
+    ) -> int:
+        """
+        Generate image of the scene with ray tracing, from coarse to
+        fine (see `progressive`).
+
+        Args:
+            omega (Point): Observation point.
+            bg_color (Color): Background color.
+            callback (Callable[[FrameBuffer, int], None] | None, optional):
+                Function called with the image and the stride after each
+                pass. Defaults to None.
+            time_budget (float | None, optional): Maximum rendering time
+                (in seconds). Defaults to None (no limit).
+            max_stride (int, optional): Stride of the first pass (in
+                pixels). Defaults to 16.
+
+        Returns:
+            int: Stride of the finest pass completed (1 if the image is
+                complete).
+        """
+        return ray_trace_progressive(
+            self, omega, bg_color, callback, time_budget, max_stride
+        )
+
+    def ray_trace_adaptive(
+        self,
+        omega: Point,
+        bg_color: Color,
+        tolerance: float = 0.02,
+        block_size: int = 8,
+    ) -> int:
+        """
+        Generate image of the scene with ray tracing, tracing every
+        pixel only around edges and interpolating elsewhere (see
+        `adaptive`).
+
+        Args:
+            omega (Point): Observation point.
+            bg_color (Color): Background color.
+            tolerance (float, optional): Maximum difference between the
+                color components of the corners of an interpolated
+                block. Defaults to 0.02.
+            block_size (int, optional): Distance between the coarse
+                samples (in pixels). Defaults to 8.
+
+        Returns:
+            int: Number of primary rays traced.
+        """
+        return ray_trace_adaptive(self, omega, bg_color, tolerance, block_size)
+
+    def ray_trace_distributed(
+        self,
+        omega: Point,
+        bg_color: Color,
+        address: tuple[str, int] = ("127.0.0.1", 0),
+        n_local_workers: int = 0,
+        tile_size: int = 32,
+        timeout: float = 30.0,
+    ) -> "FarmStats":
+        """
+        Generate image of the scene with ray tracing on a render farm:
+        worker processes, possibly on other machines, connect over TCP
+        (see `distributed`).
+
+        Args:
+            omega (Point): Observation point.
+            bg_color (Color): Background color.
+            address (tuple[str, int], optional): Address the coordinator
+                listens on. Defaults to ("127.0.0.1", 0) (local workers
+                only).
+            n_local_workers (int, optional): Number of worker processes
+                to start on this machine. Defaults to 0.
+            tile_size (int, optional): Size of the tiles (in pixels).
+                Defaults to 32.
+            timeout (float, optional): Time after which a silent worker
+                is considered dead (in seconds). Defaults to 30.
+
+        Returns:
+            FarmStats: Per-worker throughput and scheduling overhead.
+        """
+        from .distributed import ray_trace_distributed  # pylint: disable=import-outside-toplevel
+
+        return ray_trace_distributed(
+            self, omega, bg_color, address, n_local_workers, tile_size, timeout
+        )
+
+    def plot(self, path: str = None):
         """
         Plot scene.
 
+        Note: Images are written pixel-exact by `image_writer` (PNG if
+        the path has no extension). matplotlib is only needed (and
+        imported) to display the image.
+
         Args:
-            path (str, optional): Path to the result image. Defaults
-            to None.
+            path (str, optional): Path to the result image (".png" or
+                ".ppm"). Defaults to None (display the image).
         """
-        plt.figure("PyTracer", figsize=self.view_size)
-        plt.imshow(self.image)
         if path is None:
+            import matplotlib.pyplot as plt  # pylint: disable=import-outside-toplevel
+
+            plt.figure("PyTracer", figsize=self.view_size)
+            plt.imshow(self.image)
             plt.show()
-        else:
-            plt.savefig(path)
+            return
+        if not os.path.splitext(path)[1]:
+            path += ".png"
+        save_image(path, self.image)
 
 
 class SceneWithReflections(Scene):
@@ -229,6 +783,7 @@ class SceneWithReflections(Scene):
         view_size: tuple[int, int] = (16, 9),
         screen_size: tuple[int, int] = (1600, 900),
         n_max_reflections: int = 3,
+        image: FrameBuffer | None = None,
     ):
         """
         Initialise a SceneWithReflections instance.
@@ -241,38 +796,69 @@ class SceneWithReflections(Scene):
                 (i.e.: screen resolution). Defaults to (1600, 900).
             n_max_reflections (int, optional): Maximum number of light
                 rays reflections. Defaults to 3.
+            image (FrameBuffer | None, optional): Image to render into
+                (e.g.: a shared framebuffer). Defaults to None (a black
+                image is allocated).
         """
-        super().__init__(view_size, screen_size)
+        super().__init__(view_size, screen_size, image)
         self.n_max_reflections: int = n_max_reflections
-
-    def reflections(self, ray: Ray) -> list[tuple[Point, Sphere]]:
+        # Stop following a ray once the weight of the color of the next
+        # point in the color of the first one falls below this value
+        # (0: always follow up to `n_max_reflections` points)
+        self.reflection_threshold: float = 0.0
+
+    def reflections(
+        self, ray: Ray, first: tuple[Point, Sphere] | None = None
+    ) -> list[tuple[Point, Sphere]]:
         """
         Compute the successive material points reached by a light ray
         over reflections.
 
+        Note: The color of the k-th point is weighted by the product of
+        the reflection coefficients of the spheres of the points 2 to k
+        in the color of the first one (see `reflected_color`). The ray
+        is not followed further once this weight is below
+        `reflection_threshold`: the point reached is left out, and so
+        are the next ones.
+
         Args:
             ray (Ray): Ray.
+            first (tuple[Point, Sphere] | None, optional): Point and
+                sphere reached by the ray, if already known (e.g.: from
+                a G-buffer). Defaults to None.
 
         Returns:
             list[tuple[Point, Sphere]]: List of point and corresponding
                 spheres reached by a ray and its reflections.
         """
         intersections = []  # Intersections of the (reflected) ray
-        exception_spheres = []
-        for _ in range(self.n_max_reflections):
+        intersection_sphere = None
+        weight = 1.0  # Weight of the color of the last point reached
+        if first is not None and self.n_max_reflections > 0:
+            intersections.append(first)
+            intersection_point, intersection_sphere = first
+            ray = intersection_sphere.reflected_ray(ray, intersection_point)
+        for _ in range(self.n_max_reflections - len(intersections)):
+            # Do not consider the previous intersection sphere for the next
+            # intersection search as the ray starts *on* this sphere
             intersection_point, intersection_sphere = self.interception(
-                ray, exception_spheres
+                ray, intersection_sphere
             )
             if intersection_point is None:
                 break
+            if intersections:
+                weight *= intersection_sphere.reflection
+                if weight < self.reflection_threshold:
+                    break  # Not worth shading
             intersections.append((intersection_point, intersection_sphere))
             ray = intersection_sphere.reflected_ray(ray, intersection_point)
-            # Do not consider the current intersection sphere for the next intersection
-            # search as the ray starts *on* this sphere
-            exception_spheres = [intersection_sphere]
         return intersections
 
-    def reflected_color(self, intersections: list[tuple[Point, Sphere]]) -> Color:
+    def reflected_color(
+        self,
+        intersections: list[tuple[Point, Sphere]],
+        shadow_cache: ShadowCache | None = None,
+    ) -> Color:
         """
         Compute the reflected color given a list of points and
         corresponding spheres corresponding to the successive reflections.
@@ -281,17 +867,19 @@ class SceneWithReflections(Scene):
             intersections (list[tuple[Point, Sphere]]): List of point
                 and corresponding spheres reached by a ray and its
                 reflections.
+            shadow_cache (ShadowCache | None, optional): Cache of the
+                last occluders. Defaults to None.
 
         Returns:
             Color: Color of the first point reached.
         """
         colors = [BLACK] * len(intersections)
         diffused_colors = [
-            self.diffused_color(intersection_point, intersection_sphere)
+            self.diffused_color(intersection_point, intersection_sphere, shadow_cache)
             for intersection_point, intersection_sphere in intersections
         ]
         colors[-1] = diffused_colors[-1]  # Last object is not subject to reflection
-        for i in range(self.n_max_reflections - 2, -1, -1):
+        for i in range(len(intersections) - 2, -1, -1):
             _, previous_intersection_sphere = intersections[i + 1]
             colors[i] = (
                 diffused_colors[i]
@@ -300,30 +888,80 @@ class SceneWithReflections(Scene):
         return colors[0]  # Color of the first point reached
 
     @override  # Override parent class method to handle reflections
-    def ray_trace(self, omega: Point, bg_color: Color):
+    def shade(
+        self,
+        ray: Ray,
+        bg_color: Color,
+        point: Point | None,
+        sphere: Sphere | None,
+        shadow_cache: ShadowCache | None = None,
+        normal: Vector | None = None,
+    ) -> Color:
+        """
+        Compute the color seen along a primary ray from its first hit
+        (with light reflections).
+
+        Args:
+            ray (Ray): Primary ray.
+            bg_color (Color): Background color.
+            point (Point | None): Point hit by the ray (`None` for the
+                background).
+            sphere (Sphere | None): Sphere hit by the ray (`None` for
+                the background).
+            shadow_cache (ShadowCache | None, optional): Cache of the
+                last occluders. Defaults to None.
+            normal (Vector | None, optional): Normal of the sphere at
+                the point. Defaults to None (computed if needed).
+
+        Returns:
+            Color: Color of the pixel.
+        """
+        if sphere is None:
+            return bg_color
+        intersections = self.reflections(ray, (point, sphere))
+        if not intersections:
+            return bg_color
+        if len(intersections) == 1:
+            return self.diffused_color(point, sphere, shadow_cache, normal)
+        return self.reflected_color(intersections, shadow_cache)
+
+    @override  # Override parent class method to handle reflections
+    def pixel_sample(
+        self,
+        omega: Point,
+        bg_color: Color,
+        i: int,
+        j: int,
+        shadow_cache: ShadowCache | None = None,
+    ) -> tuple[Color, Sphere | None]:
         """
-        Generate image of the scene with ray tracing (with light
-        reflections).
+        Compute the color of a given pixel with ray tracing (with light
+        reflections), and the sphere seen through the pixel.
 
         Args:
             omega (Point): Observation point.
             bg_color (Color): Background color.
+            i (int): Pixel row coordinate.
+            j (int): Pixel column coordinate.
+            shadow_cache (ShadowCache | None, optional): Cache of the
+                last occluders. Defaults to None.
+
+        Returns:
+            tuple[Color, Sphere | None]: Color of the pixel and sphere
+                hit by the primary ray (`None` for the background).
         """
-        # Iterate over all pixels
-        for j in range(self.screen_size[0]):
-            for i in range(self.screen_size[1]):
-                # Create ray going through pixel (i,j)
-                ray = self.ray_from_pixel(omega, i, j)
-                # Compute intersection point and sphere, and color pixel accordingly
-                intersections = self.reflections(ray)
-                if not intersections:
-                    self.set_pixel_color(i, j, bg_color)
-                elif len(intersections) == 1:
-                    intersection_point, intersection_sphere = intersections[0]
-                    self.set_pixel_color(
-                        i,
-                        j,
-                        self.diffused_color(intersection_point, intersection_sphere),
-                    )
-                else:
-                    self.set_pixel_color(i, j, self.reflected_color(intersections))
+        # Create ray going through pixel (i,j)
+        ray = self.ray_from_pixel(omega, i, j)
+        # Compute intersection point and sphere, and color pixel accordingly
+        intersections = self.reflections(ray)
+        if not intersections:
+            return bg_color, None
+        intersection_point, intersection_sphere = intersections[0]
+        if len(intersections) == 1:
+            return (
+                self.diffused_color(
+                    intersection_point, intersection_sphere, shadow_cache
+                ),
+                intersection_sphere,
+            )
+        return self.reflected_color(intersections, shadow_cache), intersection_sphere
@@ -0,0 +1,230 @@
+"""
+This module contains the ScreenBins class and the culled tile renderer.
+"""
+
+from __future__ import annotations
+
+from math import asin, atan2, ceil, cos, floor, sin, sqrt
+from typing import TYPE_CHECKING
+
+from .color import Color
+from .framebuffer import Tile
+from .point import Point
+from .shadow_cache import ShadowCache
+from .sphere import Sphere
+
+if TYPE_CHECKING:
+    from .scene import Scene
+
+# Relative margin added to the radius of the spheres in the conservative
+# tests (rounding errors must not hide a dependency)
+MARGIN = 1e-6
+
+Geometry = tuple[float, float, float, float]  # center (3), radius
+
+
+def screen_bounds(scene: Scene, omega: Point, geometry: Geometry) -> Tile | None:
+    """
+    Return the pixels the primary rays of which may hit a sphere.
+
+    Note: The bounds of the projection of the sphere on the screen are
+    given by the planes through the observation point tangent to the
+    sphere and parallel to the axes of the screen. They are widened by
+    one pixel against rounding errors.
+
+    Args:
+        scene (Scene): Scene.
+        omega (Point): Observation point.
+        geometry (Geometry): Center and radius of the sphere.
+
+    Returns:
+        Tile | None: First row, last row (excluded), first column and
+            last column (excluded) of the pixels, `None` if the sphere
+            is out of the screen. The whole screen if the sphere is not
+            entirely in front of the observation point.
+    """
+    width, height = scene.screen_size
+    cx, cy, cz, rad = geometry
+    rad *= 1 + MARGIN
+    if omega.z <= 0 or cz + rad >= omega.z:
+        return 0, height, 0, width
+    x_min, x_max = _tangent_bounds(omega.x, omega.z, cx, cz, rad)
+    y_min, y_max = _tangent_bounds(omega.y, omega.z, cy, cz, rad)
+    # Inverse of `Scene.pixel_to_point`
+    delta_x = scene.view_size[0] / width
+    delta_y = scene.view_size[1] / height
+    j_start = max(floor(x_min / delta_x + width / 2 - 0.5) - 1, 0)
+    j_stop = min(ceil(x_max / delta_x + width / 2 - 0.5) + 2, width)
+    i_start = max(floor(-y_max / delta_y + height / 2 - 0.5) - 1, 0)
+    i_stop = min(ceil(-y_min / delta_y + height / 2 - 0.5) + 2, height)
+    if i_start >= i_stop or j_start >= j_stop:
+        return None
+    return i_start, i_stop, j_start, j_stop
+
+
+def _tangent_bounds(o: float, oz: float, c: float, cz: float, rad: float):
+    """
+    Return the interval of the screen plane (z = 0) between the lines
+    through (o, oz) tangent to the circle of center (c, cz).
+    """
+    angle = atan2(cz - oz, c - o)
+    half_angle = asin(rad / sqrt((c - o) ** 2 + (cz - oz) ** 2))
+    bounds = [
+        o - oz * cos(a) / sin(a) for a in (angle - half_angle, angle + half_angle)
+    ]
+    return min(bounds), max(bounds)
+
+
+class ScreenBins:
+    """
+    Class representing the spheres the primary rays of each region of
+    the screen may hit.
+
+    Note: The screen is split into square bins. Each sphere is added to
+    the bins its screen-space bounds (see `screen_bounds`) overlap. The
+    bounds are conservative: a primary ray never hits a sphere whose
+    bounds do not contain its pixel.
+    """
+
+    def __init__(self, scene: Scene, omega: Point, bin_size: int = 32):
+        """
+        Initialise ScreenBins instance.
+
+        Args:
+            scene (Scene): Scene.
+            omega (Point): Observation point.
+            bin_size (int, optional): Size of the bins (in pixels).
+                Defaults to 32.
+        """
+        self.omega: tuple[float, float, float] = (omega.x, omega.y, omega.z)
+        self.bin_size: int = bin_size
+        # Index, sphere and screen-space bounds of the spheres, per bin
+        self.bins: dict[tuple[int, int], list[tuple[int, Sphere, Tile]]] = {}
+        for index, sphere in enumerate(scene.spheres):
+            c = sphere.center
+            bounds = screen_bounds(scene, omega, (c.x, c.y, c.z, sphere.rad))
+            if bounds is None:
+                continue
+            i_start, i_stop, j_start, j_stop = bounds
+            for bin_i in range(i_start // bin_size, (i_stop - 1) // bin_size + 1):
+                for bin_j in range(j_start // bin_size, (j_stop - 1) // bin_size + 1):
+                    self.bins.setdefault((bin_i, bin_j), []).append(
+                        (index, sphere, bounds)
+                    )
+
+    def candidates(self, tile: Tile) -> list[tuple[Sphere, Tile]]:
+        """
+        Return the spheres the primary rays of a tile may hit.
+
+        Args:
+            tile (Tile): First row, last row (excluded), first column
+                and last column (excluded) of the tile.
+
+        Returns:
+            list[tuple[Sphere, Tile]]: Spheres (in the order of the
+                scene) and their screen-space bounds.
+        """
+        i_start, i_stop, j_start, j_stop = tile
+        bin_size = self.bin_size
+        found = {}
+        for bin_i in range(i_start // bin_size, (i_stop - 1) // bin_size + 1):
+            for bin_j in range(j_start // bin_size, (j_stop - 1) // bin_size + 1):
+                for index, sphere, bounds in self.bins.get((bin_i, bin_j), ()):
+                    if (
+                        bounds[0] < i_stop
+                        and i_start < bounds[1]
+                        and bounds[2] < j_stop
+                        and j_start < bounds[3]
+                    ):
+                        found[index] = (sphere, bounds)
+        return [found[index] for index in sorted(found)]
+
+
+def culled_pixel_color(
+    scene: Scene,
+    omega: Point,
+    bg_color: Color,
+    i: int,
+    j: int,
+    spheres: list[Sphere],
+    shadow_cache: ShadowCache | None = None,
+) -> Color:
+    """
+    Compute the color of a given pixel with ray tracing, the primary
+    ray being only tested against the spheres it may hit.
+
+    Note: No ray is cast if the pixel is covered by no sphere.
+
+    Args:
+        scene (Scene): Scene.
+        omega (Point): Observation point.
+        bg_color (Color): Background color.
+        i (int): Pixel row coordinate.
+        j (int): Pixel column coordinate.
+        spheres (list[Sphere]): Spheres the primary ray may hit, in the
+            order of the scene (see `ScreenBins`).
+        shadow_cache (ShadowCache | None, optional): Cache of the last
+            occluders. Defaults to None.
+
+    Returns:
+        Color: Color of the pixel.
+    """
+    if not spheres:
+        return bg_color
+    ray = scene.ray_from_pixel(omega, i, j)
+    point, sphere = scene.interception(ray, None, spheres)
+    return scene.shade(ray, bg_color, point, sphere, shadow_cache)
+
+
+def render_culled_tile(
+    scene: Scene,
+    omega: Point,
+    bg_color: Color,
+    tile: Tile,
+    bins: ScreenBins,
+    shadow_cache: ShadowCache | None = None,
+) -> list[list[Color]]:
+    """
+    Compute the colors of the pixels of a tile, the primary rays being
+    only tested against the spheres whose screen-space bounds contain
+    their pixel.
+
+    Args:
+        scene (Scene): Scene.
+        omega (Point): Observation point.
+        bg_color (Color): Background color.
+        tile (Tile): First row, last row (excluded), first column and
+            last column (excluded) of the tile.
+        bins (ScreenBins): Screen bins of the scene.
+        shadow_cache (ShadowCache | None, optional): Cache of the last
+            occluders. Defaults to None.
+
+    Returns:
+        list[list[Color]]: Colors of the pixels of the tile (row by
+            row).
+    """
+    i_start, i_stop, j_start, j_stop = tile
+    candidates = bins.candidates(tile)
+    colors = []
+    for i in range(i_start, i_stop):
+        # Spheres the primary rays of the row may hit
+        row = [
+            (sphere, bounds[2], bounds[3])
+            for sphere, bounds in candidates
+            if bounds[0] <= i < bounds[1]
+        ]
+        colors.append(
+            [
+                culled_pixel_color(
+                    scene,
+                    omega,
+                    bg_color,
+                    i,
+                    j,
+                    [sphere for sphere, start, stop in row if start <= j < stop],
+                    shadow_cache,
+                )
+                for j in range(j_start, j_stop)
+            ]
+        )
+    return colors
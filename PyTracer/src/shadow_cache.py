@@ -0,0 +1,88 @@
+"""
+This module contains the ShadowCache class.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from .ray import Ray
+from .sphere import Sphere
+
+if TYPE_CHECKING:
+    from .scene import Scene
+
+
+class ShadowCache:
+    """
+    Class representing a cache of the last shadow occluder of each
+    light.
+
+    Note: Neighbouring pixels are usually hidden from a light by the
+    same sphere. Testing the last occluder first lets shadowed pixels
+    exit after a single intersection test; the occluder is forgotten
+    as soon as a light ray is not hidden so that lit regions do not pay
+    for a useless test. The cache never changes the
+    result of a shadow test; it is meant to be local to a tile so that
+    it stays valid under parallel rendering.
+    """
+
+    def __init__(self):
+        """
+        Initialise ShadowCache instance.
+        """
+        self._occluders: dict[int, Sphere] = {}
+        self.n_lookups: int = 0
+        self.n_hits: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        Fraction of the lookups answered by the cached occluder.
+        """
+        return self.n_hits / self.n_lookups if self.n_lookups else 0.0
+
+    def occluder(
+        self, scene: Scene, light_index: int, ray: Ray, t_max: float, exclude: Sphere
+    ) -> Sphere | None:
+        """
+        Find a sphere hiding a light ray, testing the last occluder of
+        the light first.
+
+        Args:
+            scene (Scene): Scene.
+            light_index (int): Index of the light the ray comes from.
+            ray (Ray): Light ray.
+            t_max (float): Distance to the point the ray is aimed at.
+            exclude (Sphere): Sphere the ray is aimed at.
+
+        Returns:
+            Sphere | None: A sphere hiding the ray, `None` if the ray is
+                not hidden.
+        """
+        self.n_lookups += 1
+        last = self._occluders.get(light_index)
+        if (
+            last is not None
+            and last is not exclude
+            and last.intersection_distance(ray, t_max) is not None
+        ):
+            self.n_hits += 1
+            return last
+        occluder = scene.any_hit(ray, t_max, exclude)
+        if occluder is not None:
+            self._occluders[light_index] = occluder
+        elif last is not None:
+            # Leaving a shadow: stop testing the last occluder first
+            del self._occluders[light_index]
+        return occluder
+
+    def merge(self, other: ShadowCache):
+        """
+        Add the statistics of another cache to this one.
+
+        Args:
+            other (ShadowCache): Cache.
+        """
+        self.n_lookups += other.n_lookups
+        self.n_hits += other.n_hits
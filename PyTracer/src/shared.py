@@ -0,0 +1,227 @@
+"""
+This module contains the SharedScene class.
+"""
+
+from __future__ import annotations
+
+from array import array
+from multiprocessing import shared_memory
+
+from .bvh import BVH
+from .color import Color
+from .framebuffer import FrameBuffer
+from .grid import UniformGrid
+from .light import Light
+from .point import Point
+from .scene import Scene, SceneWithReflections
+from .sphere import Sphere
+
+# Layout of a packed scene (float64 values), e.g.: in a shared memory block:
+# header | spheres (SPHERE_SIZE values each) | lights (LIGHT_SIZE values each)
+HEADER_SIZE = 21
+SPHERE_SIZE = 8  # center (3), radius, color (3), reflection
+LIGHT_SIZE = 6  # position (3), color (3)
+# Header values that do not change the pixels (accelerator and its
+# parameters, shadow cache, stats, screen bins, packet size)
+RENDER_SETTINGS = (1, 14, 15, 16, 17, 19, 20)
+
+ACCELERATORS = [None, BVH, UniformGrid]
+
+
+def accelerator_parameters(
+    accelerator: BVH | UniformGrid | None,
+) -> tuple[float, float]:
+    """
+    Return the build parameters of an accelerator (maximum leaf size and
+    number of SAH bins of a BVH, density and maximum resolution of a
+    grid).
+    """
+    if isinstance(accelerator, BVH):
+        return accelerator.max_leaf_size, accelerator.n_bins
+    if isinstance(accelerator, UniformGrid):
+        return accelerator.density, accelerator.max_resolution
+    return 0, 0
+
+
+class SharedScene:
+    """
+    Class representing a scene stored in a shared memory block.
+
+    Note: Worker processes attach to the block by name instead of
+    receiving a pickled copy of the scene graph.
+    """
+
+    def __init__(self, name: str):
+        """
+        Attach to an existing SharedScene.
+
+        Args:
+            name (str): Name of the shared memory block.
+        """
+        self.shm: shared_memory.SharedMemory = shared_memory.SharedMemory(name)
+        self.values: memoryview = self.shm.buf.cast("d")
+
+    @property
+    def name(self) -> str:
+        """
+        Name of the shared memory block.
+        """
+        return self.shm.name
+
+    @property
+    def screen_size(self) -> tuple[int, int]:
+        """
+        Size of the screen of the scene.
+        """
+        return int(self.values[4]), int(self.values[5])
+
+    @classmethod
+    def from_scene(cls, scene: Scene, omega: Point, bg_color: Color) -> SharedScene:
+        """
+        Create a SharedScene from a scene.
+
+        Args:
+            scene (Scene): Scene.
+            omega (Point): Observation point.
+            bg_color (Color): Background color.
+
+        Returns:
+            SharedScene: Shared scene (to be unlinked by the caller).
+        """
+        values = pack_scene(scene, omega, bg_color)
+        shm = shared_memory.SharedMemory(create=True, size=8 * len(values))
+        shm.buf[: 8 * len(values)] = values.tobytes()
+        shm.close()
+        return cls(shm.name)
+
+    def to_scene(self, image: FrameBuffer | None = None) -> tuple[Scene, Point, Color]:
+        """
+        Rebuild the scene from the shared memory block.
+
+        Args:
+            image (FrameBuffer | None, optional): Image of the scene
+                (e.g.: a shared framebuffer). Defaults to None (a black
+                image is allocated).
+
+        Returns:
+            tuple[Scene, Point, Color]: Scene, observation point and
+                background color.
+        """
+        return unpack_scene(self.values, image)
+
+    def close(self):
+        """
+        Detach from the shared memory block.
+        """
+        self.values.release()
+        self.shm.close()
+
+    def unlink(self):
+        """
+        Destroy the shared memory block.
+        """
+        self.shm.unlink()
+
+
+def pack_scene(scene: Scene, omega: Point, bg_color: Color) -> array:
+    """
+    Serialize a scene (see the layout above).
+
+    Args:
+        scene (Scene): Scene.
+        omega (Point): Observation point.
+        bg_color (Color): Background color.
+
+    Returns:
+        array: float64 values.
+    """
+    values = [
+        getattr(scene, "n_max_reflections", -1),  # -1 for a Scene
+        ACCELERATORS.index(type(scene.accelerator) if scene.accelerator else None),
+        *scene.view_size,
+        *scene.screen_size,
+        omega.x,
+        omega.y,
+        omega.z,
+        bg_color.r,
+        bg_color.g,
+        bg_color.b,
+        len(scene.spheres),
+        len(scene.lights),
+        scene.use_shadow_cache,
+        scene.collect_stats,
+        scene.use_screen_bins,
+        scene.packet_size,
+        getattr(scene, "reflection_threshold", 0.0),
+        *accelerator_parameters(scene.accelerator),
+    ]
+    for s in scene.spheres:
+        values += [s.center.x, s.center.y, s.center.z, s.rad]
+        values += [s.color.r, s.color.g, s.color.b, s.reflection]
+    for light in scene.lights:
+        values += [light.position.x, light.position.y, light.position.z]
+        values += [light.color.r, light.color.g, light.color.b]
+    return array("d", values)
+
+
+def unpack_scene(
+    values, image: FrameBuffer | None = None
+) -> tuple[Scene, Point, Color]:
+    """
+    Rebuild a scene serialized with `pack_scene`.
+
+    Args:
+        values: float64 values (array or memoryview).
+        image (FrameBuffer | None, optional): Image of the scene
+            (e.g.: a shared framebuffer). Defaults to None (a black
+            image is allocated).
+
+    Returns:
+        tuple[Scene, Point, Color]: Scene, observation point and
+            background color.
+    """
+    v = values
+    n_max_reflections = int(v[0])
+    view_size = (v[2], v[3])
+    screen_size = (int(v[4]), int(v[5]))
+    scene = (
+        Scene(view_size, screen_size, image)
+        if n_max_reflections < 0
+        else SceneWithReflections(view_size, screen_size, n_max_reflections, image)
+    )
+    scene.use_shadow_cache = bool(v[14])
+    scene.collect_stats = bool(v[15])
+    scene.use_screen_bins = bool(v[16])
+    scene.packet_size = int(v[17])
+    if n_max_reflections >= 0:
+        scene.reflection_threshold = v[18]
+    omega = Point(v[6], v[7], v[8])
+    bg_color = Color(v[9], v[10], v[11])
+
+    k = HEADER_SIZE
+    for _ in range(int(v[12])):
+        scene.spheres.append(
+            Sphere(
+                Point(v[k], v[k + 1], v[k + 2]),
+                v[k + 3],
+                Color(v[k + 4], v[k + 5], v[k + 6]),
+                v[k + 7],
+            )
+        )
+        k += SPHERE_SIZE
+    for _ in range(int(v[13])):
+        scene.lights.append(
+            Light(
+                Point(v[k], v[k + 1], v[k + 2]),
+                Color(v[k + 3], v[k + 4], v[k + 5]),
+            )
+        )
+        k += LIGHT_SIZE
+
+    # Rebuild the accelerator with the parameters of the packed one
+    accelerator = ACCELERATORS[int(v[1])]
+    if accelerator is BVH:
+        scene.accelerator = BVH(scene.spheres, int(v[19]), int(v[20]))
+    elif accelerator is UniformGrid:
+        scene.accelerator = UniformGrid(scene.spheres, v[19], int(v[20]))
+    return scene, omega, bg_color
@@ -2,7 +2,7 @@
 This module contains the Sphere class.
 """
 
-from math import cos, sqrt
+from math import cos, inf, sqrt
 
 from .color import Color
 from .point import Point
@@ -10,6 +10,48 @@ from .ray import Ray
 from .vector import Vector
 
 
+def quadratic_distance(
+    sq_dist: float, h: float, rad: float, t_max: float = inf
+) -> float | None:
+    """
+    Return the distance along a ray to its intersection with a sphere.
+
+    Note: Kernel of `packets.packet_closest_hits` (inlined in
+    `Sphere.intersection_distance`): solve t^2 + 2*h*t + c = 0, with c
+    the squared distance from the source of the ray to the center of the
+    sphere minus the squared radius (see IPT Centrale 2021, Q7). Return
+    `None` if the source of the ray is inside the sphere.
+
+    Args:
+        sq_dist (float): Squared distance from the center of the sphere
+            to the source of the ray.
+        h (float): Dot product of the direction of the ray (normalised)
+            and the vector from the center to the source.
+        rad (float): Radius of the sphere.
+        t_max (float, optional): Ignore intersections farther than this
+            distance. Defaults to inf.
+
+    Returns:
+        float | None: Distance to the intersection point if it exists,
+            `None` otherwise.
+    """
+    # The sphere cannot be hit closer than |center - src| - rad
+    if sq_dist >= (t_max + rad) * (t_max + rad):
+        return None
+    c = sq_dist - rad * rad
+    if c <= 0:  # Ray source inside the sphere
+        return None
+    delta = h * h - c
+    if delta < 0:  # Ray does not intersect sphere
+        return None
+    sqrt_delta = sqrt(delta)
+    if sqrt_delta - h < 0:  # Both solutions negative: sphere behind the ray
+        return None
+    # Both solutions are positive because the ray source is not inside the sphere
+    t = -h - sqrt_delta
+    return t if t < t_max else None
+
+
 class Sphere:
     """
     Class representing a sphere.
@@ -70,6 +112,51 @@ class Sphere:
         point_to_src = Vector.from_points(point, ray.src)
         return Vector.dot_product(normal, point_to_src) > 0
 
+    def intersection_distance(self, ray: Ray, t_max: float = inf) -> float | None:
+        """
+        Return the distance along a ray to its intersection with the
+        sphere.
+
+        Note: Return `None` if the source of the ray is inside the
+        sphere. Works on raw coordinates and squared distances and does
+        not create any object.
+
+        Args:
+            ray (Ray): Light ray (normalised direction).
+            t_max (float, optional): Ignore intersections farther than
+                this distance. Defaults to inf.
+
+        Returns:
+            float | None: Distance to the intersection point if it
+                exists, `None` otherwise.
+        """
+        src = ray.src
+        direction = ray.dir
+        center = self.center
+        o_x = src.x - center.x
+        o_y = src.y - center.y
+        o_z = src.z - center.z
+        # Solve t^2 + 2*h*t + c = 0 (see IPT Centrale 2021, Q7): same steps
+        # as `quadratic_distance`, inlined to save a call per test
+        sq_dist = o_x * o_x + o_y * o_y + o_z * o_z
+        rad = self.rad
+        # The sphere cannot be hit closer than |center - src| - rad
+        if sq_dist >= (t_max + rad) * (t_max + rad):
+            return None
+        c = sq_dist - rad * rad
+        if c <= 0:  # Ray source inside the sphere
+            return None
+        h = direction.x * o_x + direction.y * o_y + direction.z * o_z
+        delta = h * h - c
+        if delta < 0:  # Ray does not intersect sphere
+            return None
+        sqrt_delta = sqrt(delta)
+        if sqrt_delta - h < 0:  # Both solutions negative: sphere behind the ray
+            return None
+        # Both solutions are positive because the ray source is not inside the sphere
+        t = -h - sqrt_delta
+        return t if t < t_max else None
+
     def ray_intersection(self, ray: Ray) -> Point | None:
         """
         Return the intersection point of a ray and a sphere.
@@ -83,35 +170,22 @@ class Sphere:
             Point | None: Intersection point if it exists, `None`
                 otherwise.
         """
-        # Handle ray with source inside the sphere
-        if self.is_inside(ray.src):
-            return None
-        # Compute intersections by solving
-        # a*t^2 + b*t + c = 0 with a = 1
-        # See IPT Centrale 2021, Q7
-        center_to_src = Vector.from_points(self.center, ray.src)
-        b = 2 * Vector.dot_product(ray.dir, center_to_src)
-        c = center_to_src.get_norm() * center_to_src.get_norm() - self.rad * self.rad
-        delta = b * b - 4 * c
-        if delta < 0:  # Ray does not intersect sphere
-            return None
-        if delta == 0:  # Ray tangent to sphere
-            return ray.follow_ray(-b / 2)
-        sqrt_delta = sqrt(delta)
-        r1 = -b - sqrt_delta
-        r2 = -b + sqrt_delta
-        if r1 < 0 and r2 < 0:  # Ray does not intersect sphere
-            return None  # TODO why?
-        # Ray intersects sphere
-        # Both solutions are positive because the ray source is not inside the sphere
-        return ray.follow_ray(min(r1, r2) / 2)
+        t = self.intersection_distance(ray)
+        return None if t is None else ray.follow_ray(t)
+
+    def diffusion_factor(self, ray: Ray, normal: Vector) -> float:
+        """
+        Return the factor applied to the color of a ray diffused by the
+        sphere (i.e.: the color of the ray does not matter).
+        """
+        # Both vectors normalised
+        return cos(Vector.dot_product(ray.dir, normal))
 
     def diffused_color(self, ray: Ray, normal: Vector) -> Color:
         """
         Return the color of the diffused rays.
         """
-        # Both vectors normalised
-        return (self.color * ray.color) * cos(Vector.dot_product(ray.dir, normal))
+        return (self.color * ray.color) * self.diffusion_factor(ray, normal)
 
     def reflected_ray(self, ray: Ray, point: Point) -> Ray:
         """
@@ -0,0 +1,203 @@
+"""
+This module contains the RenderStats class.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .scene import Scene
+
+
+@dataclass
+class RenderStats:
+    """
+    Class representing the counters and phase times of a render.
+
+    Note: Phase times are exclusive: "intersection" is the time spent
+    finding the sphere hit by primary and reflected rays, "shading" the
+    time spent computing diffused colors (shadow rays included) and
+    "total" the wall-clock time of the render. With several workers,
+    the phase times are summed over the workers.
+    """
+
+    primary_rays: int = 0
+    intersection_tests: int = 0  # Ray-sphere tests
+    hits: int = 0  # Ray-sphere tests that hit
+    shadow_rays: int = 0
+    occluded_shadow_rays: int = 0
+    # Number of rays hitting a sphere after d reflections (index d)
+    reflection_bounces: list[int] = field(default_factory=list)
+    phase_times: dict[str, float] = field(default_factory=dict)
+
+    def add_time(self, phase: str, duration: float):
+        """
+        Add time to a phase.
+
+        Args:
+            phase (str): Name of the phase.
+            duration (float): Duration (in seconds).
+        """
+        self.phase_times[phase] = self.phase_times.get(phase, 0.0) + duration
+
+    def merge(self, other: RenderStats):
+        """
+        Add the counters and phase times of other stats to these ones.
+
+        Args:
+            other (RenderStats): Stats.
+        """
+        self.primary_rays += other.primary_rays
+        self.intersection_tests += other.intersection_tests
+        self.hits += other.hits
+        self.shadow_rays += other.shadow_rays
+        self.occluded_shadow_rays += other.occluded_shadow_rays
+        if len(self.reflection_bounces) < len(other.reflection_bounces):
+            self.reflection_bounces += [0] * (
+                len(other.reflection_bounces) - len(self.reflection_bounces)
+            )
+        for depth, n_rays in enumerate(other.reflection_bounces):
+            self.reflection_bounces[depth] += n_rays
+        for phase, duration in other.phase_times.items():
+            self.add_time(phase, duration)
+
+    def as_dict(self) -> dict:
+        """
+        Return the stats as a dictionary (e.g.: to dump them as JSON).
+        """
+        return asdict(self)
+
+
+@contextmanager
+def instrument(scene: Scene, stats: RenderStats | None) -> Iterator[None]:
+    """
+    Collect the stats of the renders of a scene.
+
+    Note: Counting wrappers are set as instance attributes of the scene
+    and of its spheres for the duration of the context, and removed
+    afterwards. The classes are never modified: when `stats` is `None`,
+    nothing is wrapped and rendering runs at full speed.
+
+    Args:
+        scene (Scene): Scene.
+        stats (RenderStats | None): Stats to fill (`None` to disable).
+    """
+    if stats is None:
+        yield
+        return
+
+    perf_counter = time.perf_counter
+    ray_from_pixel = scene.ray_from_pixel
+    closest_hit = scene.closest_hit
+    closest_hits = scene.closest_hits
+    diffused_color = scene.diffused_color
+    is_ray_visible_from_point = scene.is_ray_visible_from_point
+
+    def counted_ray_from_pixel(*args):
+        stats.primary_rays += 1
+        return ray_from_pixel(*args)
+
+    def timed_closest_hit(*args):
+        start = perf_counter()
+        result = closest_hit(*args)
+        stats.add_time("intersection", perf_counter() - start)
+        return result
+
+    def counted_closest_hits(omega, rays, spheres):
+        # Packets of primary rays do not call the spheres (see `trace_packet`)
+        start = perf_counter()
+        result = closest_hits(omega, rays, spheres)
+        stats.add_time("intersection", perf_counter() - start)
+        stats.intersection_tests += len(rays) * len(spheres)
+        stats.hits += result[2]
+        return result
+
+    def timed_diffused_color(*args):
+        start = perf_counter()
+        result = diffused_color(*args)
+        stats.add_time("shading", perf_counter() - start)
+        return result
+
+    def counted_is_ray_visible_from_point(ray, sphere, point, *args):
+        if not sphere.is_ray_above_surface(ray, point):
+            return False  # No shadow ray is cast
+        stats.shadow_rays += 1
+        visible = is_ray_visible_from_point(ray, sphere, point, *args)
+        if not visible:
+            stats.occluded_shadow_rays += 1
+        return visible
+
+    wrappers = {
+        "ray_from_pixel": counted_ray_from_pixel,
+        "closest_hit": timed_closest_hit,
+        "closest_hits": counted_closest_hits,
+        "diffused_color": timed_diffused_color,
+        "is_ray_visible_from_point": counted_is_ray_visible_from_point,
+    }
+
+    if hasattr(scene, "reflections"):
+        reflections = scene.reflections
+        bounces = stats.reflection_bounces
+        bounces += [0] * (scene.n_max_reflections - len(bounces))
+
+        def counted_reflections(*args):
+            intersections = reflections(*args)
+            for depth in range(len(intersections)):
+                bounces[depth] += 1
+            return intersections
+
+        wrappers["reflections"] = counted_reflections
+
+    def counted_intersection_distance(intersection_distance):
+        def wrapper(*args):
+            stats.intersection_tests += 1
+            t = intersection_distance(*args)
+            if t is not None:
+                stats.hits += 1
+            return t
+
+        return wrapper
+
+    spheres = list(scene.spheres)
+    for name, wrapper in wrappers.items():
+        setattr(scene, name, wrapper)
+    for sphere in spheres:
+        sphere.intersection_distance = counted_intersection_distance(
+            sphere.intersection_distance
+        )
+    try:
+        yield
+    finally:
+        for name in wrappers:
+            delattr(scene, name)
+        for sphere in spheres:
+            del sphere.intersection_distance
+
+
+@contextmanager
+def collect_stats(scene: Scene) -> Iterator[RenderStats | None]:
+    """
+    Collect the stats of a render of a scene in `scene.stats` (if
+    `scene.collect_stats` is set, see `instrument`), "total" time
+    included.
+
+    Args:
+        scene (Scene): Scene.
+
+    Returns:
+        Iterator[RenderStats | None]: Stats of the render (`None` if
+            the scene does not collect stats).
+    """
+    start = time.perf_counter()
+    scene.stats = RenderStats() if scene.collect_stats else None
+    try:
+        with instrument(scene, scene.stats):
+            yield scene.stats
+    finally:
+        if scene.stats is not None:
+            scene.stats.add_time("total", time.perf_counter() - start)
@@ -14,6 +14,8 @@ class Vector:
     Class representing a 3D vector.
     """
 
+    __slots__ = ("_norm", "x", "y", "z")
+
     def __init__(self, x: float, y: float, z: float):
         """
         Initialise Vector instance.
@@ -0,0 +1,76 @@
+"""
+Tests of the G-buffer of serial renders (see `src.gbuffer`).
+"""
+
+from scenes import scene_3
+from src.color import Color
+
+SCREEN_SIZE = (64, 64)
+TILE_SIZE = 32  # 4 tiles
+
+
+def render_interrupted(scene, omega, bg_color, checkpoint: str, n_tiles: int):
+    """
+    Render a scene with a checkpoint, interrupted after some tiles.
+    """
+    render_tile = scene.render_tile
+    n_rendered = 0
+
+    def interrupted_render_tile(*args):
+        nonlocal n_rendered
+        if n_rendered == n_tiles:
+            raise KeyboardInterrupt
+        n_rendered += 1
+        return render_tile(*args)
+
+    scene.render_tile = interrupted_render_tile
+    try:
+        scene.ray_trace(omega, bg_color, tile_size=TILE_SIZE, checkpoint=checkpoint)
+    except KeyboardInterrupt:
+        pass
+    del scene.render_tile
+
+
+def test_gbuffer_resumed_from_checkpoint(tmp_path):
+    """
+    A render resumed from a checkpoint must not mark the G-buffer
+    complete: the primary hits of the restored tiles are missing.
+    """
+    checkpoint = str(tmp_path / "checkpoint")
+    scene, omega, bg_color = scene_3(screen_size=SCREEN_SIZE)
+    scene.use_gbuffer = True
+    render_interrupted(scene, omega, bg_color, checkpoint, 1)
+    scene.ray_trace(omega, bg_color, tile_size=TILE_SIZE, checkpoint=checkpoint)
+    assert scene.gbuffer.fingerprint is None
+
+    # Shading change: the next render must fill the G-buffer again
+    new_color = Color.from_rgb(255, 128, 0)
+    scene.spheres[0].color = new_color
+    scene.ray_trace(omega, bg_color, tile_size=TILE_SIZE)
+    assert scene.gbuffer.fingerprint is not None
+
+    expected, omega, bg_color = scene_3(screen_size=SCREEN_SIZE)
+    expected.spheres[0].color = new_color
+    expected.ray_trace(omega, bg_color, tile_size=TILE_SIZE)
+    assert scene.image.pixels.tobytes() == expected.image.pixels.tobytes()
+
+    # Shaded from the complete G-buffer
+    scene.lights[0].color = expected.lights[0].color = Color(0.5, 0.5, 0.5)
+    scene.ray_trace(omega, bg_color, tile_size=TILE_SIZE)
+    expected.ray_trace(omega, bg_color, tile_size=TILE_SIZE)
+    assert scene.image.pixels.tobytes() == expected.image.pixels.tobytes()
+
+
+def test_gbuffer_stats():
+    """
+    Filling the G-buffer must record the primary intersections.
+    """
+    stats = []
+    for use_gbuffer in (False, True):
+        scene, omega, bg_color = scene_3(screen_size=SCREEN_SIZE)
+        scene.collect_stats = True
+        scene.use_gbuffer = use_gbuffer
+        stats.append(scene.ray_trace(omega, bg_color))
+    assert stats[1].intersection_tests == stats[0].intersection_tests
+    assert stats[1].hits == stats[0].hits
+    assert stats[1].phase_times.get("intersection", 0.0) > 0